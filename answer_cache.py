@@ -0,0 +1,232 @@
+"""
+In-memory cache of TennisBot answers with local near-duplicate matching
+Answers are keyed by a fingerprint of the plan they were given for plus the
+normalized question. Paraphrases of a cached question are matched by TF-IDF cosine
+similarity computed locally, so no embedding API call is needed. Questions that
+differ in a negation or, when short, in a rare word are never treated as paraphrases.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_SIMILARITY_THRESHOLD = 0.85
+
+# Words that don't change what a coaching question asks. Negations and time words
+# (not, today, tomorrow...) are deliberately kept
+STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "mine", "you", "your", "we", "our", "it", "its", "this", "that",
+    "these", "those", "is", "am", "are", "was", "were", "be", "been", "do", "does", "did", "can", "could",
+    "would", "will", "shall", "may", "might", "must", "to", "of", "in", "on", "for", "at", "with", "about",
+    "and", "or", "so", "if", "please", "tennis", "coach", "tennisbot", "s", "d", "ll", "ve", "m", "re",
+    "just", "really", "again", "some", "any"
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+def _stem(word: str) -> str:
+    """Very light suffix stripping so plurals and -ing forms match"""
+    for suffix in ("ing", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+def question_terms(question: str) -> List[str]:
+    """Content words of a question, lowercased and lightly stemmed"""
+    text = question.lower().replace("'", "").replace("’", "")
+    return [_stem(word) for word in _WORD_RE.findall(text) if word not in STOPWORDS]
+
+# Words that reverse or redirect a question. A cached answer is only reused for a
+# question with exactly the same ones, so "skip serve today" never gets "serve today"
+REVERSAL_TERMS = {_stem(word) for word in (
+    "not", "no", "never", "dont", "cant", "cannot", "shouldnt", "wont", "isnt", "arent", "doesnt", "without",
+    "skip", "skipping", "avoid", "avoiding", "stop", "stopping", "instead", "less", "fewer", "more",
+    "before", "after"
+)}
+
+# Questions with up to this many content words match only when the words they don't
+# share are more common than every word they do - one added word can change them
+SHORT_QUESTION_TERMS = 6
+
+def normalize_question(question: str) -> str:
+    """Canonical form used for exact-match lookups"""
+    return " ".join(question_terms(question)) or " ".join(question.lower().split())
+
+def plan_fingerprint(tennis_plan: Any, tennis_log: Any) -> str:
+    """Stable hash of everything a coach answer can depend on: the log and the plan"""
+    payload = json.dumps({
+        "log": asdict(tennis_log) if hasattr(tennis_log, "__dataclass_fields__") else {
+            "drills_trained": list(tennis_log.drills_trained), "intensity": tennis_log.intensity,
+            "form_rating": tennis_log.form_rating, "fatigue_level": tennis_log.fatigue_level
+        },
+        "hardcoded": tennis_plan.hardcoded_suggestions,
+        "gpt": tennis_plan.gpt_suggestions
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+class AnswerCache:
+    """Thread-safe LRU cache of coach answers with TF-IDF near-duplicate lookup"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+
+        self._lock = threading.Lock()
+        # (fingerprint, normalized question) -> (answer, term counts)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, Counter]]" = OrderedDict()
+        # fingerprint -> normalized questions cached for that plan
+        self._by_plan: Dict[str, set] = {}
+        # Document frequency of each term across cached questions, for IDF weights
+        self._doc_freq: Counter = Counter()
+
+        # In-process counters
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "AnswerCache":
+        """Create a cache configured from ANSWER_CACHE_* environment variables"""
+        return cls(
+            max_entries=int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+            similarity_threshold=float(os.getenv('ANSWER_CACHE_SIMILARITY', DEFAULT_SIMILARITY_THRESHOLD))
+        )
+
+    def get(self, fingerprint: str, question: str) -> Optional[str]:
+        """Cached answer for the question or a close paraphrase of it, or None on a miss"""
+        normalized = normalize_question(question)
+        with self._lock:
+            key = (fingerprint, normalized)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry[0]
+
+            best_key, best_score = None, 0.0
+            terms = Counter(question_terms(question))
+            if terms:
+                for candidate in self._by_plan.get(fingerprint, ()):
+                    candidate_terms = self._entries[(fingerprint, candidate)][1]
+                    if not self._same_question(terms, candidate_terms):
+                        continue
+                    score = self._cosine(terms, candidate_terms)
+                    if score > best_score:
+                        best_key, best_score = (fingerprint, candidate), score
+
+            if best_key is not None and best_score >= self.similarity_threshold:
+                self._entries.move_to_end(best_key)
+                self.near_hits += 1
+                return self._entries[best_key][0]
+
+            self.misses += 1
+            return None
+
+    def contains(self, fingerprint: str, question: str) -> bool:
+        """Whether an exact (normalized) match is cached, without touching LRU order or counters"""
+        with self._lock:
+            return (fingerprint, normalize_question(question)) in self._entries
+
+    def put(self, fingerprint: str, question: str, answer: str) -> None:
+        """Cache an answer, evicting the least recently used entries beyond max_entries"""
+        normalized = normalize_question(question)
+        key = (fingerprint, normalized)
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = (answer, self._entries[key][1])
+                self._entries.move_to_end(key)
+                return
+
+            terms = Counter(question_terms(question))
+            self._entries[key] = (answer, terms)
+            self._by_plan.setdefault(fingerprint, set()).add(normalized)
+            self._doc_freq.update(terms.keys())
+            self.stores += 1
+
+            while len(self._entries) > self.max_entries:
+                (old_fingerprint, old_question), (_, old_terms) = self._entries.popitem(last=False)
+                questions = self._by_plan[old_fingerprint]
+                questions.discard(old_question)
+                if not questions:
+                    del self._by_plan[old_fingerprint]
+                self._doc_freq.subtract(old_terms.keys())
+                for term in old_terms:
+                    if self._doc_freq[term] <= 0:
+                        del self._doc_freq[term]
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        hits = self.exact_hits + self.near_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": hits,
+            "exact_hits": self.exact_hits,
+            "near_duplicate_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions
+        }
+
+    def clear(self) -> None:
+        """Remove every cached answer"""
+        with self._lock:
+            self._entries.clear()
+            self._by_plan.clear()
+            self._doc_freq.clear()
+
+    def _idf(self, term: str) -> float:
+        # Smoothed so terms never seen before still carry weight
+        return math.log((1 + len(self._entries)) / (1 + self._doc_freq.get(term, 0))) + 1.0
+
+    def _same_question(self, a: Counter, b: Counter) -> bool:
+        """Whether two similar questions may share an answer: same reversal words and,
+        for short questions, no rarer word left unmatched"""
+        if REVERSAL_TERMS.intersection(a) != REVERSAL_TERMS.intersection(b):
+            return False
+        if max(len(a), len(b)) > SHORT_QUESTION_TERMS:
+            return True
+        shared = a.keys() & b.keys()
+        if not shared:
+            return False
+        rarest_shared = min(self._idf(term) for term in shared)
+        return all(self._idf(term) < rarest_shared for term in a.keys() ^ b.keys())
+
+    def _cosine(self, a: Counter, b: Counter) -> float:
+        weights_a = {term: count * self._idf(term) for term, count in a.items()}
+        weights_b = {term: count * self._idf(term) for term, count in b.items()}
+        dot = sum(weight * weights_b.get(term, 0.0) for term, weight in weights_a.items())
+        if not dot:
+            return 0.0
+        norm_a = math.sqrt(sum(weight * weight for weight in weights_a.values()))
+        norm_b = math.sqrt(sum(weight * weight for weight in weights_b.values()))
+        return dot / (norm_a * norm_b)
+
+_default_cache: Optional[AnswerCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_default_answer_cache() -> Optional[AnswerCache]:
+    """Process-wide answer cache, or None when disabled via ANSWER_CACHE_ENABLED=false"""
+    global _default_cache
+    if os.getenv('ANSWER_CACHE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = AnswerCache.from_env()
+        return _default_cache
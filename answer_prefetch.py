@@ -0,0 +1,186 @@
+"""
+Speculative precomputation of TennisBot quick-question answers
+Right after a plan is generated, the predefined quick questions are asked on a
+small background thread pool and their answers stored in the answer cache, so the
+quick-question buttons render instantly. Opt-in, cancellable and spend-capped.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from conversation_memory import ConversationMemory
+
+# (button label, question) pairs offered by the app and CLI
+QUICK_QUESTIONS = [
+    ("Why should I practice this drill again?", "Why should I practice this drill again?"),
+    ("Can I skip my session tomorrow?", "Can I skip my tennis session tomorrow?"),
+    ("What's my main focus for the next session?", "What's my main focus for the next tennis session?"),
+    ("How can I improve my weak areas?", "How can I improve my weak areas in tennis?")
+]
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_CALLS_PER_HOUR = 200
+
+class PrefetchJob:
+    """Speculative answers being computed for one plan"""
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.futures: Dict[str, Future] = {}
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> int:
+        """Stop the job: queued questions are dropped, answers still in flight are discarded"""
+        self._cancelled.set()
+        return sum(1 for future in self.futures.values() if future.cancel())
+
+    def wait(self, question: str, timeout: Optional[float] = None) -> None:
+        """Block until an already-running prefetch of `question` finishes
+
+        Queued prefetches are cancelled instead, so the caller asks directly rather
+        than waiting behind other speculative questions.
+        """
+        future = self.futures.get(question)
+        if future is None or future.cancel():
+            return
+        try:
+            future.result(timeout=timeout)
+        except Exception:
+            pass
+
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures.values())
+
+class AnswerPrefetcher:
+    """Bounded background pool that warms the answer cache with quick-question answers"""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, max_calls_per_hour: int = DEFAULT_MAX_CALLS_PER_HOUR):
+        self.max_calls_per_hour = max_calls_per_hour
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="answer-prefetch")
+        self._lock = threading.Lock()
+        self._call_times: deque = deque()
+
+        # In-process counters
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.skipped_cached = 0
+        self.skipped_budget = 0
+
+    @classmethod
+    def from_env(cls) -> "AnswerPrefetcher":
+        """Create a prefetcher configured from ANSWER_PREFETCH_* environment variables"""
+        return cls(
+            max_workers=int(os.getenv('ANSWER_PREFETCH_WORKERS', DEFAULT_WORKERS)),
+            max_calls_per_hour=int(os.getenv('ANSWER_PREFETCH_MAX_CALLS_PER_HOUR', DEFAULT_MAX_CALLS_PER_HOUR))
+        )
+
+    def prefetch(self, tennis_plan: Any, tennis_log: Any, answer_cache: Any,
+                 questions: Optional[List[str]] = None) -> PrefetchJob:
+        """Start answering questions (default: QUICK_QUESTIONS) for a plan in the background"""
+        from answer_cache import plan_fingerprint
+
+        job = PrefetchJob(plan_fingerprint(tennis_plan, tennis_log))
+        for question in questions or [question for _, question in QUICK_QUESTIONS]:
+            with self._lock:
+                self.submitted += 1
+            future = self._executor.submit(self._answer, job, tennis_plan, tennis_log, answer_cache, question)
+            future.add_done_callback(self._on_done)
+            job.futures[question] = future
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """Prefetch counters and remaining hourly budget"""
+        with self._lock:
+            self._expire_calls(time.monotonic())
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+                "skipped_cached": self.skipped_cached,
+                "skipped_budget": self.skipped_budget,
+                "calls_last_hour": len(self._call_times),
+                "max_calls_per_hour": self.max_calls_per_hour
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _answer(self, job: PrefetchJob, tennis_plan: Any, tennis_log: Any, answer_cache: Any, question: str) -> Optional[str]:
+        if job.cancelled:
+            self._count("cancelled")
+            return None
+
+        # A fresh bot per question: speculative answers must not depend on chat history
+        from training_evaluator import TennisCoachBot
+        bot = TennisCoachBot(tennis_plan, tennis_log, memory=ConversationMemory(), speculative=True)
+        # Same key the app's bot reads, including the model the question is routed to
+        key = bot.answer_cache_key(question)
+        if answer_cache.contains(key, question):
+            self._count("skipped_cached")
+            return None
+        if not self._reserve_call():
+            self._count("skipped_budget")
+            return None
+
+        answer = bot.ask_question(question)
+
+        if job.cancelled:
+            self._count("cancelled")
+            return None
+        if not len(bot.memory):
+            # The request failed - ask_question returned its fallback apology
+            self._count("failed")
+            return None
+
+        answer_cache.put(key, question, answer)
+        self._count("completed")
+        return answer
+
+    def _on_done(self, future: Future) -> None:
+        # Questions dropped from the queue never reach _answer
+        if future.cancelled():
+            self._count("cancelled")
+
+    def _reserve_call(self) -> bool:
+        """Take one call from the rolling hourly budget"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire_calls(now)
+            if len(self._call_times) >= self.max_calls_per_hour:
+                return False
+            self._call_times.append(now)
+            return True
+
+    def _expire_calls(self, now: float) -> None:
+        while self._call_times and now - self._call_times[0] > 3600:
+            self._call_times.popleft()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+_default_prefetcher: Optional[AnswerPrefetcher] = None
+_default_prefetcher_lock = threading.Lock()
+
+def prefetch_enabled() -> bool:
+    """Whether ANSWER_PREFETCH_ENABLED opts in to speculative answers (off by default)"""
+    return os.getenv('ANSWER_PREFETCH_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+def get_default_prefetcher() -> AnswerPrefetcher:
+    """Process-wide prefetcher, so every session shares one bounded pool and budget"""
+    global _default_prefetcher
+    with _default_prefetcher_lock:
+        if _default_prefetcher is None:
+            _default_prefetcher = AnswerPrefetcher.from_env()
+        return _default_prefetcher
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Headless HTTP JSON API for the Tennis Training Evaluator
+Run with: python api_server.py --port 8080 --workers 4
+
+Endpoints:
+  POST /v1/plans        one training log -> daily plan
+  POST /v1/plans/batch  {"records": [...]} -> plans in input order
+                        (?rules_only=true: rule-based suggestions only, AI sections if cached)
+  POST /v1/coach/ask    {"plan": ..., "question": ..., "history": [...]} -> TennisBot answer
+  GET  /healthz         liveness
+  GET  /metrics         request, LLM, cache and connection pool metrics (JSON, or ?format=prometheus)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any, Dict
+
+from aiohttp import web
+from dotenv import load_dotenv
+
+from training_evaluator import AsyncTennisTrainingEvaluator, AsyncTennisCoachBot, TennisDailyPlan
+from conversation_memory import ConversationMemory
+from plan_cache import get_default_plan_cache
+from answer_cache import get_default_answer_cache
+from traffic_capture import get_default_traffic_recorder
+from metrics import get_metrics
+from training_history import get_default_history_store
+from openai_clients import aclose_async_clients, apreconnect, preconnect_enabled
+from plan_records import log_from_record, percentile, plan_to_dict, record_session_date
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_PORT = 8080
+DEFAULT_CONCURRENCY = 64
+DEFAULT_MAX_BATCH = 100
+
+# Latency samples kept per endpoint for /metrics percentiles
+LATENCY_WINDOW = 1000
+
+class EndpointMetrics:
+    """Request counters and recent latencies for one endpoint"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50) * 1000, 1),
+                "p95": round(percentile(latencies, 0.95) * 1000, 1),
+                "p99": round(percentile(latencies, 0.99) * 1000, 1)
+            }
+        }
+
+def plan_from_dict(data):
+    """Rebuild (TennisDailyPlan, TennisTrainingLog) from the JSON returned by /v1/plans"""
+    if not isinstance(data, dict):
+        raise ValueError("plan must be an object as returned by /v1/plans")
+    tennis_log = log_from_record(data.get('yesterday_session', {}))
+    tennis_plan = TennisDailyPlan(
+        hardcoded_suggestions=list(data.get('hardcoded_suggestions', [])),
+        gpt_suggestions=dict(data.get('ai_suggestions', {})),
+        raw_gpt_response=str(data.get('full_ai_response', '')),
+        is_fallback=bool(data.get('is_fallback', False))
+    )
+    return tennis_plan, tennis_log
+
+async def read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text='{"error": "Request body must be valid JSON"}', content_type="application/json")
+
+def bad_request(message):
+    return web.json_response({"error": message}, status=400)
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    """Count requests, errors and latency per route"""
+    # Keyed by route rather than raw path so unknown URLs can't grow the table
+    resource = request.match_info.route.resource
+    route = resource.canonical if resource is not None else "unmatched"
+    metrics = request.app["metrics"].setdefault(route, EndpointMetrics())
+    metrics.requests += 1
+    start = time.perf_counter()
+    try:
+        response = await handler(request)
+    except web.HTTPException as e:
+        if e.status >= 400:
+            metrics.errors += 1
+        raise
+    except Exception:
+        metrics.errors += 1
+        raise
+    finally:
+        metrics.latencies.append(time.perf_counter() - start)
+    if response.status >= 400:
+        metrics.errors += 1
+    return response
+
+@contextlib.asynccontextmanager
+async def openai_slot(app):
+    """Hold one of the process's OpenAI-backed request slots, counted as in flight"""
+    async with app["limiter"]:
+        app["in_flight"] += 1
+        try:
+            yield
+        finally:
+            app["in_flight"] -= 1
+
+def rules_only_requested(request, body=None) -> bool:
+    """Rule-only mode from ?rules_only=true or a "rules_only": true body field"""
+    if request.query.get("rules_only", "").lower() in ("1", "true", "yes"):
+        return True
+    return isinstance(body, dict) and body.get("rules_only") is True
+
+async def generate_plan(app, record, rules_only=False):
+    """Plan for one JSON record, recording its session when it names a player
+
+    With rules_only no API request is made and the AI sections are only filled
+    in when the plan cache has them.
+    """
+    tennis_log = log_from_record(record)
+    workload = None
+    history = app["history"]
+    if history is not None and record.get("player_id"):
+        session_date = record_session_date(record)
+        player_id = str(record["player_id"])
+
+        def record_session():
+            history.append(player_id, session_date, tennis_log, if_new=True)
+            return history.workload(player_id, as_of=session_date + timedelta(days=1))
+
+        # SQLite calls block, so they run on a worker thread instead of the event loop
+        workload = await asyncio.to_thread(record_session)
+
+    if rules_only:
+        daily_plan = await app["evaluator"].start_daily_plan(tennis_log, workload, rules_only=True).aresult()
+    else:
+        async with openai_slot(app):
+            daily_plan = await app["evaluator"].create_daily_plan(tennis_log, workload=workload)
+
+    result = plan_to_dict(daily_plan, tennis_log)
+    if rules_only:
+        result["rules_only"] = True
+    for id_field in ("id", "player_id", "request_id"):
+        if id_field in record:
+            result[id_field] = record[id_field]
+    if workload is not None:
+        result["workload"] = {
+            "acute_load_7d": workload.acute_load,
+            "chronic_load_28d": workload.chronic_load,
+            "acute_chronic_ratio": workload.acute_chronic_ratio,
+            "band": workload.band
+        }
+    return result
+
+async def handle_plan(request):
+    record = await read_json(request)
+    if not isinstance(record, dict):
+        return bad_request("Body must be a training log object")
+    try:
+        return web.json_response(await generate_plan(request.app, record, rules_only_requested(request, record)))
+    except (ValueError, TypeError, AttributeError) as e:
+        return bad_request(str(e))
+
+async def handle_plan_batch(request):
+    body = await read_json(request)
+    records = body.get("records") if isinstance(body, dict) else None
+    if not isinstance(records, list):
+        return bad_request('Body must be {"records": [...]}')
+    if len(records) > request.app["max_batch"]:
+        return bad_request(f"At most {request.app['max_batch']} records per batch")
+    rules_only = rules_only_requested(request, body)
+
+    async def one(index, record):
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("Record must be a training log object")
+            return {"index": index, **await generate_plan(request.app, record, rules_only or rules_only_requested(request, record))}
+        except (ValueError, TypeError, AttributeError) as e:
+            return {"index": index, "error": str(e)}
+
+    results = await asyncio.gather(*(one(index, record) for index, record in enumerate(records)))
+    return web.json_response({
+        "results": results,
+        "summary": {
+            "records": len(results),
+            "invalid": sum(1 for result in results if "error" in result),
+            "fallback": sum(1 for result in results if result.get("is_fallback") and not result.get("rules_only")),
+            "rules": sum(1 for result in results if result.get("is_fallback") and result.get("rules_only"))
+        }
+    })
+
+async def handle_coach_ask(request):
+    body = await read_json(request)
+    if not isinstance(body, dict) or not str(body.get("question", "")).strip():
+        return bad_request('Body must include "plan" and a non-empty "question"')
+    try:
+        tennis_plan, tennis_log = plan_from_dict(body.get("plan"))
+    except (ValueError, TypeError, AttributeError) as e:
+        return bad_request(str(e))
+
+    # Stateless: the client sends earlier turns, which go through the token-budgeted memory
+    memory = ConversationMemory.from_env()
+    for turn in body.get("history") or []:
+        if isinstance(turn, dict) and turn.get("question") and turn.get("answer"):
+            memory.add_turn(str(turn["question"]), str(turn["answer"]))
+
+    coach_bot = AsyncTennisCoachBot(
+        tennis_plan, tennis_log, timeout=request.app["timeout"],
+        memory=memory, answer_cache=get_default_answer_cache(), traffic_recorder=get_default_traffic_recorder()
+    )
+    async with openai_slot(request.app):
+        answer = await coach_bot.ask_question(str(body["question"]))
+
+    stats = coach_bot.turn_stats[-1]
+    return web.json_response({
+        "answer": answer,
+        "cached": stats.cached,
+        "prompt_tokens": stats.prompt_tokens if stats.prompt_tokens is not None else stats.estimated_prompt_tokens,
+        "completion_tokens": stats.completion_tokens
+    })
+
+async def handle_healthz(request):
+    return web.json_response({"status": "ok", "pid": os.getpid()})
+
+async def handle_metrics(request):
+    """JSON by default; Prometheus text with ?format=prometheus"""
+    if request.query.get("format") == "prometheus":
+        return web.Response(text=get_metrics().render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = request.app
+    return web.json_response({
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.time() - app["started_at"], 1),
+        "in_flight": app["in_flight"],
+        **get_metrics().snapshot()
+    })
+
+def endpoint_stats(app):
+    return {path: metrics.snapshot() for path, metrics in app["metrics"].items()}
+
+async def on_startup(app):
+    # Created inside the server's event loop so it shares this loop's connection pool
+    app["evaluator"] = AsyncTennisTrainingEvaluator(
+        plan_cache=get_default_plan_cache(), timeout=app["timeout"], traffic_recorder=get_default_traffic_recorder()
+    )
+    app["limiter"] = asyncio.Semaphore(app["concurrency"])
+    app["in_flight"] = 0
+    get_metrics().register_collector("api", lambda: {"endpoints": endpoint_stats(app)})
+    if preconnect_enabled():
+        await apreconnect(connections=int(os.getenv('OPENAI_PRECONNECT_CONNECTIONS', 1)))
+
+async def on_cleanup(app):
+    await aclose_async_clients()
+
+def create_app(concurrency=DEFAULT_CONCURRENCY, timeout=None, max_batch=DEFAULT_MAX_BATCH):
+    """Build the aiohttp application"""
+    app = web.Application(middlewares=[metrics_middleware])
+    app["concurrency"] = concurrency
+    app["timeout"] = timeout
+    app["max_batch"] = max_batch
+    app["history"] = get_default_history_store()
+    app["metrics"] = {}
+    app["started_at"] = time.time()
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+
+    app.router.add_post("/v1/plans", handle_plan)
+    app.router.add_post("/v1/plans/batch", handle_plan_batch)
+    app.router.add_post("/v1/coach/ask", handle_coach_ask)
+    app.router.add_get("/healthz", handle_healthz)
+    app.router.add_get("/metrics", handle_metrics)
+    return app
+
+def serve(args):
+    """Run one server process"""
+    app = create_app(concurrency=args.concurrency, timeout=args.timeout, max_batch=args.max_batch)
+    web.run_app(app, host=args.host, port=args.port, reuse_port=args.workers > 1, print=None)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Tennis Training Evaluator HTTP JSON API")
+    parser.add_argument("--host", default=os.getenv('API_HOST', '127.0.0.1'), help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=int(os.getenv('API_PORT', DEFAULT_PORT)), help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=int(os.getenv('API_WORKERS', 1)), help="Server processes sharing the port (default: 1)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv('API_MAX_CONCURRENCY', DEFAULT_CONCURRENCY)), help="Maximum OpenAI-backed requests in flight per process")
+    parser.add_argument("--timeout", type=float, default=float(os.getenv('API_OPENAI_TIMEOUT')) if os.getenv('API_OPENAI_TIMEOUT') else None, help="Seconds to wait for OpenAI before serving the fallback")
+    parser.add_argument("--max-batch", type=int, default=int(os.getenv('API_MAX_BATCH', DEFAULT_MAX_BATCH)), help="Maximum records per batch request")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.workers = max(1, args.workers)
+    print(f"🎾 Tennis API listening on http://{args.host}:{args.port} ({args.workers} worker{'s' if args.workers > 1 else ''})", file=sys.stderr)
+
+    if args.workers == 1:
+        serve(args)
+        return 0
+
+    # SO_REUSEPORT lets the kernel spread connections across the worker processes
+    workers = [multiprocessing.Process(target=serve, args=(args,), daemon=True) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,34 @@
 import streamlit as st
 import os
 from dotenv import load_dotenv
-from training_evaluator import TennisTrainingEvaluator, TennisCoachBot, TennisTrainingLog
+from training_evaluator import (
+    TennisTrainingEvaluator, TennisCoachBot, TennisTrainingLog, TennisDailyPlan,
+    TENNIS_DRILLS, INTENSITY_LEVELS, FORM_RATINGS, FATIGUE_LEVELS
+)
+from plan_cache import get_default_plan_cache
+from training_history import get_default_history_store
+from answer_cache import get_default_answer_cache
+from traffic_capture import get_default_traffic_recorder
+from answer_prefetch import QUICK_QUESTIONS, get_default_prefetcher, prefetch_enabled
+from plan_jobs import get_default_job_manager
+from single_flight import single_flight_stats
+from openai_clients import connection_stats, preconnect_from_env
+from rate_limiter import get_default_rate_limiter
+from resilience import get_default_call_guard
+from metrics import get_metrics
+from model_routing import get_default_model_router
+from plan_records import plan_to_dict
 import json
+import time
+from collections import deque
+from datetime import date, timedelta
 
 # Load environment variables
 load_dotenv()
 
+# Open pooled OpenAI connections once per server process (opt-in via OPENAI_PRECONNECT)
+preconnect_from_env()
+
 # Configure Streamlit page
 st.set_page_config(
     page_title=os.getenv('STREAMLIT_PAGE_TITLE', 'Tennis Training Evaluator'),
@@ -15,9 +37,16 @@ st.set_page_config(
     initial_sidebar_state=os.getenv('STREAMLIT_SIDEBAR_STATE', 'expanded')
 )
 
-def main():
-    # Add custom CSS for better styling
-    st.markdown("""
+# Titles for the AI plan sections while they stream in
+AI_SECTION_TITLES = {
+    "todays_plan": "🎾 Today's Training Session Plan",
+    "daily_goals": "🎯 Daily Tennis Goals",
+    "warnings": "⚠️ Warnings & Precautions",
+    "rest_suggestions": "🛌 Recovery & Rest Suggestions"
+}
+
+# Custom CSS for better styling, built once per process
+APP_CSS = """
     <style>
     /* Adjust the main container for better layout */
     .main .block-container {
@@ -34,7 +63,81 @@ def main():
         margin-top: 1rem;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+# Plans remembered per session, keyed by TennisTrainingEvaluator.plan_key
+MAX_SESSION_PLANS = 20
+
+# Seconds between refreshes of a pending plan job
+PLAN_JOB_POLL_SECONDS = float(os.getenv('PLAN_JOB_POLL_SECONDS', 1))
+
+# Reruns kept for the sidebar timing readout
+RERUN_TIMING_WINDOW = 20
+
+@st.cache_resource
+def get_evaluator():
+    """One evaluator shared by every session"""
+    return TennisTrainingEvaluator(plan_cache=get_default_plan_cache(), traffic_recorder=get_default_traffic_recorder())
+
+def record_rerun_time(kind, seconds):
+    """Remember how long a full-page or fragment rerun took"""
+    timings = st.session_state.setdefault('rerun_timings', {})
+    timings.setdefault(kind, deque(maxlen=RERUN_TIMING_WINDOW)).append(seconds)
+
+def build_export_text(tennis_plan, tennis_log, date_str):
+    """Formatted text version of a tennis plan for download"""
+    export_text = f"""
+# TENNIS TRAINING PLAN
+Generated on: {date_str}
+
+## YESTERDAY'S TENNIS SESSION SUMMARY
+• Drills Practiced: {', '.join(tennis_log.drills_trained)}
+• Training Intensity: {tennis_log.intensity}
+• Form/Technique Rating: {tennis_log.form_rating}
+• Fatigue Level: {tennis_log.fatigue_level}
+
+## TENNIS-SPECIFIC RULE-BASED RECOMMENDATIONS
+Generated using proven tennis training principles:
+
+"""
+    
+    for i, suggestion in enumerate(tennis_plan.hardcoded_suggestions, 1):
+        export_text += f"{i}. {suggestion}\n"
+    
+    export_text += f"""
+## AI-POWERED TENNIS COACH RECOMMENDATIONS
+Generated using advanced tennis training analysis:
+
+### Today's Training Session Plan
+{tennis_plan.gpt_suggestions.get('todays_plan', 'No specific training plan generated.')}
+
+### Daily Tennis Goals
+{tennis_plan.gpt_suggestions.get('daily_goals', 'No specific daily goals generated.')}
+
+### Warnings & Precautions
+{tennis_plan.gpt_suggestions.get('warnings', 'No warnings available.')}
+
+### Recovery & Rest Suggestions
+{tennis_plan.gpt_suggestions.get('rest_suggestions', 'No specific recovery suggestions generated.')}
+
+## FULL AI TENNIS ANALYSIS
+{tennis_plan.raw_gpt_response}
+
+---
+Generated by Tennis Training Evaluator & Daily Planner
+🎾 Keep improving your game!
+"""
+    return export_text
+
+def main():
+    rerun_start = time.perf_counter()
+    try:
+        render_page()
+    finally:
+        record_rerun_time("page", time.perf_counter() - rerun_start)
+
+def render_page():
+    st.markdown(APP_CSS, unsafe_allow_html=True)
     
     # Initialize session state
     if 'tennis_plan' not in st.session_state:
@@ -47,6 +150,8 @@ def main():
         st.session_state.chat_history = []
     if 'coach_panel_open' not in st.session_state:
         st.session_state.coach_panel_open = False
+    if 'plans_by_key' not in st.session_state:
+        st.session_state.plans_by_key = {}
     
     # Main content (now uses full width)
     st.title("🎾 Tennis Training Evaluator & Daily Planner")
@@ -62,6 +167,7 @@ def main():
             st.error("🔑 OpenAI API Key not configured!")
             st.info("Please add your OpenAI API key to the .env file")
             st.code("OPENAI_API_KEY=your_actual_api_key_here")
+            st.caption("Rule-based plans work without it - tick ⚡ Rule-based plan only below")
         else:
             st.success("🔑 OpenAI API Key configured")
         
@@ -82,6 +188,66 @@ def main():
         st.write("**Intensity Levels:** Light, Moderate, Intense")
         st.write("**Form Ratings:** Poor, Average, Good, Excellent")
         st.write("**Fatigue Levels:** Low, Medium, High")
+        
+        st.subheader("👤 Player")
+        player_id = st.text_input(
+            "Player ID",
+            value="",
+            placeholder="Leave empty to skip history",
+            help="Sessions are saved per player to track your 7/28-day training load. Without a Player ID nothing is recorded."
+        ).strip()
+        
+        history = get_default_history_store()
+        if history is not None and player_id:
+            workload = history.workload(player_id)
+            if workload.sessions_28d:
+                ratio = workload.acute_chronic_ratio
+                st.metric("📊 Acute:Chronic Load", f"{ratio:.2f}" if ratio is not None else "N/A", workload.band, delta_color="off")
+                st.caption(f"7-day load {workload.acute_load:g} • 28-day load {workload.chronic_load:g} • {workload.sessions_28d} sessions in 4 weeks")
+        
+        if get_default_call_guard().circuit_open():
+            st.warning("⚠️ AI coaching is temporarily unavailable - plans use the rule-based recommendations until it recovers.")
+        
+        with st.expander("🔌 OpenAI Connection Pool"):
+            st.json(connection_stats())
+            st.json(get_default_rate_limiter().stats())
+            st.json(get_default_call_guard().stats())
+        
+        rules_only = st.checkbox(
+            "⚡ Rule-based plan only",
+            value=False,
+            help="Skip the AI coach sections for an instant plan (cached AI sections are still shown)"
+        )
+        
+        with st.expander("🧵 Plan Generation Jobs"):
+            st.json(get_default_job_manager().stats())
+            st.caption("Identical concurrent requests sharing one AI call")
+            st.json(single_flight_stats())
+        
+        answer_cache = get_default_answer_cache()
+        if answer_cache is not None:
+            prefetch_answers = st.checkbox(
+                "⚡ Prefetch quick-question answers",
+                value=prefetch_enabled(),
+                help="Ask TennisBot's quick questions in the background as soon as a plan is ready (uses extra API calls)"
+            )
+            with st.expander("⚡ TennisBot Answer Cache"):
+                st.json(answer_cache.stats())
+                if prefetch_answers:
+                    st.json(get_default_prefetcher().stats())
+        
+        with st.expander("📈 Plan & LLM Metrics"):
+            metrics_snapshot = get_metrics().snapshot()
+            st.json({"counters": metrics_snapshot["counters"], "histograms": metrics_snapshot["histograms"]})
+            st.caption("Model routing")
+            st.json(get_default_model_router().stats())
+        
+        with st.expander("⏱️ Rerun Timing"):
+            timings = st.session_state.get('rerun_timings', {})
+            if not timings:
+                st.caption("Timings appear after the first interaction.")
+            for kind, samples in timings.items():
+                st.caption(f"**{kind}**: last {samples[-1] * 1000:.1f} ms • avg {sum(samples) / len(samples) * 1000:.1f} ms over {len(samples)} reruns")
     
     # Main content area - Tennis-specific inputs
     st.header("🏆 Yesterday's Tennis Training Session")
@@ -91,7 +257,7 @@ def main():
     st.subheader("🎯 Drills Practiced")
     
     # Available tennis drills
-    available_drills = ["Forehand", "Backhand", "Serve", "Slice", "Dropshot", "Volley", "Return"]
+    available_drills = TENNIS_DRILLS
     
     drills_trained = st.multiselect(
         "Select all drills you practiced yesterday:",
@@ -106,21 +272,21 @@ def main():
     with col1:
         intensity = st.selectbox(
             "⚡ Training Intensity",
-            options=["Light", "Moderate", "Intense"],
+            options=INTENSITY_LEVELS,
             help="How intense was your overall training session?"
         )
     
     with col2:
         form_rating = st.selectbox(
             "📈 Form/Technique Rating", 
-            options=["Poor", "Average", "Good", "Excellent"],
+            options=FORM_RATINGS,
             help="How would you rate your form and technique during the session?"
         )
     
     with col3:
         fatigue_level = st.selectbox(
             "😴 Fatigue Level After Session",
-            options=["Low", "Medium", "High"],
+            options=FATIGUE_LEVELS,
             help="How tired did you feel after completing the session?"
         )
     
@@ -152,10 +318,14 @@ def main():
             except json.JSONDecodeError:
                 st.error("❌ Invalid JSON format")
     
+    # Prefetching asks the AI coach, which a rule-based plan only must not do
+    prefetch_plan_answers = answer_cache is not None and prefetch_answers and not rules_only
+    
     # Generate tennis daily plan
     if st.button("🚀 Generate Today's Tennis Plan", type="primary"):
-        if not api_key or api_key == 'your_openai_api_key_here':
-            st.error("Please configure your OpenAI API key first!")
+        st.session_state.plan_job_error = None
+        if not rules_only and (not api_key or api_key == 'your_openai_api_key_here'):
+            st.error("Please configure your OpenAI API key first, or choose a rule-based plan only!")
             return
         
         if not drills_trained:
@@ -170,25 +340,37 @@ def main():
             fatigue_level=fatigue_level
         )
         
-        st.session_state.tennis_log = tennis_log
+        # Record yesterday's session once per player and day, then read the rolling workload
+        workload = None
+        if history is not None and player_id:
+            yesterday = date.today() - timedelta(days=1)
+            history.append(player_id, yesterday, tennis_log, if_new=True)
+            workload = history.workload(player_id)
         
-        # Generate tennis plan
-        with st.spinner("🎾 Analyzing your tennis session and generating personalized recommendations..."):
-            evaluator = TennisTrainingEvaluator()
-            tennis_plan = evaluator.create_daily_plan(tennis_log)
-            st.session_state.tennis_plan = tennis_plan
-            
-            # Initialize TennisCoachBot
-            st.session_state.tennis_coach_bot = TennisCoachBot(tennis_plan, tennis_log)
-            st.session_state.chat_history = []
-            
-            # Auto scroll to daily plan section
-            st.session_state.show_plan = True
-        
-        st.success("✅ Your personalized tennis training plan is ready!")
-        st.info("🎾 TennisBot is now available! Click the button below to start chatting about your plan.")
-        st.balloons()
-
+        # A log already planned in this session reuses its AI sections right away
+        evaluator = get_evaluator()
+        plan_key = evaluator.plan_key(tennis_log, workload)
+        remembered = st.session_state.plans_by_key.get(plan_key)
+        if remembered is not None:
+            tennis_plan = TennisDailyPlan(
+                hardcoded_suggestions=evaluator.rule_suggestions(tennis_log, workload),
+                gpt_suggestions=remembered.gpt_suggestions,
+                raw_gpt_response=remembered.raw_gpt_response
+            )
+            activate_plan(tennis_plan, tennis_log, answer_cache, prefetch_plan_answers)
+        else:
+            # Generate in the background so the page stays usable while OpenAI responds
+            st.session_state.plan_job_id = get_default_job_manager().submit(evaluator, tennis_log, workload, rules_only=rules_only)
+            st.session_state.plan_job_key = plan_key
+    
+    # Poll the background plan job until it finishes
+    if st.session_state.get('plan_job_id') is not None:
+        render_plan_job(answer_cache, prefetch_plan_answers)
+    
+    # Set by the job fragment, which reruns the page so it stops polling; kept until the next plan
+    if st.session_state.get('plan_job_error'):
+        st.error(st.session_state.plan_job_error)
+    
     # Show Tennis Daily Plan section if generated
     if st.session_state.tennis_plan is not None:
         st.divider()
@@ -197,6 +379,11 @@ def main():
         tennis_plan = st.session_state.tennis_plan
         tennis_log = st.session_state.tennis_log
         
+        if st.session_state.pop('plan_ready_notice', False):
+            st.success("✅ Your personalized tennis training plan is ready!")
+            st.info("🎾 TennisBot is now available! Click the button below to start chatting about your plan.")
+            st.balloons()
+        
         # Tennis session summary
         st.subheader("📊 Yesterday's Tennis Session Summary")
         
@@ -231,6 +418,8 @@ def main():
         # AI-powered tennis recommendations
         st.subheader("🤖 AI-Powered Tennis Coach Recommendations")
         st.markdown("*Generated using advanced tennis training analysis*")
+        if tennis_plan.is_fallback and not tennis_plan.raw_gpt_response:
+            st.caption("⚡ Rule-based plan only - untick the sidebar option to include the AI coach sections")
         
         # Today's Tennis Plan - Full width
         st.markdown("### 🎾 Today's Training Session Plan")
@@ -268,155 +457,208 @@ def main():
         with st.expander("🔍 View Full AI Tennis Analysis"):
             st.text(tennis_plan.raw_gpt_response)
         
-        # Export functionality
-        st.divider()
-        st.subheader("📤 Export Your Tennis Plan")
-        
-        plan_date = st.date_input("Plan Date", value=None, key="plan_date_export")
-        
-        # Create a nicely formatted text version for tennis
-        date_str = plan_date.isoformat() if plan_date else "today"
-        
-        export_text = f"""
-# TENNIS TRAINING PLAN
-Generated on: {date_str}
+        # Export functionality - reruns on its own and only builds the text when asked
+        render_export_section(tennis_plan, tennis_log)
+    
+    # Tennis CoachBot toggle button and panel - reruns on its own
+    if st.session_state.tennis_coach_bot is not None:
+        render_coach_panel()
 
-## YESTERDAY'S TENNIS SESSION SUMMARY
-• Drills Practiced: {', '.join(tennis_log.drills_trained)}
-• Training Intensity: {tennis_log.intensity}
-• Form/Technique Rating: {tennis_log.form_rating}
-• Fatigue Level: {tennis_log.fatigue_level}
+def activate_plan(tennis_plan, tennis_log, answer_cache, prefetch_answers):
+    """Make a finished plan the session's current plan and start a fresh TennisBot chat"""
+    st.session_state.tennis_plan = tennis_plan
+    st.session_state.tennis_log = tennis_log
+    st.session_state.tennis_coach_bot = TennisCoachBot(
+        tennis_plan, tennis_log, answer_cache=answer_cache, traffic_recorder=get_default_traffic_recorder()
+    )
+    st.session_state.chat_history = []
+    st.session_state.export_requested = False
+    st.session_state.plan_ready_notice = True
+    
+    # Speculative answers belong to the previous plan - stop them, then start this plan's
+    if st.session_state.get('prefetch_job') is not None:
+        st.session_state.prefetch_job.cancel()
+        st.session_state.prefetch_job = None
+    if prefetch_answers:
+        st.session_state.prefetch_job = get_default_prefetcher().prefetch(tennis_plan, tennis_log, answer_cache)
 
-## TENNIS-SPECIFIC RULE-BASED RECOMMENDATIONS
-Generated using proven tennis training principles:
+@st.fragment(run_every=PLAN_JOB_POLL_SECONDS)
+def render_plan_job(answer_cache, prefetch_answers):
+    """Progress of the background plan job, refreshed on its own until the plan is ready"""
+    # A tick already scheduled before the job finished has nothing left to poll
+    if st.session_state.get('plan_job_id') is None:
+        return
+    
+    job = get_default_job_manager().get(st.session_state.plan_job_id)
+    if job is None or job.status == "failed":
+        # A full rerun drops this fragment; the page shows the error from session state
+        st.session_state.plan_job_id = None
+        st.session_state.plan_job_error = (
+            "❌ Plan generation was lost - please generate your plan again." if job is None
+            else f"❌ Plan generation failed: {job.error}"
+        )
+        st.rerun()
+    
+    if job.status == "done":
+        # Remember successful plans for this session, then show the full plan view
+        if not job.plan.is_fallback:
+            if len(st.session_state.plans_by_key) >= MAX_SESSION_PLANS:
+                st.session_state.plans_by_key.pop(next(iter(st.session_state.plans_by_key)))
+            st.session_state.plans_by_key[st.session_state.plan_job_key] = job.plan
+        st.session_state.plan_job_id = None
+        activate_plan(job.plan, job.tennis_log, answer_cache, prefetch_answers)
+        st.rerun()
+    
+    # The rule-based suggestions are ready at once - act on them while the AI sections stream in
+    st.subheader("🧠 Tennis-Specific Rule-Based Recommendations")
+    for i, suggestion in enumerate(job.hardcoded_suggestions, 1):
+        st.markdown(f"**{i}.** {suggestion}")
+    
+    st.subheader("🤖 Your AI Tennis Coach is writing today's plan...")
+    st.caption(f"🎾 {'Generating' if job.status == 'running' else 'Queued'} for {job.elapsed:.0f}s - you can keep using the page meanwhile")
+    sections = job.sections
+    for key, title in AI_SECTION_TITLES.items():
+        if key in sections:
+            st.markdown(f"**{title}**\n\n{sections[key]}")
+        else:
+            st.caption(f"⏳ {title}")
 
-"""
-        
-        for i, suggestion in enumerate(tennis_plan.hardcoded_suggestions, 1):
-            export_text += f"{i}. {suggestion}\n"
-        
-        export_text += f"""
-## AI-POWERED TENNIS COACH RECOMMENDATIONS
-Generated using advanced tennis training analysis:
+@st.fragment
+def render_export_section(tennis_plan, tennis_log):
+    """Plan export - the text is only built once the user asks for it"""
+    st.divider()
+    st.subheader("📤 Export Your Tennis Plan")
+    
+    plan_date = st.date_input("Plan Date", value=None, key="plan_date_export")
+    date_str = plan_date.isoformat() if plan_date else "today"
+    
+    if st.button("📄 Export Plan as Text", key="tennis_export"):
+        st.session_state.export_requested = True
+    
+    if st.session_state.get('export_requested'):
+        st.download_button(
+            label="🎾 Download Tennis Plan as Text",
+            data=build_export_text(tennis_plan, tennis_log, date_str),
+            file_name=f"tennis_training_plan_{date_str}.txt",
+            mime="text/plain"
+        )
+        # Same record layout as `cli_app.py batch`, so many downloads load with `cli_app.py export`
+        st.download_button(
+            label="📦 Download Plan & TennisBot Chat as JSON",
+            data=json.dumps({
+                "date": plan_date.isoformat() if plan_date else date.today().isoformat(),
+                **plan_to_dict(tennis_plan, tennis_log),
+                "chat_history": [{"question": q, "answer": a} for q, a in st.session_state.chat_history]
+            }, indent=2),
+            file_name=f"tennis_training_plan_{date_str}.json",
+            mime="application/json"
+        )
 
-### Today's Training Session Plan
-{tennis_plan.gpt_suggestions.get('todays_plan', 'No specific training plan generated.')}
+# Most recent conversations rendered by default; older ones only on request
+CHAT_HISTORY_VISIBLE = 10
 
-### Daily Tennis Goals
-{tennis_plan.gpt_suggestions.get('daily_goals', 'No specific daily goals generated.')}
+def toggle_coach_panel():
+    st.session_state.coach_panel_open = not st.session_state.coach_panel_open
 
-### Warnings & Precautions
-{tennis_plan.gpt_suggestions.get('warnings', 'No warnings available.')}
+def close_coach_panel():
+    st.session_state.coach_panel_open = False
 
-### Recovery & Rest Suggestions
-{tennis_plan.gpt_suggestions.get('rest_suggestions', 'No specific recovery suggestions generated.')}
+def ask_quick_question(question):
+    """Button callback - runs before the panel re-renders, so no extra rerun is needed"""
+    # If this answer is already being prefetched, wait for it instead of asking twice
+    if st.session_state.get('prefetch_job') is not None:
+        st.session_state.prefetch_job.wait(question, timeout=60)
+    answer = st.session_state.tennis_coach_bot.ask_question(question)
+    st.session_state.chat_history.append((question, answer))
 
-## FULL AI TENNIS ANALYSIS
-{tennis_plan.raw_gpt_response}
+def clear_chat_history():
+    st.session_state.chat_history = []
+    st.session_state.tennis_coach_bot.reset_conversation()
 
----
-Generated by Tennis Training Evaluator & Daily Planner
-🎾 Keep improving your game!
-"""
-        
-        st.download_button(
-            label="🎾 Download Tennis Plan as Text",
-            data=export_text,
-            file_name=f"tennis_training_plan_{date_str}.txt",
-            mime="text/plain"
-        )
-    
-    # Tennis CoachBot toggle button and panel
-    if st.session_state.tennis_coach_bot is not None:
+@st.fragment
+def render_coach_panel():
+    """TennisBot toggle, questions and chat history - interactions here rerun only this panel"""
+    fragment_start = time.perf_counter()
+    try:
         # Create a simple toggle button
-        if st.button("🎾 TennisBot - Your AI Tennis Coach", key="tennis_coach_toggle", help="Chat with your AI Tennis Coach"):
-            st.session_state.coach_panel_open = not st.session_state.coach_panel_open
-            st.rerun()
+        st.button("🎾 TennisBot - Your AI Tennis Coach", key="tennis_coach_toggle", help="Chat with your AI Tennis Coach", on_click=toggle_coach_panel)
         
         # TennisCoachBot panel (conditionally shown)
-        if st.session_state.coach_panel_open:
-            st.divider()
-            
-            # Clean header for the tennis chatbot section
-            col1, col2 = st.columns([10, 1])
-            with col1:
-                st.header("🎾 TennisBot - Your AI Tennis Coach")
-            with col2:
-                if st.button("✕", key="tennis_coach_close", help="Close TennisBot"):
-                    st.session_state.coach_panel_open = False
-                    st.rerun()
-            
-            st.markdown("Ask me anything about your tennis training plan!")
+        if not st.session_state.coach_panel_open:
+            return
+        
+        st.divider()
+        
+        # Clean header for the tennis chatbot section
+        col1, col2 = st.columns([10, 1])
+        with col1:
+            st.header("🎾 TennisBot - Your AI Tennis Coach")
+        with col2:
+            st.button("✕", key="tennis_coach_close", help="Close TennisBot", on_click=close_coach_panel)
+        
+        st.markdown("Ask me anything about your tennis training plan!")
+        
+        # Tennis-specific quick question buttons
+        st.subheader("🎾 Quick Tennis Questions")
+        
+        col1, col2 = st.columns(2)
+        for i, (label, question) in enumerate(QUICK_QUESTIONS):
+            with col1 if i < 2 else col2:
+                st.button(label, key=f"tennis_quick{i + 1}", use_container_width=True,
+                          on_click=ask_quick_question, args=(question,))
+        
+        # Custom tennis question input
+        st.subheader("❓ Ask Your Tennis Coach")
+        with st.form("tennis_coach_form"):
+            user_question = st.text_area(
+                "Your tennis question:",
+                placeholder="e.g., How can I improve my backhand consistency? Should I focus more on serves or returns?",
+                height=80,
+                label_visibility="collapsed",
+                key="tennis_question_input"
+            )
             
-            # Tennis-specific quick question buttons
-            st.subheader("🎾 Quick Tennis Questions")
+            submitted = st.form_submit_button("🎾 Ask TennisBot", use_container_width=True)
             
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("Why should I practice this drill again?", key="tennis_quick1", use_container_width=True):
-                    question = "Why should I practice this drill again?"
-                    answer = st.session_state.tennis_coach_bot.ask_question(question)
-                    st.session_state.chat_history.append((question, answer))
-                    st.rerun()
-                
-                if st.button("Can I skip my session tomorrow?", key="tennis_quick2", use_container_width=True):
-                    question = "Can I skip my tennis session tomorrow?"
-                    answer = st.session_state.tennis_coach_bot.ask_question(question)
-                    st.session_state.chat_history.append((question, answer))
-                    st.rerun()
+            if submitted and user_question.strip():
+                # Simple validation - only respond to actual questions
+                if len(user_question.strip()) > 2 and any(char in user_question.lower() for char in ['?', 'how', 'what', 'why', 'when', 'should', 'can', 'is', 'are']):
+                    with st.spinner("🎾 TennisBot is analyzing your question..."):
+                        answer = st.session_state.tennis_coach_bot.ask_question(user_question)
+                        st.session_state.chat_history.append((user_question, answer))
+                else:
+                    st.warning("Please ask a specific question about your tennis training plan.")
+        
+        # Display tennis chat history
+        if st.session_state.chat_history:
+            st.subheader("🎾 Tennis Coaching Conversation History")
             
-            with col2:
-                if st.button("What's my main focus for the next session?", key="tennis_quick3", use_container_width=True):
-                    question = "What's my main focus for the next tennis session?"
-                    answer = st.session_state.tennis_coach_bot.ask_question(question)
-                    st.session_state.chat_history.append((question, answer))
-                    st.rerun()
-                
-                if st.button("How can I improve my weak areas?", key="tennis_quick4", use_container_width=True):
-                    question = "How can I improve my weak areas in tennis?"
-                    answer = st.session_state.tennis_coach_bot.ask_question(question)
-                    st.session_state.chat_history.append((question, answer))
-                    st.rerun()
+            # Newest first; long histories only render the latest conversations unless asked
+            chat_history = st.session_state.chat_history
+            older = len(chat_history) - CHAT_HISTORY_VISIBLE
+            show_all = older > 0 and st.checkbox(f"Show {older} earlier conversations", key="tennis_show_all_history")
+            visible = len(chat_history) if show_all else CHAT_HISTORY_VISIBLE
             
-            # Custom tennis question input
-            st.subheader("❓ Ask Your Tennis Coach")
-            with st.form("tennis_coach_form"):
-                user_question = st.text_area(
-                    "Your tennis question:",
-                    placeholder="e.g., How can I improve my backhand consistency? Should I focus more on serves or returns?",
-                    height=80,
-                    label_visibility="collapsed",
-                    key="tennis_question_input"
-                )
-                
-                submitted = st.form_submit_button("🎾 Ask TennisBot", use_container_width=True)
-                
-                if submitted and user_question.strip():
-                    # Simple validation - only respond to actual questions
-                    if len(user_question.strip()) > 2 and any(char in user_question.lower() for char in ['?', 'how', 'what', 'why', 'when', 'should', 'can', 'is', 'are']):
-                        with st.spinner("🎾 TennisBot is analyzing your question..."):
-                            answer = st.session_state.tennis_coach_bot.ask_question(user_question)
-                            st.session_state.chat_history.append((user_question, answer))
-                            st.rerun()
-                    else:
-                        st.warning("Please ask a specific question about your tennis training plan.")
+            turn_stats = st.session_state.tennis_coach_bot.turn_stats
+            for turn in range(len(chat_history), max(0, len(chat_history) - visible), -1):
+                question, answer = chat_history[turn - 1]
+                with st.expander(f"Q{turn}: {question[:40]}..."):
+                    st.markdown(f"**You:** {question}")
+                    st.markdown("---")
+                    st.markdown(f"**TennisBot:** {answer}")
+                    if turn <= len(turn_stats):
+                        stats = turn_stats[turn - 1]
+                        if stats.cached:
+                            st.caption("⚡ Instant answer from the answer cache")
+                        else:
+                            prompt_tokens = stats.prompt_tokens if stats.prompt_tokens is not None else f"~{stats.estimated_prompt_tokens}"
+                            st.caption(f"🧮 Prompt tokens: {prompt_tokens} • {stats.history_messages} history messages")
             
-            # Display tennis chat history
-            if st.session_state.chat_history:
-                st.subheader("🎾 Tennis Coaching Conversation History")
-                
-                # Show all conversations in a clean format
-                for i, (question, answer) in enumerate(reversed(st.session_state.chat_history)):
-                    with st.expander(f"Q{len(st.session_state.chat_history)-i}: {question[:40]}..."):
-                        st.markdown(f"**You:** {question}")
-                        st.markdown("---")
-                        st.markdown(f"**TennisBot:** {answer}")
-                
-                if st.button("🗑️ Clear Chat History", key="tennis_clear", use_container_width=True):
-                    st.session_state.chat_history = []
-                    st.rerun()
-            else:
-                st.info("🎾 No conversations yet. Ask a tennis question above!")
+            st.button("🗑️ Clear Chat History", key="tennis_clear", use_container_width=True, on_click=clear_chat_history)
+        else:
+            st.info("🎾 No conversations yet. Ask a tennis question above!")
+    finally:
+        record_rerun_time("coach panel", time.perf_counter() - fragment_start)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
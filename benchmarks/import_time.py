@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark and regression check for the fast-start paths
+Runs each target in a fresh interpreter with `python -X importtime`, reports wall
+time, time spent importing and the slowest modules, and fails when a rule-only
+path pulls in a heavy dependency (openai, httpx, streamlit, pandas...).
+Run with: python benchmarks/import_time.py
+          python benchmarks/import_time.py --compare benchmarks/results/<old>-imports.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+# Interpreter arguments per target; each must start without any HEAVY_MODULES
+TARGETS = {
+    "rules": ["-c", (
+        "from training_evaluator import TennisTrainingEvaluator, TennisTrainingLog\n"
+        "log = TennisTrainingLog(['Serve', 'Volley'], 'Intense', 'Good', 'High')\n"
+        "TennisTrainingEvaluator().start_daily_plan(log, rules_only=True).result()"
+    )],
+    "rule_engine": ["-c", "import rule_engine"],
+    "cli_app": ["-c", "import cli_app"],
+    "cli_help": ["cli_app.py", "--help"],
+    "bulk_export": ["-c", "import bulk_export"]
+}
+TARGET_NAMES = tuple(TARGETS)
+
+# Loaded only once they are needed: with the first API call, Streamlit page or export
+HEAVY_MODULES = ("openai", "httpx", "asyncio", "streamlit", "pandas", "numpy", "pyarrow", "aiohttp")
+
+# Changes smaller than this are timing noise, whatever the relative threshold
+MIN_REGRESSION_MS = 15.0
+
+def parse_importtime(stderr):
+    """(top-level module -> cumulative ms, module -> self ms) from -X importtime output"""
+    top_level, self_ms = {}, {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        raw_name = fields[2][1:]
+        name = raw_name.strip()
+        self_ms[name] = int(fields[0]) / 1000
+        if not raw_name.startswith(" "):
+            top_level[name] = int(fields[1]) / 1000
+    return top_level, self_ms
+
+def run_target(args, env):
+    """One fresh interpreter run: (wall ms, top-level cumulative ms, self ms)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=REPO_DIR, env=env,
+                            capture_output=True, text=True)
+    wall = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit {result.returncode}")
+    top_level, self_ms = parse_importtime(result.stderr)
+    return wall, top_level, self_ms
+
+def measure(name, baseline, repeat, env):
+    """Median wall and import time of a target over `repeat` runs, beyond a bare interpreter"""
+    walls, imports = [], []
+    for _ in range(repeat):
+        wall, top_level, self_ms = run_target(TARGETS[name], env)
+        walls.append(wall)
+        imports.append(sum(ms for module, ms in top_level.items() if module not in baseline["modules"]))
+
+    modules = set(self_ms) - baseline["modules"]
+    slowest = sorted(((module, ms) for module, ms in self_ms.items() if module in modules), key=lambda item: -item[1])
+    return {
+        "wall_ms": round(statistics.median(walls), 1),
+        "startup_overhead_ms": round(statistics.median(walls) - baseline["wall_ms"], 1),
+        "import_ms": round(statistics.median(imports), 1),
+        "modules": len(modules),
+        "heavy_modules": sorted(module for module in HEAVY_MODULES if module in modules),
+        "slowest": [[module, round(ms, 2)] for module, ms in slowest[:10]]
+    }
+
+def measure_baseline(repeat, env):
+    walls, modules = [], set()
+    for _ in range(repeat):
+        wall, _, self_ms = run_target(["-c", "pass"], env)
+        walls.append(wall)
+        modules |= set(self_ms)
+    return {"wall_ms": statistics.median(walls), "modules": modules}
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, previous, threshold):
+    """Print per-target import time deltas; returns the targets that regressed"""
+    regressions = []
+    print(f"\n{'target':<12} {'import ms':<28} wall ms", file=sys.stderr)
+    for name, result in current["targets"].items():
+        before = previous.get("targets", {}).get(name)
+        if before is None:
+            continue
+        delta = result["import_ms"] - before["import_ms"]
+        change = delta / before["import_ms"] if before["import_ms"] else 0.0
+        print(f"{name:<12} {before['import_ms']:>7} → {result['import_ms']:<7} ({change:+.0%})"
+              f"       {before['wall_ms']:>7} → {result['wall_ms']}", file=sys.stderr)
+        if change > threshold and delta > MIN_REGRESSION_MS:
+            regressions.append(name)
+    return regressions
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Measure and check import time of the fast-start paths")
+    parser.add_argument("--targets", default=",".join(TARGET_NAMES), help=f"Comma-separated subset of {', '.join(TARGET_NAMES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreter runs per target; the median is reported (default: 5)")
+    parser.add_argument("--budget-ms", type=float, help="Fail when a target spends longer than this importing")
+    parser.add_argument("-o", "--output", help="Results file (default: benchmarks/results/<commit>-imports.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help=f"Relative import time increase counted as a regression, if also above {MIN_REGRESSION_MS:g} ms (default: 0.25)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    targets = [name.strip() for name in args.targets.split(",") if name.strip()]
+    unknown = [name for name in targets if name not in TARGETS]
+    if unknown:
+        print(f"❌ Unknown targets: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    repeat = max(1, args.repeat)
+
+    # Compile bytecode first so the first measured run does not pay for it
+    try:
+        for name in targets:
+            run_target(TARGETS[name], env)
+        baseline = measure_baseline(repeat, env)
+    except RuntimeError as e:
+        print(f"❌ {name} failed to start: {e}", file=sys.stderr)
+        return 1
+
+    results, failures = {}, []
+    for name in targets:
+        results[name] = result = measure(name, baseline, repeat, env)
+        print(f"⏱️ {name}: {result['import_ms']} ms importing {result['modules']} modules, "
+              f"{result['wall_ms']} ms wall ({result['startup_overhead_ms']:+} ms over a bare interpreter)", file=sys.stderr)
+        if result["heavy_modules"]:
+            failures.append(f"{name} imports {', '.join(result['heavy_modules'])}")
+        if args.budget_ms is not None and result["import_ms"] > args.budget_ms:
+            failures.append(f"{name} spends {result['import_ms']} ms importing (budget {args.budget_ms:g} ms)")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "baseline_wall_ms": round(baseline["wall_ms"], 1),
+        "targets": results
+    }
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{(commit or 'unknown')[:12]}-imports.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results saved to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        regressions = compare(report, previous, args.threshold)
+        failures += [f"{name} import time regressed beyond {args.threshold:.0%}" for name in regressions]
+
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
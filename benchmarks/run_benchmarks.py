@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for plan generation, TennisBot Q&A and batch mode
+Starts benchmarks/stub_server.py as a local OpenAI-compatible API and drives the real
+code paths at a fixed concurrency, reporting throughput, p50/p95/p99 latency and memory.
+Results are saved as JSON tagged with the git commit so runs can be compared.
+Run with: python benchmarks/run_benchmarks.py --requests 200 --concurrency 16
+          python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from stub_server import start_stub_process, stub_requests
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+SCENARIOS = ("plan", "plan_stream", "coach", "batch")
+
+COACH_QUESTIONS = [
+    "How long should I warm up today?",
+    "Should I still serve if my shoulder feels tight?",
+    "What drill helps my backhand the most?",
+    "How many rest days do I need this week?",
+    "Can I play a match tomorrow?",
+    "What should I eat before training?"
+]
+
+def make_records(count, seed):
+    """Deterministic mix of training logs; some repeat, as real traffic does"""
+    from training_evaluator import TENNIS_DRILLS, INTENSITY_LEVELS, FORM_RATINGS, FATIGUE_LEVELS
+
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "drills_trained": rng.sample(TENNIS_DRILLS, rng.randint(1, 3)),
+            "intensity": rng.choice(INTENSITY_LEVELS),
+            "form_rating": rng.choice(FORM_RATINGS),
+            "fatigue_level": rng.choice(FATIGUE_LEVELS)
+        }
+        for i in range(count)
+    ]
+
+def summarize(latencies, elapsed, requests):
+    from plan_records import percentile
+
+    latencies = sorted(latencies)
+    return {
+        "requests": requests,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99": round(percentile(latencies, 0.99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            "mean": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0
+        }
+    }
+
+def run_threaded(fn, items, concurrency):
+    """Call fn(item) from `concurrency` threads; returns (latencies, results, elapsed)"""
+    def timed(item):
+        t0 = time.perf_counter()
+        result = fn(item)
+        return time.perf_counter() - t0, result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = list(executor.map(timed, items))
+    elapsed = time.perf_counter() - start
+    return [latency for latency, _ in timings], [result for _, result in timings], elapsed
+
+def bench_plan(args, records, plan_cache):
+    from plan_records import log_from_record
+    from training_evaluator import TennisTrainingEvaluator
+
+    evaluator = TennisTrainingEvaluator(plan_cache=plan_cache)
+    latencies, plans, elapsed = run_threaded(
+        lambda record: evaluator.create_daily_plan(log_from_record(record)), records, args.concurrency
+    )
+    return {**summarize(latencies, elapsed, len(records)), "fallbacks": sum(plan.is_fallback for plan in plans)}
+
+def bench_plan_stream(args, records, plan_cache):
+    """Streamed plans, also timing the first completed section"""
+    from plan_records import log_from_record, percentile
+    from training_evaluator import TennisTrainingEvaluator
+
+    evaluator = TennisTrainingEvaluator(plan_cache=plan_cache)
+    first_section = []
+
+    def stream(record):
+        t0 = time.perf_counter()
+        seen = []
+
+        def on_section(key, content):
+            if not seen:
+                first_section.append(time.perf_counter() - t0)
+            seen.append(key)
+
+        return evaluator.create_daily_plan(log_from_record(record), on_section=on_section)
+
+    latencies, plans, elapsed = run_threaded(stream, records, args.concurrency)
+    first_section.sort()
+    return {
+        **summarize(latencies, elapsed, len(records)),
+        "fallbacks": sum(plan.is_fallback for plan in plans),
+        "first_section_ms": {
+            "p50": round(percentile(first_section, 0.50) * 1000, 1),
+            "p95": round(percentile(first_section, 0.95) * 1000, 1)
+        }
+    }
+
+def bench_coach(args, records, answer_cache):
+    """One question per request against a shared plan, each from a fresh chat"""
+    from plan_records import log_from_record
+    from training_evaluator import TennisCoachBot, TennisTrainingEvaluator
+    from conversation_memory import ConversationMemory
+
+    tennis_log = log_from_record(records[0])
+    tennis_plan = TennisTrainingEvaluator(plan_cache=None).create_daily_plan(tennis_log)
+    fallback_prefix = TennisCoachBot._fallback_answer(None, Exception()).split(" Error:")[0]
+
+    def ask(question):
+        bot = TennisCoachBot(tennis_plan, tennis_log, memory=ConversationMemory.from_env(), answer_cache=answer_cache)
+        return bot.ask_question(question).startswith(fallback_prefix)
+
+    questions = [COACH_QUESTIONS[i % len(COACH_QUESTIONS)] for i in range(len(records))]
+    latencies, fallbacks, elapsed = run_threaded(ask, questions, args.concurrency)
+    return {**summarize(latencies, elapsed, len(questions)), "fallbacks": sum(fallbacks)}
+
+def bench_batch(args, records, plan_cache):
+    """cli_app.run_batch over in-memory JSONL with the async evaluator"""
+    from cli_app import run_batch
+    from openai_clients import aclose_async_clients
+    from training_evaluator import AsyncTennisTrainingEvaluator
+
+    lines = [json.dumps(record) + "\n" for record in records]
+    out = io.StringIO()
+
+    async def run():
+        evaluator = AsyncTennisTrainingEvaluator(plan_cache=plan_cache)
+        try:
+            return await run_batch(lines, out, evaluator, concurrency=args.concurrency)
+        finally:
+            await aclose_async_clients()
+
+    summary = asyncio.run(run())
+    return {
+        "requests": summary["records"],
+        "elapsed_seconds": summary["elapsed_seconds"],
+        "throughput_rps": summary["plans_per_second"],
+        "latency_ms": summary["latency_ms"],
+        "fallbacks": summary["fallback"]
+    }
+
+def peak_rss_mb():
+    """Process peak resident set size (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+def run_scenario(name, args, base_url, records, tmpdir):
+    from plan_cache import PlanCache
+    from answer_cache import AnswerCache
+
+    plan_cache = PlanCache(path=os.path.join(tmpdir, f"{name}.sqlite3")) if args.cache else None
+    answer_cache = AnswerCache() if args.cache else None
+    bench = {"plan": bench_plan, "plan_stream": bench_plan_stream, "coach": bench_coach, "batch": bench_batch}[name]
+
+    upstream_before = stub_requests(base_url)
+    if args.tracemalloc:
+        tracemalloc.start()
+    result = bench(args, records, answer_cache if name == "coach" else plan_cache)
+    if args.tracemalloc:
+        result["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+    result["upstream_requests"] = stub_requests(base_url) - upstream_before
+    result["peak_rss_mb"] = peak_rss_mb()
+    result["concurrency"] = args.concurrency
+
+    if plan_cache is not None:
+        plan_cache.close()
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, previous, threshold):
+    """Print per-scenario deltas; returns the scenarios that regressed by more than threshold"""
+    regressions = []
+    print(f"\n{'scenario':<12} {'req/s':<25} {'p95 ms':<28} peak RSS MB")
+    for name, result in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        rps_change = _change(result["throughput_rps"], before["throughput_rps"])
+        p95_change = _change(result["latency_ms"]["p95"], before["latency_ms"]["p95"])
+        print(f"{name:<12} {before['throughput_rps']:>7} → {result['throughput_rps']:<7} ({rps_change:+.0%})"
+              f" {before['latency_ms']['p95']:>8} → {result['latency_ms']['p95']:<8} ({p95_change:+.0%})"
+              f" {before['peak_rss_mb']:>6} → {result['peak_rss_mb']:<6}")
+        if rps_change < -threshold or p95_change > threshold:
+            regressions.append(name)
+    return regressions
+
+def _change(new, old):
+    return (new - old) / old if old else 0.0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the tennis planner against a local OpenAI stub")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per scenario (default: 100)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests (default: 16)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub mean response time in seconds (default: 0.3)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Stub +/- jitter in seconds (default: 0.1)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub responses that are 429/500 errors")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the generated logs and the stub (default: 42)")
+    parser.add_argument("--cache", action="store_true", help="Enable the plan and answer caches (off by default)")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report Python heap peaks (slows the run)")
+    parser.add_argument("-o", "--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative throughput drop / p95 increase counted as a regression (default: 0.10)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        print(f"❌ Unknown scenarios: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    process, base_url = start_stub_process(args.latency, args.jitter, args.error_rate, args.seed)
+    # Point the shared OpenAI clients at the stub before any repo module is imported;
+    # load_dotenv() does not override variables that are already set
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ["OPENAI_PRECONNECT"] = "false"
+    sys.path.insert(0, REPO_DIR)
+
+    try:
+        records = make_records(args.requests, args.seed)
+        results = {}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in scenarios:
+                print(f"🏃 {name}: {args.requests} requests at concurrency {args.concurrency}...", file=sys.stderr)
+                results[name] = run_scenario(name, args, base_url, records, tmpdir)
+                latency = results[name]["latency_ms"]
+                print(f"   {results[name]['throughput_rps']} req/s, p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+                      f"p99 {latency['p99']} ms, {results[name]['fallbacks']} fallbacks", file=sys.stderr)
+    finally:
+        process.terminate()
+        process.wait()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+            "cache": args.cache
+        },
+        "scenarios": results
+    }
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{(commit or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results saved to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        if previous.get("config") != report["config"]:
+            print("⚠️ Benchmark configurations differ - deltas may not be comparable", file=sys.stderr)
+        regressions = compare(report, previous, args.threshold)
+        if regressions:
+            print(f"❌ Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub server for benchmarks
+Serves POST /v1/chat/completions (JSON or SSE streaming) with configurable latency,
+jitter and error rate, answering plan prompts with section-formatted text.
+Run with: python benchmarks/stub_server.py --port 8765 --latency 0.5 --jitter 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+
+from aiohttp import web
+
+PLAN_RESPONSE = """TODAYS_PLAN: 20 minutes of cross-court forehand and backhand rallies at moderate pace, then 15 minutes of serve practice focusing on toss consistency and 10 minutes of split-step footwork drills.
+
+DAILY_GOALS: 1. Land 70% of first serves in the deuce box. 2. Keep rallies above 10 shots. 3. Recover to the centre mark after every shot. 4. Finish with a 5-minute cool-down.
+
+WARNINGS: Yesterday's intensity was high - stop if shoulder or wrist pain appears, and avoid maximum-effort serves today.
+
+REST_SUGGESTIONS: Stretch hamstrings, hip flexors and shoulders for 10 minutes, hydrate well and get at least 8 hours of sleep."""
+
+COACH_RESPONSE = ("Focus on the drills in today's plan at the suggested intensity. Keep the session short if you still "
+                  "feel tired, prioritise clean technique over power, and use the cool-down to loosen your shoulders.")
+
+ERROR_TYPES = {429: "rate_limit_exceeded", 500: "server_error", 503: "service_unavailable"}
+
+def completion_text(messages):
+    """Plan prompts ask for the TODAYS_PLAN sections; everything else is a coach question"""
+    prompt = " ".join(str(message.get("content", "")) for message in messages)
+    return PLAN_RESPONSE if "TODAYS_PLAN" in prompt else COACH_RESPONSE
+
+def approx_tokens(text):
+    return max(1, len(text) // 4)
+
+def create_app(latency=0.5, jitter=0.0, error_rate=0.0, error_statuses=(429, 500), chunk_chars=24, seed=None):
+    """Build the stub application; latency and jitter are in seconds"""
+    rng = random.Random(seed)
+    stats = {"requests": 0, "streams": 0, "errors": 0}
+
+    def delay():
+        return max(0.0, latency + rng.uniform(-jitter, jitter))
+
+    async def chat_completions(request):
+        stats["requests"] += 1
+        body = await request.json()
+        messages = body.get("messages", [])
+
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            status = rng.choice(list(error_statuses))
+            await asyncio.sleep(delay() * 0.1)
+            headers = {"retry-after": "0.1"} if status == 429 else {}
+            return web.json_response(
+                {"error": {"message": f"Stub error {status}", "type": ERROR_TYPES.get(status, "server_error")}},
+                status=status, headers=headers
+            )
+
+        text = completion_text(messages)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "gpt-3.5-turbo")
+        prompt_tokens = approx_tokens(" ".join(str(message.get("content", "")) for message in messages))
+        completion_tokens = approx_tokens(text)
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay())
+            return web.json_response({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens}
+            })
+
+        # SSE stream with the latency spread evenly over the chunks
+        stats["streams"] += 1
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        pause = delay() / max(1, len(chunks))
+        for index, piece in enumerate(chunks):
+            await asyncio.sleep(pause)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece} if index else {"role": "assistant", "content": piece},
+                             "finish_reason": None}]
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        final = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        await response.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        await response.write_eof()
+        return response
+
+    async def healthz(request):
+        return web.json_response({"status": "ok", **stats})
+
+    async def root(request):
+        # Target of the clients' pre-connect HEAD requests
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_get("/healthz", healthz)
+    app.router.add_route("*", "/v1", root)
+    app.router.add_route("*", "/", root)
+    return app
+
+def start_stub_process(latency=0.5, jitter=0.0, error_rate=0.0, seed=None, startup_timeout=15.0):
+    """Run the stub in a subprocess on a free port; returns (process, base_url) once it answers /healthz"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        "--port", str(port),
+        "--latency", str(latency),
+        "--jitter", str(jitter),
+        "--error-rate", str(error_rate)
+    ]
+    if seed is not None:
+        command += ["--seed", str(seed)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("stub server exited during startup (is aiohttp installed?)")
+        try:
+            with urllib.request.urlopen(f"{base_url}/healthz", timeout=1):
+                return process, base_url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"stub server did not start within {startup_timeout:g} seconds")
+
+def stub_requests(base_url):
+    """Chat completion requests a running stub has served so far"""
+    with urllib.request.urlopen(f"{base_url}/healthz", timeout=5) as response:
+        return json.loads(response.read())["requests"]
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean response time in seconds (default: 0.5)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter in seconds (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error (default: 0)")
+    parser.add_argument("--error-statuses", default="429,500", help="Comma-separated error statuses to pick from (default: 429,500)")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible jitter and errors")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    app = create_app(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(status) for status in args.error_statuses.split(",") if status),
+        seed=args.seed
+    )
+    print(f"🧪 Stub OpenAI server on http://{args.host}:{args.port}/v1 (latency {args.latency}s ± {args.jitter}s, "
+          f"error rate {args.error_rate:.1%})", file=sys.stderr)
+    web.run_app(app, host=args.host, port=args.port, print=None, access_log=None)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
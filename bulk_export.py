@@ -0,0 +1,304 @@
+"""
+Bulk columnar export of daily plans, training logs and TennisBot transcripts
+Streams plan records (batch/API JSONL output and saved plan JSON files), their
+TennisBot chats and the training history database into one table file each -
+Parquet when pyarrow is installed, CSV otherwise - written through pandas in
+fixed-size chunks, so memory stays flat however many rows are exported.
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_CHUNK_ROWS = 10_000
+
+# Column name -> type of every exported table, fixed so each chunk has the same schema
+PLAN_COLUMNS = {
+    "source": "string",
+    "record_id": "string",
+    "player_id": "string",
+    "date": "string",
+    "drills_trained": "string",
+    "drill_count": "int",
+    "intensity": "string",
+    "form_rating": "string",
+    "fatigue_level": "string",
+    "is_fallback": "bool",
+    "rule_suggestions": "string",
+    "todays_plan": "string",
+    "daily_goals": "string",
+    "warnings": "string",
+    "rest_suggestions": "string",
+    "full_ai_response": "string",
+    "acute_chronic_ratio": "float",
+    "workload_band": "string",
+    "latency_ms": "float",
+    "chat_turns": "int"
+}
+CHAT_COLUMNS = {
+    "source": "string",
+    "record_id": "string",
+    "player_id": "string",
+    "date": "string",
+    "turn": "int",
+    "question": "string",
+    "answer": "string"
+}
+SESSION_COLUMNS = {
+    "player_id": "string",
+    "session_date": "string",
+    "drills_trained": "string",
+    "drill_count": "int",
+    "intensity": "string",
+    "form_rating": "string",
+    "fatigue_level": "string",
+    "load": "float"
+}
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def resolve_format(fmt: str) -> str:
+    """"parquet" or "csv" for a requested format ("auto" picks Parquet when pyarrow is installed)"""
+    if fmt == "auto":
+        return "parquet" if parquet_available() else "csv"
+    if fmt == "parquet" and not parquet_available():
+        raise ValueError("Parquet export needs pyarrow - install it or use --format csv")
+    if fmt not in ("parquet", "csv"):
+        raise ValueError(f"Unknown export format {fmt!r}")
+    return fmt
+
+class TableWriter:
+    """Appends rows to one Parquet or CSV file, flushing every chunk_rows rows"""
+
+    def __init__(self, path: str, columns: Dict[str, str], fmt: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self.chunk_rows = max(1, chunk_rows)
+        self.rows = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer = None  # pyarrow.parquet.ParquetWriter or CSV file, opened on the first flush
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._buffer.append(row)
+        if len(self._buffer) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows as one Parquet row group or CSV block"""
+        import pandas as pd
+
+        if not self._buffer:
+            return
+        frame = pd.DataFrame.from_records(self._buffer, columns=list(self.columns))
+        for column, kind in self.columns.items():
+            if kind == "int":
+                frame[column] = frame[column].astype("Int64")
+            elif kind == "float":
+                frame[column] = frame[column].astype("float64")
+            elif kind == "bool":
+                frame[column] = frame[column].astype("boolean")
+
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = self._arrow_schema()
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, schema)
+            self._writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+        else:
+            first = self._writer is None
+            if first:
+                self._writer = open(self.path, "w", newline="")
+            frame.to_csv(self._writer, header=first, index=False)
+
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> None:
+        """Flush the remaining rows; a table without rows still gets its header or schema"""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+        elif self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(self._arrow_schema().empty_table(), self.path)
+        else:
+            with open(self.path, "w") as f:
+                f.write(",".join(self.columns) + "\n")
+
+    def _arrow_schema(self) -> Any:
+        import pyarrow as pa
+
+        types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_()}
+        return pa.schema([(column, types[kind]) for column, kind in self.columns.items()])
+
+def iter_plan_files(paths: Iterable[str]) -> Iterator[str]:
+    """Expand directories to the .json/.jsonl files directly inside them, in name order"""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith((".json", ".jsonl")):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+def iter_plan_records(paths: Iterable[str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Yield (source file, record) for every plan record; unparseable lines yield (source, None)
+
+    .json files hold one document (a saved plan); anything else is read as JSONL
+    one line at a time.
+    """
+    for path in iter_plan_files(paths):
+        source = os.path.basename(path)
+        with open(path) as f:
+            if path.endswith(".json"):
+                try:
+                    yield source, json.load(f)
+                except json.JSONDecodeError:
+                    yield source, None
+                continue
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield source, json.loads(line)
+                except json.JSONDecodeError:
+                    yield source, None
+
+def plan_rows(source: str, record: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Flatten one plan record into its plan row and chat rows
+
+    Accepts the plan dicts written by cli_app batch, /v1/plans and save_plan_to_file,
+    and /v1/coach/ask style {"plan": ..., "history": [...]} bodies. Raises ValueError
+    for anything else.
+    """
+    chat = record.get("chat_history") or record.get("history") or []
+    plan = record["plan"] if isinstance(record.get("plan"), dict) else record
+    session = plan.get("yesterday_session")
+    if not isinstance(session, dict) or "error" in record:
+        raise ValueError("not a plan record")
+
+    ai = plan.get("ai_suggestions") or {}
+    workload = record.get("workload") or plan.get("workload") or {}
+    drills = [str(drill) for drill in session.get("drills_trained") or []]
+    identity = {
+        "source": source,
+        "record_id": _text(record.get("id", record.get("request_id", plan.get("id")))),
+        "player_id": _text(record.get("player_id", plan.get("player_id"))),
+        "date": _text(record.get("date", plan.get("date")))
+    }
+    turns = [
+        turn for turn in (chat if isinstance(chat, list) else [])
+        if isinstance(turn, dict) and turn.get("question")
+    ]
+
+    row = {
+        **identity,
+        "drills_trained": ", ".join(drills),
+        "drill_count": len(drills),
+        "intensity": _text(session.get("intensity")),
+        "form_rating": _text(session.get("form_rating")),
+        "fatigue_level": _text(session.get("fatigue_level")),
+        "is_fallback": bool(plan.get("is_fallback", False)),
+        "rule_suggestions": "\n".join(str(suggestion) for suggestion in plan.get("hardcoded_suggestions") or []),
+        "todays_plan": _text(ai.get("todays_plan")),
+        "daily_goals": _text(ai.get("daily_goals")),
+        "warnings": _text(ai.get("warnings")),
+        "rest_suggestions": _text(ai.get("rest_suggestions")),
+        "full_ai_response": _text(plan.get("full_ai_response")),
+        "acute_chronic_ratio": workload.get("acute_chronic_ratio") if isinstance(workload, dict) else None,
+        "workload_band": _text(workload.get("band")) if isinstance(workload, dict) else None,
+        "latency_ms": record.get("latency_ms"),
+        "chat_turns": len(turns)
+    }
+    chats = [
+        {**identity, "turn": index, "question": str(turn["question"]), "answer": _text(turn.get("answer"))}
+        for index, turn in enumerate(turns, 1)
+    ]
+    return row, chats
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+def export(plan_paths: Iterable[str], out_dir: str, history: Optional[Any] = None, fmt: str = "auto",
+           chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Dict[str, Any]:
+    """Export plan records (and their chats) and, given a TrainingHistoryStore, every stored session
+
+    Writes plans, chats and sessions tables to out_dir and returns a summary.
+    """
+    fmt = resolve_format(fmt)
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    extension = "parquet" if fmt == "parquet" else "csv"
+
+    def writer(table: str, columns: Dict[str, str]) -> TableWriter:
+        return TableWriter(os.path.join(out_dir, f"{table}.{extension}"), columns, fmt, chunk_rows)
+
+    writers = {"plans": writer("plans", PLAN_COLUMNS), "chats": writer("chats", CHAT_COLUMNS)}
+    if history is not None:
+        writers["sessions"] = writer("sessions", SESSION_COLUMNS)
+
+    skipped = 0
+    try:
+        for source, record in iter_plan_records(plan_paths):
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("not a JSON object")
+                row, chats = plan_rows(source, record)
+            except (ValueError, TypeError, AttributeError, KeyError):
+                skipped += 1
+                continue
+            writers["plans"].write(row)
+            for chat in chats:
+                writers["chats"].write(chat)
+
+        if history is not None:
+            for session in history.iter_sessions(batch_size=chunk_rows):
+                writers["sessions"].write({
+                    **session,
+                    "drills_trained": ", ".join(session["drills_trained"]),
+                    "drill_count": len(session["drills_trained"])
+                })
+    finally:
+        for table_writer in writers.values():
+            table_writer.close()
+
+    return {
+        "format": fmt,
+        "files": {table: table_writer.path for table, table_writer in writers.items()},
+        "rows": {table: table_writer.rows for table, table_writer in writers.items()},
+        "skipped_records": skipped,
+        "elapsed_seconds": round(time.perf_counter() - start, 3)
+    }
+
+def export_main(args) -> int:
+    """Run the cli_app export command from parsed command line arguments"""
+    history = None
+    if args.history:
+        if not os.path.exists(args.history):
+            print(f"❌ Training history database {args.history} not found", file=sys.stderr)
+            return 1
+        from training_history import TrainingHistoryStore
+        history = TrainingHistoryStore(args.history)
+
+    try:
+        summary = export(args.inputs, args.output, history=history, fmt=args.format, chunk_rows=args.chunk_rows)
+    except (OSError, ValueError) as e:
+        print(f"❌ Export failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if history is not None:
+            history.close()
+
+    print(f"✅ Export complete: {json.dumps(summary)}", file=sys.stderr)
+    return 0
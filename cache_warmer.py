@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Offline plan cache warmer
+Precomputes daily plans for every possible tennis training log (or the most
+frequent logs from a traffic file) so peak-hour requests are served from cache.
+Run with: python cache_warmer.py --help
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+from training_evaluator import (
+    TennisTrainingEvaluator, TennisTrainingLog, normalize_tennis_log,
+    TENNIS_DRILLS, INTENSITY_LEVELS, FORM_RATINGS, FATIGUE_LEVELS
+)
+from plan_cache import PlanCache
+
+def enumerate_all_logs() -> Iterator[TennisTrainingLog]:
+    """Yield every distinct training log: each non-empty drill subset times every enum combination"""
+    for size in range(1, len(TENNIS_DRILLS) + 1):
+        for drills in itertools.combinations(TENNIS_DRILLS, size):
+            for intensity, form_rating, fatigue_level in itertools.product(INTENSITY_LEVELS, FORM_RATINGS, FATIGUE_LEVELS):
+                yield TennisTrainingLog(
+                    drills_trained=list(drills),
+                    intensity=intensity,
+                    form_rating=form_rating,
+                    fatigue_level=fatigue_level
+                )
+
+def top_logs_from_traffic(path: str, top_n: int) -> List[TennisTrainingLog]:
+    """Return the top_n most frequent normalized logs in a JSONL traffic file"""
+    counts: Counter = Counter()
+    logs: Dict[tuple, TennisTrainingLog] = {}
+
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+                # Captured TennisBot questions (traffic_capture) repeat a log without requesting a plan
+                if data.get("kind", "plan") != "plan":
+                    continue
+                data = data.get("log", data)
+                log = normalize_tennis_log(TennisTrainingLog(
+                    drills_trained=data['drills_trained'],
+                    intensity=data['intensity'],
+                    form_rating=data['form_rating'],
+                    fatigue_level=data['fatigue_level']
+                ))
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                continue
+
+            identity = (tuple(log.drills_trained), log.intensity, log.form_rating, log.fatigue_level)
+            counts[identity] += 1
+            logs.setdefault(identity, log)
+
+    return [logs[identity] for identity, _ in counts.most_common(top_n)]
+
+def warm_cache(evaluator: TennisTrainingEvaluator, logs: List[TennisTrainingLog],
+               concurrency: int = 8, progress_every: int = 100) -> Dict[str, Any]:
+    """Generate and cache plans for logs not yet cached, returning a throughput/failure report
+
+    Already-cached logs are skipped, so an interrupted run resumes where it stopped.
+    """
+    cache = evaluator.plan_cache
+    pending = []
+    skipped = 0
+    for log in logs:
+        if cache.contains(evaluator.plan_key(log)):
+            skipped += 1
+        else:
+            pending.append(log)
+
+    generated = 0
+    failures: List[Dict[str, Any]] = []
+    latencies: List[float] = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def generate(log: TennisTrainingLog) -> None:
+        nonlocal generated
+        t0 = time.perf_counter()
+        plan = evaluator.create_daily_plan(log)
+        elapsed = time.perf_counter() - t0
+        with lock:
+            latencies.append(elapsed)
+            if plan.is_fallback:
+                failures.append({"log": log.__dict__, "error": plan.raw_gpt_response})
+            else:
+                generated += 1
+
+    interrupted = False
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        futures = [executor.submit(generate, log) for log in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            future.result()
+            if progress_every and done % progress_every == 0:
+                rate = done / (time.perf_counter() - start)
+                print(f"⏳ {done}/{len(pending)} processed ({rate:.1f} plans/s, {len(failures)} failed)", file=sys.stderr)
+    except KeyboardInterrupt:
+        interrupted = True
+        print("🛑 Interrupted - progress so far is kept in the cache, rerun to resume", file=sys.stderr)
+    finally:
+        executor.shutdown(wait=not interrupted, cancel_futures=interrupted)
+
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "total_logs": len(logs),
+        "skipped_cached": skipped,
+        "attempted": len(latencies),
+        "generated": generated,
+        "failed": len(failures),
+        "interrupted": interrupted,
+        "elapsed_seconds": round(elapsed, 3),
+        "plans_per_second": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+        "p50_latency_seconds": round(latencies[len(latencies) // 2], 3) if latencies else None,
+        "max_latency_seconds": round(latencies[-1], 3) if latencies else None,
+        "failures": failures[:50]
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Precompute tennis daily plans into the plan cache")
+    parser.add_argument("--traffic", help="JSONL file of past training logs; warm only the most frequent ones")
+    parser.add_argument("--top-n", type=int, default=500, help="Number of most frequent logs to warm with --traffic (default: 500)")
+    parser.add_argument("--limit", type=int, help="Warm at most this many logs")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum parallel OpenAI requests (default: 8)")
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    parser.add_argument("--dry-run", action="store_true", help="Only count logs and cached entries")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+
+    if args.traffic:
+        logs = top_logs_from_traffic(args.traffic, args.top_n)
+    else:
+        logs = list(enumerate_all_logs())
+    if args.limit is not None:
+        logs = logs[:args.limit]
+
+    evaluator = TennisTrainingEvaluator(plan_cache=PlanCache.from_env())
+
+    if args.dry_run:
+        cached = sum(
+            evaluator.plan_cache.contains(evaluator.plan_key(log))
+            for log in logs
+        )
+        print(f"🎾 {len(logs)} logs to warm, {cached} already cached")
+        return 0
+
+    print(f"🚀 Warming plan cache for {len(logs)} logs with concurrency {args.concurrency}...", file=sys.stderr)
+    report = warm_cache(evaluator, logs, concurrency=args.concurrency)
+
+    output = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(output)
+    print(output)
+
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,255 +1,535 @@
 #!/usr/bin/env python3
 """
-Command Line Interface for Training Evaluator
-Run with: python cli_app.py
+Command Line Interface for Tennis Training Evaluator
+Run with: python cli_app.py            (interactive)
+          python cli_app.py batch FILE (JSONL batch mode, use - for stdin)
+          python cli_app.py export FILES -o DIR (Parquet/CSV tables of many plans)
+          add --rules-only to either for instant rule-based plans without AI sections
 """
 
 import os
+import sys
 import json
-from dotenv import load_dotenv
-from training_evaluator import TrainingEvaluator, CoachBot, TrainingLog
-
-# Load environment variables
-load_dotenv()
+import time
+import argparse
+from datetime import date, timedelta
+from training_evaluator import (
+    TennisTrainingEvaluator, AsyncTennisTrainingEvaluator, TennisCoachBot, TennisTrainingLog,
+    TENNIS_DRILLS, INTENSITY_LEVELS, FORM_RATINGS, FATIGUE_LEVELS
+)
+from plan_cache import get_default_plan_cache
+from plan_records import log_from_record, percentile, plan_to_dict, record_session_date
+from training_history import TrainingHistoryStore
+from answer_cache import get_default_answer_cache
+from traffic_capture import get_default_traffic_recorder
+from single_flight import single_flight_stats
+from rate_limiter import get_default_rate_limiter
+from resilience import get_default_call_guard
+from metrics import write_metrics
+from bulk_export import DEFAULT_CHUNK_ROWS, export_main
+from openai_clients import aclose_async_clients, apreconnect, connection_stats, preconnect_enabled, preconnect_from_env
 
 def print_header():
     """Print application header"""
     print("=" * 60)
-    print(f"🏃‍♂️ {os.getenv('APP_TITLE', 'Training Evaluator & Daily Planner')}")
-    print(f"{os.getenv('APP_DESCRIPTION', 'AI-powered training log analysis')}")
+    print(f"🎾 {os.getenv('APP_TITLE', 'Tennis Training Evaluator & Daily Planner')}")
+    print(f"{os.getenv('APP_DESCRIPTION', 'AI-powered tennis training analysis')}")
     print("=" * 60)
 
 def print_section_header(title):
     """Print section header"""
     print(f"\n{'='*20} {title} {'='*20}")
 
+def choose_option(prompt, options):
+    """Prompt until the user enters one of the options (case-insensitive)"""
+    while True:
+        value = input(f"{prompt} ({'/'.join(options)}): ").strip()
+        for option in options:
+            if value.lower() == option.lower():
+                return option
+        print(f"❌ Invalid option. Choose from: {', '.join(options)}")
+
 def get_training_input():
-    """Get training input from user"""
-    print_section_header("YESTERDAY'S TRAINING INPUT")
-    
-    # Get pace options from environment
-    pace_options = os.getenv('PACE_OPTIONS', 'slow,moderate,fast').split(',')
-    load_options = os.getenv('LOAD_OPTIONS', 'low,medium,high').split(',')
-    accuracy_options = os.getenv('ACCURACY_OPTIONS', 'poor,average,good,excellent').split(',')
-    
-    print(f"Pace options: {', '.join(pace_options)}")
-    print(f"Load options: {', '.join(load_options)}")
-    print(f"Accuracy options: {', '.join(accuracy_options)}")
-    
-    # Option 1: Manual input
+    """Get tennis training input from user"""
+    print_section_header("YESTERDAY'S TENNIS SESSION")
+
     print("\n📝 Option 1: Manual Input")
-    
-    while True:
-        pace = input(f"🏃 Training Pace ({'/'.join(pace_options)}): ").strip().lower()
-        if pace in pace_options:
-            break
-        print(f"❌ Invalid option. Choose from: {', '.join(pace_options)}")
-    
-    while True:
-        load = input(f"💪 Training Load ({'/'.join(load_options)}): ").strip().lower()
-        if load in load_options:
-            break
-        print(f"❌ Invalid option. Choose from: {', '.join(load_options)}")
-    
+    print("Available drills:")
+    for i, drill in enumerate(TENNIS_DRILLS, 1):
+        print(f"  {i}. {drill}")
+
     while True:
-        video_accuracy = input(f"📹 Video Accuracy ({'/'.join(accuracy_options)}): ").strip().lower()
-        if video_accuracy in accuracy_options:
+        selection = input("🎯 Drills practiced (numbers or names, comma-separated): ").strip()
+        drills_trained = []
+        for item in selection.split(','):
+            item = item.strip()
+            if item.isdigit() and 1 <= int(item) <= len(TENNIS_DRILLS):
+                drills_trained.append(TENNIS_DRILLS[int(item) - 1])
+            else:
+                drills_trained.extend(drill for drill in TENNIS_DRILLS if drill.lower() == item.lower())
+        if drills_trained:
             break
-        print(f"❌ Invalid option. Choose from: {', '.join(accuracy_options)}")
-    
-    return TrainingLog(pace=pace, load=load, video_accuracy=video_accuracy)
+        print("❌ Please select at least one drill.")
+
+    intensity = choose_option("⚡ Training Intensity", INTENSITY_LEVELS)
+    form_rating = choose_option("📈 Form/Technique Rating", FORM_RATINGS)
+    fatigue_level = choose_option("😴 Fatigue Level", FATIGUE_LEVELS)
+
+    return TennisTrainingLog(
+        drills_trained=list(dict.fromkeys(drills_trained)),
+        intensity=intensity,
+        form_rating=form_rating,
+        fatigue_level=fatigue_level
+    )
 
 def get_json_input():
-    """Get training input from JSON"""
+    """Get tennis training input from JSON"""
     print("\n📋 Option 2: JSON Input")
     print("Enter JSON data (or press Enter to skip):")
-    print("Example: {\"pace\": \"moderate\", \"load\": \"high\", \"video_accuracy\": \"good\"}")
-    
+    print('Example: {"drills_trained": ["Forehand", "Serve"], "intensity": "Moderate", "form_rating": "Good", "fatigue_level": "Medium"}')
+
     json_input = input("JSON: ").strip()
-    
+
     if not json_input:
         return None
-    
+
     try:
-        data = json.loads(json_input)
-        if all(key in data for key in ['pace', 'load', 'video_accuracy']):
-            return TrainingLog(
-                pace=data['pace'],
-                load=data['load'],
-                video_accuracy=data['video_accuracy']
-            )
-        else:
-            print("❌ JSON must contain: pace, load, video_accuracy")
-            return None
+        return log_from_record(json.loads(json_input))
     except json.JSONDecodeError:
         print("❌ Invalid JSON format")
         return None
+    except (ValueError, AttributeError) as e:
+        print(f"❌ {e}")
+        return None
 
-def display_daily_plan(daily_plan, training_log):
-    """Display the generated daily plan"""
-    print_section_header("YOUR DAILY PLAN")
-    
-    # Performance summary
-    print("📊 YESTERDAY'S PERFORMANCE SUMMARY:")
-    print(f"  🏃 Pace: {training_log.pace.title()}")
-    print(f"  💪 Load: {training_log.load.title()}")
-    print(f"  📹 Video Accuracy: {training_log.video_accuracy.title()}")
-    
-    # Hardcoded suggestions
-    print("\n🔧 RULE-BASED RECOMMENDATIONS:")
-    print("   (Generated using proven training principles)")
+# Display titles for the AI plan sections
+AI_SECTION_TITLES = {
+    "todays_plan": "🎾 TODAY'S SESSION PLAN",
+    "daily_goals": "🎯 DAILY GOALS",
+    "rest_suggestions": "🛌 REST & RECOVERY",
+    "warnings": "⚠️  WARNINGS"
+}
+
+def display_session_summary(tennis_log):
+    """Display yesterday's session"""
+    print("📊 YESTERDAY'S TENNIS SESSION SUMMARY:")
+    print(f"  🎯 Drills: {', '.join(tennis_log.drills_trained)}")
+    print(f"  ⚡ Intensity: {tennis_log.intensity}")
+    print(f"  📈 Form Rating: {tennis_log.form_rating}")
+    print(f"  😴 Fatigue Level: {tennis_log.fatigue_level}")
+
+def display_rule_based(daily_plan):
+    """Display the rule-based recommendations"""
+    print("\n🧠 RULE-BASED RECOMMENDATIONS:")
+    print("   (Generated using proven tennis training principles)")
     for i, suggestion in enumerate(daily_plan.hardcoded_suggestions, 1):
         print(f"   {i}. {suggestion}")
-    
+
+def print_ai_section(key, content):
+    """Display one AI plan section (also used as the streaming callback)"""
+    if not content:
+        return
+    print(f"\n   {AI_SECTION_TITLES[key]}:")
+    if key == 'warnings' and content.lower() == 'none':
+        print("   No warnings - you're ready to play!")
+    else:
+        print(f"   {content}", flush=True)
+
+def display_daily_plan(daily_plan, tennis_log):
+    """Display the generated daily plan"""
+    print_section_header("YOUR TENNIS DAILY PLAN")
+    display_session_summary(tennis_log)
+    display_rule_based(daily_plan)
+
     # GPT suggestions
     print("\n🤖 AI-POWERED RECOMMENDATIONS:")
-    print("   (Generated using advanced prompt-based reasoning)")
-    
-    if daily_plan.gpt_suggestions.get('daily_goals'):
-        print(f"\n   🎯 DAILY GOALS:")
-        print(f"   {daily_plan.gpt_suggestions['daily_goals']}")
-    
-    if daily_plan.gpt_suggestions.get('rest_suggestions'):
-        print(f"\n   🛌 REST & RECOVERY:")
-        print(f"   {daily_plan.gpt_suggestions['rest_suggestions']}")
-    
-    if daily_plan.gpt_suggestions.get('warnings'):
-        print(f"\n   ⚠️  WARNINGS:")
-        if daily_plan.gpt_suggestions['warnings'].lower() != 'none':
-            print(f"   {daily_plan.gpt_suggestions['warnings']}")
-        else:
-            print("   No warnings - you're good to go!")
+    print("   (Generated using advanced tennis training analysis)")
+    for key in AI_SECTION_TITLES:
+        print_ai_section(key, daily_plan.gpt_suggestions.get(key))
 
-def coach_bot_session(coach_bot):
-    """Interactive CoachBot session"""
-    print_section_header("COACHBOT CONVERSATION")
-    print("🤖 Ask me questions about your daily plan!")
+def coach_bot_session(coach_bot, chat_history=None):
+    """Interactive TennisBot session; questions and answers are appended to chat_history"""
+    print_section_header("TENNISBOT CONVERSATION")
+    print("🎾 Ask me questions about your tennis plan!")
     print("💡 Suggested questions:")
-    print("   - Why am I doing video drills?")
-    print("   - Can I skip today's training?")
-    print("   - What is my main goal today?")
-    print("   - How should I modify training if I'm tired?")
+    print("   - Why should I practice this drill again?")
+    print("   - Can I skip my tennis session tomorrow?")
+    print("   - What's my main focus for the next tennis session?")
+    print("   - How can I improve my weak areas in tennis?")
     print("\nType 'quit' or 'exit' to return to main menu.\n")
-    
+
     while True:
         question = input("❓ Your question: ").strip()
-        
+
         if question.lower() in ['quit', 'exit', 'q']:
             break
-        
+
         if not question:
             print("Please enter a question or 'quit' to exit.")
             continue
-        
-        print("🤔 CoachBot is thinking...")
+
+        print("🤔 TennisBot is thinking...")
         answer = coach_bot.ask_question(question)
-        print(f"🤖 CoachBot: {answer}\n")
+        if chat_history is not None:
+            chat_history.append({"question": question, "answer": answer})
+        stats = coach_bot.turn_stats[-1]
+        print(f"🎾 TennisBot: {answer}")
+        if stats.cached:
+            print("   ⚡ Answered from the answer cache\n")
+        else:
+            prompt_tokens = stats.prompt_tokens if stats.prompt_tokens is not None else f"~{stats.estimated_prompt_tokens}"
+            print(f"   🧮 Prompt tokens: {prompt_tokens} ({stats.history_messages} history messages)\n")
 
-def save_plan_to_file(daily_plan, training_log):
-    """Save daily plan to JSON file"""
+def save_plan_to_file(daily_plan, tennis_log, chat_history=None):
+    """Save daily plan (and the TennisBot chat about it) to JSON file"""
     filename = input("💾 Enter filename (without .json extension): ").strip()
     if not filename:
-        filename = "daily_plan"
-    
+        filename = "tennis_daily_plan"
+
     filename = f"{filename}.json"
-    
-    export_data = {
-        "date": "today",
-        "yesterday_performance": {
-            "pace": training_log.pace,
-            "load": training_log.load,
-            "video_accuracy": training_log.video_accuracy
-        },
-        "hardcoded_suggestions": daily_plan.hardcoded_suggestions,
-        "ai_suggestions": daily_plan.gpt_suggestions,
-        "full_ai_response": daily_plan.raw_gpt_response
-    }
-    
+
+    export_data = {"date": date.today().isoformat(), **plan_to_dict(daily_plan, tennis_log)}
+    if chat_history:
+        export_data["chat_history"] = chat_history
+
     try:
         with open(filename, 'w') as f:
             json.dump(export_data, f, indent=2)
-        print(f"✅ Daily plan saved to {filename}")
+        print(f"✅ Tennis plan saved to {filename}")
     except Exception as e:
         print(f"❌ Error saving file: {e}")
 
-def main():
-    """Main application loop"""
+async def run_batch(lines, out, evaluator, concurrency=16, order="input", history=None, rules_only=False):
+    """Generate plans for JSONL records streamed from lines, writing JSONL results to out
+
+    At most `concurrency` plans are generated at once. With order="input" results are
+    written in input order (buffering at most a few windows of finished results);
+    with order="completion" each result is written as soon as it is ready.
+    When a training_history store is given, records with a player_id are appended to
+    it and their plans take the player's rolling workload into account.
+    With rules_only no API request is made; plans not in the plan cache get only
+    their rule-based suggestions and are counted as "rules".
+    Returns a throughput/latency summary.
+    """
+    import asyncio
+
+    inflight = asyncio.Semaphore(concurrency)
+    window = asyncio.Semaphore(concurrency * 4 if order == "input" else concurrency)
+    buffered = {}
+    next_index = 0
+    latencies = []
+    counts = {"records": 0, "ok": 0, "fallback": 0, "rules": 0, "invalid": 0, "errors": 0}
+    start = time.perf_counter()
+
+    def write(result):
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+        window.release()
+
+    def emit(index, result):
+        nonlocal next_index
+        if order == "completion":
+            write(result)
+            return
+        buffered[index] = result
+        while next_index in buffered:
+            write(buffered.pop(next_index))
+            next_index += 1
+
+    async def process(index, line):
+        result = {"index": index}
+        try:
+            record = json.loads(line)
+            if isinstance(record, dict):
+                for id_field in ("id", "player_id", "request_id"):
+                    if id_field in record:
+                        result[id_field] = record[id_field]
+            tennis_log = log_from_record(record)
+            session_date = record_session_date(record)
+        except (json.JSONDecodeError, ValueError, AttributeError, TypeError) as e:
+            counts["invalid"] += 1
+            result["error"] = str(e)
+            inflight.release()
+            emit(index, result)
+            return
+
+        try:
+            workload = None
+            if history is not None and "player_id" in result:
+                history.append(str(result["player_id"]), session_date, tennis_log, if_new=True)
+                workload = history.workload(str(result["player_id"]), as_of=session_date + timedelta(days=1))
+                result["workload"] = {
+                    "acute_load_7d": workload.acute_load,
+                    "chronic_load_28d": workload.chronic_load,
+                    "acute_chronic_ratio": workload.acute_chronic_ratio,
+                    "band": workload.band
+                }
+
+            t0 = time.perf_counter()
+            if rules_only:
+                daily_plan = await evaluator.start_daily_plan(tennis_log, workload, rules_only=True).aresult()
+            else:
+                daily_plan = await evaluator.create_daily_plan(tennis_log, workload=workload)
+            latency = time.perf_counter() - t0
+            latencies.append(latency)
+
+            if daily_plan.is_fallback:
+                counts["rules" if rules_only else "fallback"] += 1
+            else:
+                counts["ok"] += 1
+            result.update(plan_to_dict(daily_plan, tennis_log))
+            result["latency_ms"] = round(latency * 1000, 1)
+        except Exception as e:
+            # Still emit a result, so the output order and the read window keep moving
+            counts["errors"] += 1
+            result["error"] = f"Plan generation failed: {e}"
+        finally:
+            inflight.release()
+        emit(index, result)
+
+    tasks = set()
+    iterator = iter(lines)
+    index = 0
+    while True:
+        # Read in a worker thread so a slow stdin producer doesn't stall in-flight requests
+        line = await asyncio.to_thread(next, iterator, None)
+        if line is None:
+            break
+        if not line.strip():
+            continue
+
+        await window.acquire()
+        await inflight.acquire()
+        task = asyncio.create_task(process(index, line))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        counts["records"] += 1
+        index += 1
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        **counts,
+        "elapsed_seconds": round(elapsed, 3),
+        "plans_per_second": round(counts["records"] / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99": round(percentile(latencies, 0.99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1) if latencies else 0.0
+        }
+    }
+
+def batch_main(args):
+    """Run batch mode from parsed command line arguments"""
+    import asyncio
+
+    concurrency = max(1, args.concurrency)
+
+    async def run():
+        # Created inside the loop so it picks up this loop's shared connection pool
+        evaluator = AsyncTennisTrainingEvaluator(
+            plan_cache=None if args.no_cache else get_default_plan_cache(),
+            timeout=args.timeout
+        )
+        try:
+            # Warm up to `concurrency` pooled connections before the first plan request
+            if preconnect_enabled() and not args.rules_only:
+                await apreconnect(connections=concurrency)
+            return await run_batch(source, out, evaluator, concurrency=concurrency, order=args.order, history=history,
+                                   rules_only=args.rules_only)
+        finally:
+            await aclose_async_clients()
+
+    history = TrainingHistoryStore(args.history) if args.history else None
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        summary = asyncio.run(run())
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+        if history is not None:
+            history.close()
+
+    summary["connections"] = connection_stats()
+    summary["coalesced_calls"] = single_flight_stats()
+    summary["rate_limiter"] = get_default_rate_limiter().stats()
+    summary["call_guard"] = get_default_call_guard().stats()
+
+    if args.metrics:
+        write_metrics(args.metrics)
+        print(f"📈 Metrics written to {args.metrics}", file=sys.stderr)
+
+    print(f"✅ Batch complete: {json.dumps(summary)}", file=sys.stderr)
+    return 0 if summary["fallback"] == 0 and summary["invalid"] == 0 and summary["errors"] == 0 else 1
+
+def metrics_main(args):
+    """Print the /metrics output of a running api_server.py"""
+    import urllib.request
+
+    url = f"{args.url.rstrip('/')}/metrics" + ("?format=prometheus" if args.format == "prometheus" else "")
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            print(response.read().decode("utf-8"), end="")
+    except OSError as e:
+        print(f"❌ Could not read metrics from {url}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def build_parser():
+    """Command line argument parser"""
+    parser = argparse.ArgumentParser(description="Tennis Training Evaluator & Daily Planner")
+    parser.add_argument("--rules-only", action="store_true", help="Interactive plans with rule-based suggestions only (no API call unless cached)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser("batch", help="Generate plans for a JSONL file of training logs")
+    batch.add_argument("input", nargs="?", default="-", help="JSONL input file, or - for stdin (default)")
+    batch.add_argument("-o", "--output", default="-", help="JSONL output file, or - for stdout (default)")
+    batch.add_argument("-c", "--concurrency", type=int, default=16, help="Maximum plans generated at once (default: 16)")
+    batch.add_argument("--order", choices=["input", "completion"], default="input", help="Output order (default: input)")
+    batch.add_argument("--timeout", type=float, help="Per-plan OpenAI timeout in seconds before falling back")
+    batch.add_argument("--no-cache", action="store_true", help="Bypass the plan cache")
+    # SUPPRESS keeps a --rules-only given before "batch" instead of resetting it to False
+    batch.add_argument("--rules-only", action="store_true", default=argparse.SUPPRESS, help="Skip the AI sections of plans not in the plan cache (no API calls)")
+    batch.add_argument("--history", metavar="DB", help="Record sessions of records with a player_id in this training history database and use their rolling workload")
+    batch.add_argument("--metrics", metavar="PATH", help="Write latency, token and cache metrics here when done (.json for JSON, otherwise Prometheus text)")
+
+    export = subparsers.add_parser("export", help="Export many plans, chats and training logs as Parquet/CSV tables")
+    export.add_argument("inputs", nargs="*", help="Plan JSONL files (batch or API output), saved plan .json files or directories of them")
+    export.add_argument("-o", "--output", default="export", help="Directory for the plans, chats and sessions tables (default: export)")
+    export.add_argument("--history", metavar="DB", help="Also export every session in this training history database")
+    export.add_argument("--format", choices=["auto", "parquet", "csv"], default="auto", help="Table format; auto uses Parquet when pyarrow is installed (default: auto)")
+    export.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help=f"Rows held in memory per write (default: {DEFAULT_CHUNK_ROWS})")
+
+    metrics = subparsers.add_parser("metrics", help="Dump the metrics of a running API server")
+    metrics.add_argument("--url", default=f"http://127.0.0.1:{os.getenv('API_PORT', 8080)}", help="API server base URL (default: http://127.0.0.1:8080)")
+    metrics.add_argument("--format", choices=["prometheus", "json"], default="prometheus", help="Output format (default: prometheus)")
+
+    return parser
+
+def interactive_main(rules_only=False):
+    """Main interactive application loop"""
     print_header()
-    
-    # Check API key
+
+    # Check API key (rule-based plans do not need one)
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key or api_key == 'your_openai_api_key_here':
-        print("❌ ERROR: OpenAI API Key not configured!")
-        print("Please create a .env file and add your OpenAI API key:")
-        print("OPENAI_API_KEY=your_actual_api_key_here")
-        return
-    
-    print("✅ OpenAI API Key configured")
-    
+        if not rules_only:
+            print("❌ ERROR: OpenAI API Key not configured!")
+            print("Please create a .env file and add your OpenAI API key:")
+            print("OPENAI_API_KEY=your_actual_api_key_here")
+            print("Or run with --rules-only for rule-based plans without AI sections")
+            return
+        print("⚠️ OpenAI API Key not configured - TennisBot questions will not be answered")
+    else:
+        print("✅ OpenAI API Key configured")
+    if rules_only:
+        print("⚡ Rule-based plans only - AI sections are skipped unless cached")
+    else:
+        preconnect_from_env()
+
     # Get training input
     print("\nChoose input method:")
     print("1. Manual input (guided)")
     print("2. JSON input")
-    
+
     choice = input("Select option (1 or 2): ").strip()
-    
-    training_log = None
-    
+
+    tennis_log = None
+
     if choice == "1":
-        training_log = get_training_input()
+        tennis_log = get_training_input()
     elif choice == "2":
-        training_log = get_json_input()
-        if training_log is None:
+        tennis_log = get_json_input()
+        if tennis_log is None:
             print("Falling back to manual input...")
-            training_log = get_training_input()
+            tennis_log = get_training_input()
     else:
         print("Invalid choice, using manual input...")
-        training_log = get_training_input()
-    
+        tennis_log = get_training_input()
+
     # Generate daily plan
-    print("\n🚀 Generating your personalized daily plan...")
-    print("🤔 Analyzing training data and consulting AI coach...")
-    
+    print("\n🚀 Generating your personalized tennis plan...")
+    print("🤔 Analyzing your session and consulting the AI tennis coach...")
+
     try:
-        evaluator = TrainingEvaluator()
-        daily_plan = evaluator.create_daily_plan(training_log)
-        
-        # Display results
-        display_daily_plan(daily_plan, training_log)
-        
-        # Initialize CoachBot
-        coach_bot = CoachBot(daily_plan, training_log)
-        
+        evaluator = TennisTrainingEvaluator(plan_cache=get_default_plan_cache(), traffic_recorder=get_default_traffic_recorder())
+
+        # Show the rule-based suggestions at once, then each AI section as soon as it is complete
+        progressive = evaluator.start_daily_plan(tennis_log, rules_only=rules_only)
+        print_section_header("YOUR TENNIS DAILY PLAN")
+        display_session_summary(tennis_log)
+        display_rule_based(progressive)
+        print("\n🤖 AI-POWERED RECOMMENDATIONS:")
+        if rules_only and progressive.result().is_fallback:
+            print("   (Skipped - rule-based plan only)")
+        else:
+            print("   (Generated using advanced tennis training analysis)")
+            for key in AI_SECTION_TITLES:
+                print_ai_section(key, progressive.section(key))
+        daily_plan = progressive.result()
+
+        # Initialize TennisBot
+        chat_history = []
+        coach_bot = TennisCoachBot(
+            daily_plan, tennis_log, answer_cache=get_default_answer_cache(), traffic_recorder=get_default_traffic_recorder()
+        )
+
         # Interactive menu
         while True:
             print_section_header("WHAT WOULD YOU LIKE TO DO?")
-            print("1. 🤖 Ask CoachBot questions")
+            print("1. 🎾 Ask TennisBot questions")
             print("2. 💾 Save plan to file")
             print("3. 📋 View plan again")
             print("4. 🆕 Create new plan")
             print("5. 🚪 Exit")
-            
+
             choice = input("Select option (1-5): ").strip()
-            
+
             if choice == "1":
-                coach_bot_session(coach_bot)
+                coach_bot_session(coach_bot, chat_history)
             elif choice == "2":
-                save_plan_to_file(daily_plan, training_log)
+                save_plan_to_file(daily_plan, tennis_log, chat_history)
             elif choice == "3":
-                display_daily_plan(daily_plan, training_log)
+                display_daily_plan(daily_plan, tennis_log)
             elif choice == "4":
                 print("🔄 Starting over...")
-                main()
+                interactive_main(rules_only)
                 return
             elif choice == "5":
-                print("👋 Thank you for using Training Evaluator!")
+                print("👋 Thank you for using Tennis Training Evaluator!")
                 break
             else:
                 print("❌ Invalid choice. Please select 1-5.")
-    
+
     except Exception as e:
         print(f"❌ Error generating daily plan: {e}")
         print("Please check your OpenAI API key and internet connection.")
 
+def main(argv=None):
+    """Command line entry point"""
+    # Load environment variables (imported here so importing cli_app stays cheap)
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    args = build_parser().parse_args(argv)
+
+    if args.command == "batch":
+        return batch_main(args)
+    if args.command == "metrics":
+        return metrics_main(args)
+    if args.command == "export":
+        return export_main(args)
+
+    interactive_main(args.rules_only)
+    return 0
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
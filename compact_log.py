@@ -0,0 +1,182 @@
+"""
+Compact, bit-packed tennis training log representation
+A CompactTennisLog stores a whole log in one 13-bit integer (the rule engine's packed
+key), so millions of historical logs fit in a uint16 NumPy array and hash/compare as ints.
+"""
+
+from typing import Any, Iterable, List, Union
+
+from training_evaluator import (
+    TennisTrainingLog, normalize_tennis_log,
+    TENNIS_DRILLS, INTENSITY_LEVELS, FORM_RATINGS, FATIGUE_LEVELS
+)
+from rule_engine import (
+    DRILL_BITS, INTENSITY_CODES, FORM_CODES, FATIGUE_CODES,
+    INTENSITY_SHIFT, FORM_SHIFT, FATIGUE_SHIFT, KEY_SPACE, pack_key
+)
+
+DRILL_MASK = (1 << len(TENNIS_DRILLS)) - 1
+
+def _is_valid_key(key: int) -> bool:
+    return (
+        0 <= key < KEY_SPACE
+        and (key >> INTENSITY_SHIFT & 0b11) < len(INTENSITY_LEVELS)
+        and (key >> FORM_SHIFT & 0b11) < len(FORM_RATINGS)
+        and (key >> FATIGUE_SHIFT & 0b11) < len(FATIGUE_LEVELS)
+    )
+
+class CompactTennisLog:
+    """Immutable training log packed into a single integer
+
+    Exposes the same drills_trained/intensity/form_rating/fatigue_level attributes
+    as TennisTrainingLog, so it can be passed anywhere a log is expected. Drills
+    come back in standard order; the original entry order is not kept.
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: int):
+        key = int(key)
+        if not _is_valid_key(key):
+            raise ValueError(f"Invalid packed tennis log key: {key}")
+        object.__setattr__(self, "key", key)
+
+    @classmethod
+    def from_fields(cls, drills_trained: Iterable[str], intensity: str, form_rating: str,
+                    fatigue_level: str) -> "CompactTennisLog":
+        """Validate and pack log fields; spellings are normalized, duplicates are merged"""
+        return cls.from_log(TennisTrainingLog(
+            drills_trained=list(drills_trained),
+            intensity=intensity,
+            form_rating=form_rating,
+            fatigue_level=fatigue_level
+        ))
+
+    @classmethod
+    def from_log(cls, tennis_log: TennisTrainingLog) -> "CompactTennisLog":
+        """Pack a TennisTrainingLog, raising ValueError for unknown drills or ratings"""
+        if isinstance(tennis_log, CompactTennisLog):
+            return tennis_log
+        log = normalize_tennis_log(tennis_log)
+
+        unknown = [drill for drill in log.drills_trained if drill not in DRILL_BITS]
+        if unknown:
+            raise ValueError(f"Unknown drills: {', '.join(unknown)}. Choose from: {', '.join(TENNIS_DRILLS)}")
+        for value, codes, field in (
+            (log.intensity, INTENSITY_CODES, "intensity"),
+            (log.form_rating, FORM_CODES, "form_rating"),
+            (log.fatigue_level, FATIGUE_CODES, "fatigue_level")
+        ):
+            if value not in codes:
+                raise ValueError(f"Invalid {field}: {value!r}. Choose from: {', '.join(codes)}")
+
+        mask = 0
+        for drill in log.drills_trained:
+            mask |= DRILL_BITS[drill]
+        return cls(pack_key(
+            mask, INTENSITY_CODES[log.intensity], FORM_CODES[log.form_rating], FATIGUE_CODES[log.fatigue_level]
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompactTennisLog":
+        """Decode the 2-byte little-endian form produced by to_bytes()"""
+        return cls(int.from_bytes(data, "little"))
+
+    def to_bytes(self) -> bytes:
+        """Encode as 2 little-endian bytes"""
+        return self.key.to_bytes(2, "little")
+
+    def to_log(self) -> TennisTrainingLog:
+        """Expand back into a regular TennisTrainingLog"""
+        return TennisTrainingLog(
+            drills_trained=self.drills_trained,
+            intensity=self.intensity,
+            form_rating=self.form_rating,
+            fatigue_level=self.fatigue_level
+        )
+
+    @property
+    def drill_mask(self) -> int:
+        return self.key & DRILL_MASK
+
+    @property
+    def drills_trained(self) -> List[str]:
+        return [drill for drill, bit in DRILL_BITS.items() if self.key & bit]
+
+    @property
+    def intensity(self) -> str:
+        return INTENSITY_LEVELS[self.key >> INTENSITY_SHIFT & 0b11]
+
+    @property
+    def form_rating(self) -> str:
+        return FORM_RATINGS[self.key >> FORM_SHIFT & 0b11]
+
+    @property
+    def fatigue_level(self) -> str:
+        return FATIGUE_LEVELS[self.key >> FATIGUE_SHIFT & 0b11]
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("CompactTennisLog is immutable")
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CompactTennisLog):
+            return self.key == other.key
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __int__(self) -> int:
+        return self.key
+
+    def __reduce__(self):
+        return (CompactTennisLog, (self.key,))
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactTennisLog(drills_trained={self.drills_trained!r}, intensity={self.intensity!r}, "
+            f"form_rating={self.form_rating!r}, fatigue_level={self.fatigue_level!r})"
+        )
+
+def encode_logs(logs: Iterable[Union[TennisTrainingLog, CompactTennisLog]]) -> Any:
+    """Pack many logs into a uint16 NumPy array (2 bytes per log)"""
+    import numpy as np
+
+    return np.fromiter((CompactTennisLog.from_log(log).key for log in logs), dtype=np.uint16)
+
+def validate_keys(keys: Any) -> Any:
+    """Check a packed key array in bulk, raising ValueError on any invalid entry"""
+    import numpy as np
+
+    keys = np.asarray(keys)
+    valid = (
+        (keys >= 0) & (keys < KEY_SPACE)
+        & ((keys >> INTENSITY_SHIFT & 0b11) < len(INTENSITY_LEVELS))
+        & ((keys >> FORM_SHIFT & 0b11) < len(FORM_RATINGS))
+        & ((keys >> FATIGUE_SHIFT & 0b11) < len(FATIGUE_LEVELS))
+    )
+    if not valid.all():
+        bad = np.flatnonzero(~valid)
+        raise ValueError(f"{len(bad)} invalid packed tennis log keys, first at index {bad[0]}: {keys[bad[0]]}")
+    return keys.astype(np.uint16, copy=False)
+
+def decode_logs(keys: Any) -> List[CompactTennisLog]:
+    """Unpack a packed key array into CompactTennisLog objects"""
+    return [CompactTennisLog(key) for key in validate_keys(keys).tolist()]
+
+def keys_to_frame(keys: Any) -> Any:
+    """Vectorized decode of packed keys into a pandas DataFrame
+
+    Columns: drill_mask, intensity, form_rating, fatigue_level - the layout accepted by
+    rule_engine.RuleTable.evaluate_frame for roster-wide reporting.
+    """
+    import numpy as np
+    import pandas as pd
+
+    keys = validate_keys(keys).astype(np.int64)
+    return pd.DataFrame({
+        "drill_mask": keys & DRILL_MASK,
+        "intensity": pd.Categorical.from_codes(keys >> INTENSITY_SHIFT & 0b11, INTENSITY_LEVELS),
+        "form_rating": pd.Categorical.from_codes(keys >> FORM_SHIFT & 0b11, FORM_RATINGS),
+        "fatigue_level": pd.Categorical.from_codes(keys >> FATIGUE_SHIFT & 0b11, FATIGUE_LEVELS)
+    })
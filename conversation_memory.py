@@ -0,0 +1,159 @@
+"""
+Token-budgeted conversation memory for TennisBot
+Recent turns are kept verbatim; older turns are compacted into one-line summaries,
+and the history sent with each question is trimmed to a fixed token budget so
+per-question latency and cost stay flat over long chats.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+DEFAULT_TOKEN_BUDGET = 1500
+DEFAULT_RECENT_TURNS = 4
+DEFAULT_MAX_SUMMARIES = 20
+
+# Characters kept from a question/answer when a turn is compacted
+SUMMARY_QUESTION_CHARS = 120
+SUMMARY_ANSWER_CHARS = 200
+
+_encoding = None
+
+def estimate_tokens(text: str) -> int:
+    """Token count of text - exact with tiktoken installed, otherwise ~4 characters per token"""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+def estimate_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Token count of chat messages including the per-message framing overhead"""
+    return sum(estimate_tokens(message["content"]) + 4 for message in messages) + 3
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+def summarize_turn(question: str, answer: str) -> str:
+    """Extractive one-line summary of a turn: the question and the answer's opening sentence"""
+    first_sentence = re.split(r"(?<=[.!?])\s+", " ".join(answer.split()), maxsplit=1)[0]
+    return f"Q: {_shorten(question, SUMMARY_QUESTION_CHARS)} → A: {_shorten(first_sentence, SUMMARY_ANSWER_CHARS)}"
+
+@dataclass
+class _Turn:
+    question: str
+    answer: str
+    tokens: int  # of the question/answer message pair
+
+@dataclass
+class _Summary:
+    text: str
+    tokens: int
+
+class ConversationMemory:
+    """Rolling chat memory that fits prior turns into a fixed token budget"""
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, recent_turns: int = DEFAULT_RECENT_TURNS,
+                 max_summaries: int = DEFAULT_MAX_SUMMARIES):
+        # Total prompt tokens (static context + history + question) to aim for
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.max_summaries = max_summaries
+        self._turns: List[_Turn] = []
+        self._summaries: List[_Summary] = []
+        self.compacted_turns = 0
+        self.dropped_turns = 0
+
+    @classmethod
+    def from_env(cls) -> "ConversationMemory":
+        """Configure from COACH_MEMORY_* environment variables"""
+        return cls(
+            token_budget=int(os.getenv('COACH_MEMORY_TOKEN_BUDGET', DEFAULT_TOKEN_BUDGET)),
+            recent_turns=int(os.getenv('COACH_MEMORY_RECENT_TURNS', DEFAULT_RECENT_TURNS)),
+            max_summaries=int(os.getenv('COACH_MEMORY_MAX_SUMMARIES', DEFAULT_MAX_SUMMARIES))
+        )
+
+    def __len__(self) -> int:
+        return len(self._turns) + len(self._summaries)
+
+    def add_turn(self, question: str, answer: str) -> None:
+        """Remember a completed turn, compacting the oldest verbatim turn when over the limit"""
+        tokens = estimate_tokens(question) + estimate_tokens(answer) + 8
+        self._turns.append(_Turn(question, answer, tokens))
+        while len(self._turns) > self.recent_turns:
+            self._compact(self._turns.pop(0))
+
+    def clear(self) -> None:
+        self._turns.clear()
+        self._summaries.clear()
+
+    def build_messages(self, system_prompt: str, question: str) -> List[Dict[str, str]]:
+        """Chat messages for a question: system prompt, summarized and recent history, then the question
+
+        History is added newest first until the token budget is reached, so the
+        prompt never grows past token_budget unless the system prompt and question
+        alone already exceed it.
+        """
+        remaining = self.token_budget - estimate_message_tokens([
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": question}
+        ])
+
+        # Recent turns verbatim, newest first
+        recent: List[_Turn] = []
+        for turn in reversed(self._turns):
+            if turn.tokens > remaining:
+                break
+            recent.insert(0, turn)
+            remaining -= turn.tokens
+
+        # Then as many summaries as still fit - skipped verbatim turns are summarized too
+        skipped = self._turns[:len(self._turns) - len(recent)]
+        candidates = self._summaries + [
+            _Summary(text, estimate_tokens(text) + 1)
+            for text in (summarize_turn(turn.question, turn.answer) for turn in skipped)
+        ]
+        summaries: List[str] = []
+        remaining -= 12  # header of the summary message
+        for summary in reversed(candidates):
+            if summary.tokens > remaining:
+                break
+            summaries.insert(0, summary.text)
+            remaining -= summary.tokens
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if summaries:
+            messages.append({
+                "role": "system",
+                "content": "Summary of earlier questions in this conversation:\n" + "\n".join(summaries)
+            })
+        for turn in recent:
+            messages.append({"role": "user", "content": turn.question})
+            messages.append({"role": "assistant", "content": turn.answer})
+        messages.append({"role": "user", "content": question})
+        return messages
+
+    def _compact(self, turn: _Turn) -> None:
+        text = summarize_turn(turn.question, turn.answer)
+        self._summaries.append(_Summary(text, estimate_tokens(text) + 1))
+        self.compacted_turns += 1
+        if len(self._summaries) > self.max_summaries:
+            self._summaries.pop(0)
+            self.dropped_turns += 1
+
+@dataclass
+class TurnStats:
+    """Token accounting for one coach question"""
+    question_tokens: int
+    estimated_prompt_tokens: int
+    history_messages: int  # prior-turn messages included in the prompt
+    prompt_tokens: Optional[int] = None  # as reported by the API, when available
+    completion_tokens: Optional[int] = None
+    cached: bool = False  # answered from the answer cache without an API call
@@ -0,0 +1,284 @@
+"""
+Process-wide metrics: counters, latency histograms and component stats
+Instrumented code records plan, LLM, parsing, rule-engine and coach timings plus
+token usage; cache, coalescing, rate limiter and connection stats are collected
+when metrics are read. Rendered as Prometheus text or JSON. With METRICS_ENABLED=false
+every record call returns after a single attribute check.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds - from rule evaluation (sub-ms) to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_PREFIX = "tennis_"
+
+# HELP text for the metrics recorded by the evaluator and coach bot
+METRIC_HELP = {
+    "plans_total": "Daily plans generated, by source (cache, ai, fallback, rules)",
+    "plan_seconds": "Time to build a daily plan, by source",
+    "rules_seconds": "Time spent in the rule engine per plan",
+    "llm_requests_total": "OpenAI chat requests, by operation, model and outcome",
+    "llm_request_seconds": "OpenAI chat request latency including rate limiting and retries",
+    "llm_tokens_total": "Tokens reported by OpenAI usage, by operation, model and type",
+    "model_routes_total": "Model tier chosen for OpenAI requests, by operation, tier and model",
+    "parse_seconds": "Time to parse a plan response into sections",
+    "coach_questions_total": "TennisBot questions, by source (cache, ai, fallback; prefetch_* for speculative answers)",
+    "coach_question_seconds": "Time to answer a TennisBot question, by source"
+}
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP_TIMER = _NoopTimer()
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, str]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by name and labels"""
+
+    def __init__(self, enabled: bool = True, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Add value to a counter"""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """Record one duration in a histogram"""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets))
+            histogram.counts[index] += 1
+            histogram.total += seconds
+            histogram.count += 1
+
+    def timer(self, name: str, **labels: str):
+        """Context manager observing the duration of its block"""
+        if not self.enabled:
+            return _NOOP_TIMER
+        return _Timer(self, name, labels)
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        """Add a stats() style callable whose numeric values are exported as gauges"""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable view: counters, histogram summaries and component stats"""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": histogram.count,
+                        "sum": round(histogram.total, 6),
+                        "p50": self._quantile(histogram, 0.50),
+                        "p95": self._quantile(histogram, 0.95),
+                        "p99": self._quantile(histogram, 0.99)
+                    }
+                    for key, histogram in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+        return {
+            "enabled": self.enabled,
+            "counters": counters,
+            "histograms": histograms,
+            "components": self._collect()
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full_name = METRIC_PREFIX + name
+                self._header(lines, full_name, name, "counter")
+                for key, value in series.items():
+                    lines.append(f"{full_name}{_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                full_name = METRIC_PREFIX + name
+                self._header(lines, full_name, name, "histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{full_name}_bucket{_labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{full_name}_sum{_labels(key)} {histogram.total:.6f}")
+                    lines.append(f"{full_name}_count{_labels(key)} {histogram.count}")
+
+        for component, stats in self._collect().items():
+            for path, value in _flatten(stats):
+                full_name = _NAME_RE.sub("_", f"{METRIC_PREFIX}{component}_{path}")
+                lines.append(f"# TYPE {full_name} gauge")
+                lines.append(f"{full_name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def render_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def _header(self, lines: List[str], full_name: str, name: str, kind: str) -> None:
+        if name in METRIC_HELP:
+            lines.append(f"# HELP {full_name} {METRIC_HELP[name]}")
+        lines.append(f"# TYPE {full_name} {kind}")
+
+    def _quantile(self, histogram: _Histogram, fraction: float) -> Optional[float]:
+        """Bucket upper bound containing the quantile (an upper estimate)"""
+        if not histogram.count:
+            return None
+        rank = fraction * histogram.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, histogram.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return None  # beyond the largest bucket
+
+    def _collect(self) -> Dict[str, Any]:
+        with self._lock:
+            collectors = dict(self._collectors)
+        stats = {}
+        for name, collect in collectors.items():
+            try:
+                stats[name] = collect()
+            except Exception as e:
+                stats[name] = {"error": str(e)}
+        return stats
+
+def _labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _flatten(stats: Dict[str, Any], prefix: str = ""):
+    """(path, number) pairs of a nested stats dict; strings and None are skipped"""
+    for name, value in stats.items():
+        path = f"{prefix}_{name}" if prefix else str(name)
+        if isinstance(value, dict):
+            yield from _flatten(value, path)
+        elif isinstance(value, bool):
+            yield path, int(value)
+        elif isinstance(value, (int, float)):
+            yield path, value
+
+def _register_component_collectors(registry: MetricsRegistry) -> None:
+    """Export the stats() of the shared caches, coalescing groups, limiter, pools, router and traffic capture"""
+    import plan_cache
+    import answer_cache
+    import traffic_capture
+    import model_routing
+    from openai_clients import connection_stats
+    from single_flight import single_flight_stats
+    from rate_limiter import get_default_rate_limiter
+    from resilience import get_default_call_guard
+
+    # Caches are only reported once something has created them - reading metrics
+    # must not open a cache database as a side effect
+    def cache_stats(module: Any) -> Callable[[], Dict[str, Any]]:
+        return lambda: module._default_cache.stats() if module._default_cache is not None else {}
+
+    registry.register_collector("plan_cache", cache_stats(plan_cache))
+    registry.register_collector("answer_cache", cache_stats(answer_cache))
+    registry.register_collector("coalesced_calls", single_flight_stats)
+    registry.register_collector("rate_limiter", lambda: get_default_rate_limiter().stats())
+    registry.register_collector("call_guard", lambda: get_default_call_guard().stats())
+    registry.register_collector("connections", connection_stats)
+    registry.register_collector(
+        "model_router",
+        lambda: model_routing._default_router.stats() if model_routing._default_router is not None else {}
+    )
+    registry.register_collector(
+        "traffic_capture",
+        lambda: traffic_capture._default_recorder.stats() if traffic_capture._default_recorder is not None else {}
+    )
+
+_default_registry: Optional[MetricsRegistry] = None
+_default_registry_lock = threading.Lock()
+
+def metrics_enabled() -> bool:
+    """Whether METRICS_ENABLED allows recording (on by default)"""
+    return os.getenv('METRICS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide registry; a disabled one when METRICS_ENABLED=false"""
+    global _default_registry
+    registry = _default_registry
+    if registry is not None:
+        return registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = MetricsRegistry(enabled=metrics_enabled())
+            _register_component_collectors(_default_registry)
+        return _default_registry
+
+def write_metrics(path: str) -> None:
+    """Dump metrics to a file - JSON for .json paths, Prometheus text otherwise"""
+    registry = get_metrics()
+    with open(path, "w") as f:
+        f.write(registry.render_json() if path.endswith(".json") else registry.render_prometheus())
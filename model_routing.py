@@ -0,0 +1,233 @@
+"""
+Config-driven model tiers and routing for daily plans and TennisBot questions
+A JSON config (MODEL_ROUTING_CONFIG) defines tiers - model, temperature and token
+budgets - and ordered rules matching training logs, workload bands and question
+length to a tier. Without a config every request uses OPENAI_MODEL,
+OPENAI_MAX_TOKENS and OPENAI_TEMPERATURE. The file is re-read when it changes.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+DEFAULT_PLAN_MAX_TOKENS = 800
+DEFAULT_COACH_MAX_TOKENS = 300
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_RELOAD_SECONDS = 5.0
+
+OPERATIONS = ("plan", "coach")
+
+# Rule conditions; a rule matches when every condition it lists holds
+LIST_CONDITIONS = ("intensity", "form_rating", "fatigue_level", "workload_band")
+NUMBER_CONDITIONS = ("min_drills", "max_drills", "min_question_words", "max_question_words")
+
+@dataclass(frozen=True)
+class Route:
+    """Model and generation settings chosen for one request"""
+    tier: str
+    model: str
+    max_tokens: int
+    temperature: float
+    reason: str = "default"
+
+class RoutingConfigError(ValueError):
+    """Raised for a routing config that cannot be used"""
+
+class RoutingConfig:
+    """Validated tiers and per-operation rules"""
+
+    def __init__(self, tiers: Dict[str, Dict[str, Route]], defaults: Dict[str, str], rules: Dict[str, List[Dict[str, Any]]]):
+        self.tiers = tiers  # tier -> operation -> Route
+        self.defaults = defaults  # operation -> tier
+        self.rules = rules  # operation -> [{"tier": ..., "when": {...}}]
+
+    @classmethod
+    def from_env(cls) -> "RoutingConfig":
+        """Single "default" tier built from OPENAI_MODEL / OPENAI_MAX_TOKENS / OPENAI_TEMPERATURE"""
+        return cls.from_dict({})
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RoutingConfig":
+        """Parse a config; tier fields left out fall back to the OPENAI_* environment settings"""
+        if not isinstance(data, dict):
+            raise RoutingConfigError("routing config must be a JSON object")
+        base = {
+            "model": os.getenv('OPENAI_MODEL') or DEFAULT_MODEL,
+            "temperature": float(os.getenv('OPENAI_TEMPERATURE', DEFAULT_TEMPERATURE)),
+            "plan_max_tokens": int(os.getenv('OPENAI_MAX_TOKENS', DEFAULT_PLAN_MAX_TOKENS)),
+            "coach_max_tokens": int(os.getenv('OPENAI_COACH_MAX_TOKENS', DEFAULT_COACH_MAX_TOKENS))
+        }
+
+        tiers = {}
+        if not isinstance(data.get("tiers", {}), dict):
+            raise RoutingConfigError("tiers must be an object")
+        for name, settings in {"default": {}, **data.get("tiers", {})}.items():
+            if not isinstance(settings, dict):
+                raise RoutingConfigError(f"tier {name!r} must be an object")
+            merged = {**base, **settings}
+            try:
+                tiers[name] = {
+                    operation: Route(
+                        tier=name,
+                        model=str(merged["model"]),
+                        max_tokens=int(merged[f"{operation}_max_tokens"]),
+                        temperature=float(merged["temperature"])
+                    )
+                    for operation in OPERATIONS
+                }
+            except (TypeError, ValueError) as e:
+                raise RoutingConfigError(f"tier {name!r}: {e}")
+
+        defaults, rules = {}, {}
+        for operation in OPERATIONS:
+            section = data.get(operation, {})
+            if not isinstance(section, dict) or not isinstance(section.get("rules", []), list):
+                raise RoutingConfigError(f"{operation!r} must be an object with a list of rules")
+            defaults[operation] = section.get("default", "default")
+            rules[operation] = section.get("rules", [])
+            if not all(isinstance(rule, dict) and isinstance(rule.get("when", {}), dict) for rule in rules[operation]):
+                raise RoutingConfigError(f"{operation} rules must be objects with a \"when\" object")
+            for tier in [defaults[operation]] + [rule.get("tier") for rule in rules[operation]]:
+                if tier not in tiers:
+                    raise RoutingConfigError(f"{operation} routes to unknown tier {tier!r}")
+            for rule in rules[operation]:
+                unknown = set(rule.get("when", {})) - set(LIST_CONDITIONS) - set(NUMBER_CONDITIONS)
+                if unknown:
+                    raise RoutingConfigError(f"{operation} rule uses unknown conditions: {', '.join(sorted(unknown))}")
+                # Compared with <= and >= on every request, so a "2" must not get this far
+                for condition in NUMBER_CONDITIONS:
+                    expected = rule["when"].get(condition)
+                    if condition in rule["when"] and (isinstance(expected, bool) or not isinstance(expected, (int, float))):
+                        raise RoutingConfigError(f"{operation} rule condition {condition} must be a number, not {expected!r}")
+        return cls(tiers, defaults, rules)
+
+    def route(self, operation: str, facts: Dict[str, Any]) -> Route:
+        """First matching rule's tier, else the operation's default tier"""
+        for index, rule in enumerate(self.rules[operation], 1):
+            when = rule.get("when", {})
+            if all(_holds(condition, expected, facts) for condition, expected in when.items()):
+                route = self.tiers[rule["tier"]][operation]
+                reason = ", ".join(f"{condition}={expected}" for condition, expected in when.items()) or "always"
+                return Route(route.tier, route.model, route.max_tokens, route.temperature, f"rule {index}: {reason}")
+        return self.tiers[self.defaults[operation]][operation]
+
+def _holds(condition: str, expected: Any, facts: Dict[str, Any]) -> bool:
+    if condition in LIST_CONDITIONS:
+        values = expected if isinstance(expected, list) else [expected]
+        return facts.get(condition) in values
+    value = facts.get(condition.split("_", 1)[1])
+    if value is None:
+        return False
+    return value >= expected if condition.startswith("min_") else value <= expected
+
+class ModelRouter:
+    """Routes requests with the current config, reloading the file when it changes"""
+
+    def __init__(self, config_path: Optional[str] = None, reload_seconds: float = DEFAULT_RELOAD_SECONDS,
+                 log_decisions: bool = False):
+        self.config_path = config_path
+        self.reload_seconds = reload_seconds
+        self.log_decisions = log_decisions
+        self._lock = threading.Lock()
+        self._config = RoutingConfig.from_env()
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+
+        # In-process counters
+        self.reloads = 0
+        self.reload_errors = 0
+        self.decisions: Dict[str, int] = {}
+
+        if config_path:
+            self._maybe_reload(force=True)
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """Create a router configured from MODEL_ROUTING_* environment variables"""
+        return cls(
+            config_path=os.getenv('MODEL_ROUTING_CONFIG') or None,
+            reload_seconds=float(os.getenv('MODEL_ROUTING_RELOAD_SECONDS', DEFAULT_RELOAD_SECONDS)),
+            log_decisions=os.getenv('MODEL_ROUTING_LOG', 'false').lower() in ('1', 'true', 'yes')
+        )
+
+    def route_plan(self, tennis_log: Any, workload: Optional[Any] = None) -> Route:
+        """Tier for a daily plan request"""
+        band = getattr(workload, "band", None) if workload is not None else None
+        return self._current().route("plan", {
+            "intensity": tennis_log.intensity,
+            "form_rating": tennis_log.form_rating,
+            "fatigue_level": tennis_log.fatigue_level,
+            "workload_band": band,
+            "drills": len(tennis_log.drills_trained)
+        })
+
+    def route_question(self, tennis_log: Any, question: str) -> Route:
+        """Tier for a TennisBot question about the plan for tennis_log"""
+        return self._current().route("coach", {
+            "intensity": tennis_log.intensity,
+            "form_rating": tennis_log.form_rating,
+            "fatigue_level": tennis_log.fatigue_level,
+            "drills": len(tennis_log.drills_trained),
+            "question_words": len(question.split())
+        })
+
+    def record(self, operation: str, route: Route) -> None:
+        """Count (and optionally log) a routing decision that led to an API request"""
+        from metrics import get_metrics
+
+        key = f"{operation}/{route.tier}"
+        with self._lock:
+            self.decisions[key] = self.decisions.get(key, 0) + 1
+        get_metrics().inc("model_routes_total", operation=operation, tier=route.tier, model=route.model)
+        if self.log_decisions:
+            print(f"🔀 {operation} → {route.tier} ({route.model}, {route.max_tokens} tokens): {route.reason}", file=sys.stderr)
+
+    def stats(self) -> Dict[str, Any]:
+        config = self._current()
+        with self._lock:
+            return {
+                "config_path": self.config_path,
+                "tiers": {name: routes["plan"].model for name, routes in config.tiers.items()},
+                "reloads": self.reloads,
+                "reload_errors": self.reload_errors,
+                "decisions": dict(self.decisions)
+            }
+
+    def _current(self) -> RoutingConfig:
+        if self.config_path and time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._config
+
+    def _maybe_reload(self, force: bool = False) -> None:
+        """Re-read the config file if its mtime changed; a broken file keeps the previous config"""
+        with self._lock:
+            if not force and time.monotonic() < self._next_check:
+                return
+            self._next_check = time.monotonic() + self.reload_seconds
+            try:
+                mtime = os.path.getmtime(self.config_path)
+                if mtime == self._mtime:
+                    return
+                self._mtime = mtime
+                with open(self.config_path) as f:
+                    self._config = RoutingConfig.from_dict(json.load(f))
+                self.reloads += 1
+            except (OSError, ValueError) as e:
+                self.reload_errors += 1
+                print(f"⚠️ Model routing config {self.config_path} not loaded, keeping the previous one: {e}", file=sys.stderr)
+
+_default_router: Optional[ModelRouter] = None
+_default_router_lock = threading.Lock()
+
+def get_default_model_router() -> ModelRouter:
+    """Process-wide router configured from the environment"""
+    global _default_router
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = ModelRouter.from_env()
+        return _default_router
@@ -0,0 +1,266 @@
+"""
+Process-wide registry of pooled OpenAI clients
+Every evaluator, coach bot, Streamlit session and CLI batch in a process shares
+the same keep-alive HTTP connection pool instead of building a client per object.
+openai and httpx are imported with the first client, so rule-only callers never
+pay for them.
+"""
+
+import os
+import sys
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    import asyncio
+    import httpx
+    import openai
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+@dataclass(frozen=True)
+class ClientConfig:
+    """Connection pool and timeout settings for an OpenAI client"""
+    api_key: Optional[str] = None
+    base_url: Optional[str] = None
+    timeout_seconds: float = 60.0
+    connect_timeout_seconds: float = 5.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry_seconds: float = 30.0
+    max_retries: int = 0  # retries are handled by rate_limiter.RateLimiter
+
+    @classmethod
+    def from_env(cls) -> "ClientConfig":
+        """Read settings from OPENAI_* environment variables"""
+        return cls(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            base_url=os.getenv('OPENAI_BASE_URL') or None,
+            timeout_seconds=float(os.getenv('OPENAI_TIMEOUT_SECONDS', 60)),
+            connect_timeout_seconds=float(os.getenv('OPENAI_CONNECT_TIMEOUT_SECONDS', 5)),
+            max_connections=int(os.getenv('OPENAI_POOL_MAX_CONNECTIONS', 100)),
+            max_keepalive_connections=int(os.getenv('OPENAI_POOL_MAX_KEEPALIVE', 20)),
+            keepalive_expiry_seconds=float(os.getenv('OPENAI_POOL_KEEPALIVE_EXPIRY', 30)),
+            max_retries=int(os.getenv('OPENAI_MAX_RETRIES', 0))
+        )
+
+    def limits(self) -> "httpx.Limits":
+        import httpx
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry_seconds
+        )
+
+    def timeout(self) -> "httpx.Timeout":
+        import httpx
+        return httpx.Timeout(self.timeout_seconds, connect=self.connect_timeout_seconds)
+
+class ConnectionStats:
+    """Thread-safe counters of HTTP requests versus newly opened connections"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_event(self, event_name: str) -> None:
+        """Handle an httpcore trace event"""
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(0, self.requests - self.new_connections)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "tls_handshakes": self.tls_handshakes,
+                "reused_connections": reused,
+                "reuse_rate": reused / self.requests if self.requests else 0.0
+            }
+
+_stats = ConnectionStats()
+_clients: Dict[tuple, Any] = {}
+_http_clients: Dict[tuple, Any] = {}
+# Async (client, http client) pairs per event loop; an entry goes with its loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientConfig, tuple]]" = weakref.WeakKeyDictionary()
+_unbound_async_clients: Dict[ClientConfig, tuple] = {}
+_registry_lock = threading.Lock()
+_preconnected = False
+
+def _trace(event_name: str, info: Dict[str, Any]) -> None:
+    _stats.record_event(event_name)
+
+async def _atrace(event_name: str, info: Dict[str, Any]) -> None:
+    _stats.record_event(event_name)
+
+def _on_request(request: "httpx.Request") -> None:
+    _stats.record_request()
+    request.extensions["trace"] = _trace
+
+async def _aon_request(request: "httpx.Request") -> None:
+    _stats.record_request()
+    request.extensions["trace"] = _atrace
+
+def get_openai_client(config: Optional[ClientConfig] = None) -> "openai.OpenAI":
+    """Return the shared sync OpenAI client for a configuration, creating it on first use"""
+    import httpx
+    import openai
+
+    config = config or ClientConfig.from_env()
+    key = ("sync", config)
+    with _registry_lock:
+        client = _clients.get(key)
+        if client is None:
+            http_client = httpx.Client(
+                limits=config.limits(),
+                timeout=config.timeout(),
+                event_hooks={"request": [_on_request]}
+            )
+            client = openai.OpenAI(
+                api_key=config.api_key,
+                base_url=config.base_url,
+                timeout=config.timeout(),
+                max_retries=config.max_retries,
+                http_client=http_client
+            )
+            _http_clients[key] = http_client
+            _clients[key] = client
+        return client
+
+def _loop_clients(loop: Optional["asyncio.AbstractEventLoop"]) -> Dict[ClientConfig, tuple]:
+    """Async clients of an event loop (None outside one); call with _registry_lock held"""
+    if loop is None:
+        return _unbound_async_clients
+    # Drop clients of closed loops: their pools can never be used again, and open
+    # connections reference the loop, so the weak key alone would not release them
+    for closed in [other for other in _async_clients.keys() if other.is_closed()]:
+        del _async_clients[closed]
+    return _async_clients.setdefault(loop, {})
+
+def _async_client_entry(config: ClientConfig) -> tuple:
+    """(AsyncOpenAI, httpx.AsyncClient) for a configuration and the running event loop"""
+    import asyncio
+    import httpx
+    import openai
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _registry_lock:
+        clients = _loop_clients(loop)
+        entry = clients.get(config)
+        if entry is None:
+            http_client = httpx.AsyncClient(
+                limits=config.limits(),
+                timeout=config.timeout(),
+                event_hooks={"request": [_aon_request]}
+            )
+            client = openai.AsyncOpenAI(
+                api_key=config.api_key,
+                base_url=config.base_url,
+                timeout=config.timeout(),
+                max_retries=config.max_retries,
+                http_client=http_client
+            )
+            entry = clients[config] = (client, http_client)
+        return entry
+
+def get_async_openai_client(config: Optional[ClientConfig] = None) -> "openai.AsyncOpenAI":
+    """Return the shared async OpenAI client for a configuration and the running event loop
+
+    Async connection pools are bound to the loop that uses them, so each event loop
+    gets its own client; within a loop every caller shares it. Clients are released
+    with their loop, and aclose_async_clients() closes them before it shuts down.
+    """
+    return _async_client_entry(config or ClientConfig.from_env())[0]
+
+async def aclose_async_clients() -> None:
+    """Close the running event loop's async clients and their connections"""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    with _registry_lock:
+        clients = _async_clients.pop(loop, {})
+    for _, http_client in clients.values():
+        await http_client.aclose()
+
+def preconnect(config: Optional[ClientConfig] = None, connections: int = 1) -> bool:
+    """Open keep-alive connections to the API ahead of the first real request
+
+    Sends lightweight HEAD requests through the shared sync pool so the TCP and TLS
+    handshakes are paid at startup. Returns False if the API could not be reached.
+    """
+    import httpx
+
+    config = config or ClientConfig.from_env()
+    get_openai_client(config)
+    http_client = _http_clients[("sync", config)]
+    url = config.base_url or os.getenv('OPENAI_BASE_URL') or DEFAULT_BASE_URL
+
+    def ping(_: int) -> bool:
+        try:
+            http_client.head(url)
+            return True
+        except httpx.HTTPError as e:
+            print(f"⚠️ OpenAI pre-connect failed: {e}", file=sys.stderr)
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, connections)) as executor:
+        return all(executor.map(ping, range(max(1, connections))))
+
+async def apreconnect(config: Optional[ClientConfig] = None, connections: int = 1) -> bool:
+    """Async counterpart of preconnect() for the running event loop's shared pool"""
+    import asyncio
+    import httpx
+
+    config = config or ClientConfig.from_env()
+    _, http_client = _async_client_entry(config)
+    url = config.base_url or os.getenv('OPENAI_BASE_URL') or DEFAULT_BASE_URL
+
+    async def ping() -> bool:
+        try:
+            await http_client.head(url)
+            return True
+        except httpx.HTTPError as e:
+            print(f"⚠️ OpenAI pre-connect failed: {e}", file=sys.stderr)
+            return False
+
+    return all(await asyncio.gather(*(ping() for _ in range(max(1, connections)))))
+
+def preconnect_enabled() -> bool:
+    """Whether OPENAI_PRECONNECT asks for connections to be opened at startup"""
+    return os.getenv('OPENAI_PRECONNECT', 'false').lower() in ('1', 'true', 'yes')
+
+def preconnect_from_env() -> None:
+    """Pre-connect the sync pool once per process when OPENAI_PRECONNECT is enabled"""
+    global _preconnected
+    if not preconnect_enabled():
+        return
+    with _registry_lock:
+        if _preconnected:
+            return
+        _preconnected = True
+    preconnect(connections=int(os.getenv('OPENAI_PRECONNECT_CONNECTIONS', 1)))
+
+def connection_stats() -> Dict[str, Any]:
+    """Process-wide connection reuse metrics"""
+    stats = _stats.snapshot()
+    with _registry_lock:
+        stats["clients"] = (len(_clients) + len(_unbound_async_clients)
+                            + sum(len(clients) for clients in _async_clients.values()))
+    return stats
@@ -0,0 +1,161 @@
+"""
+Disk-backed cache for the AI sections of tennis daily plans
+Plans are keyed by the normalized training log plus model and prompt version,
+bounded by LRU eviction and expired after a TTL.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from training_evaluator import TennisTrainingLog, normalize_tennis_log
+
+DEFAULT_CACHE_PATH = ".tennis_plan_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+def plan_cache_key(tennis_log: TennisTrainingLog, model: str, prompt_version: str) -> str:
+    """Build the canonical cache key for a training log"""
+    log = normalize_tennis_log(tennis_log)
+    return "|".join([
+        model,
+        prompt_version,
+        ",".join(log.drills_trained),
+        log.intensity,
+        log.form_rating,
+        log.fatigue_level
+    ])
+
+class PlanCache:
+    """SQLite-backed LRU + TTL cache of GPT plan sections, safe to share across threads"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_plans_last_access ON plans(last_access)")
+
+        # In-process counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls) -> "PlanCache":
+        """Create a cache configured from PLAN_CACHE_* environment variables"""
+        return cls(
+            path=os.getenv('PLAN_CACHE_PATH', DEFAULT_CACHE_PATH),
+            max_entries=int(os.getenv('PLAN_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+            ttl_seconds=float(os.getenv('PLAN_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+        )
+
+    def key_for(self, tennis_log: TennisTrainingLog, model: str, prompt_version: str) -> str:
+        """Cache key for a log under the given model and prompt version"""
+        return plan_cache_key(tennis_log, model, prompt_version)
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Return (gpt_suggestions, raw_gpt_response) for a key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM plans WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            payload, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM plans WHERE key = ?", (key,))
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE plans SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        data = json.loads(payload)
+        return data["gpt_suggestions"], data["raw_gpt_response"]
+
+    def put(self, key: str, gpt_suggestions: Dict[str, Any], raw_gpt_response: str) -> None:
+        """Store the AI sections of a plan, evicting least recently used entries past max_entries"""
+        payload = json.dumps({"gpt_suggestions": gpt_suggestions, "raw_gpt_response": raw_gpt_response})
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO plans (key, payload, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+
+            overflow = self._conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM plans WHERE key IN "
+                    "(SELECT key FROM plans ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+
+    def contains(self, key: str) -> bool:
+        """Check for a fresh entry without touching counters or LRU order"""
+        with self._lock:
+            row = self._conn.execute("SELECT created_at FROM plans WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False
+        return not self.ttl_seconds or time.time() - row[0] <= self.ttl_seconds
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def clear(self) -> None:
+        """Remove every cached plan"""
+        with self._lock:
+            self._conn.execute("DELETE FROM plans")
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+_default_cache: Optional[PlanCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_default_plan_cache() -> Optional[PlanCache]:
+    """Process-wide plan cache, or None when disabled via PLAN_CACHE_ENABLED=false"""
+    global _default_cache
+    if os.getenv('PLAN_CACHE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PlanCache.from_env()
+        return _default_cache
@@ -0,0 +1,182 @@
+"""
+Process-wide background job queue for tennis plan generation
+Plan requests run on a shared worker pool and are tracked by job ID, so the UI can
+submit a request, keep working and poll for progress. Rule-based suggestions are
+available from submission and AI sections as they stream in. Identical requests
+already queued or running are coalesced onto the same job.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from training_evaluator import ProgressiveTennisDailyPlan, TennisDailyPlan, TennisTrainingEvaluator, TennisTrainingLog
+
+DEFAULT_WORKERS = 8
+DEFAULT_RETENTION_SECONDS = 600
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+@dataclass
+class PlanJob:
+    """A plan generation request and its progress"""
+    job_id: str
+    key: tuple
+    tennis_log: TennisTrainingLog
+    progress: ProgressiveTennisDailyPlan
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    plan: Optional[TennisDailyPlan] = None
+    error: Optional[str] = None
+
+    @property
+    def hardcoded_suggestions(self) -> List[str]:
+        """Rule-based suggestions, available from submission"""
+        return self.progress.hardcoded_suggestions
+
+    @property
+    def sections(self) -> Dict[str, str]:
+        """AI sections finished so far"""
+        return self.progress.ready_sections()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since submission (or until completion)"""
+        return (self.finished_at or time.time()) - self.submitted_at
+
+class PlanJobManager:
+    """Thread pool of plan generations addressed by job ID"""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, retention_seconds: float = DEFAULT_RETENTION_SECONDS):
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="plan-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, PlanJob] = {}
+        self._inflight: Dict[tuple, str] = {}  # job key -> job_id while queued or running
+
+        # In-process counters
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls) -> "PlanJobManager":
+        """Create a manager configured from PLAN_JOB_* environment variables"""
+        return cls(
+            max_workers=int(os.getenv('PLAN_JOB_WORKERS', DEFAULT_WORKERS)),
+            retention_seconds=float(os.getenv('PLAN_JOB_RETENTION_SECONDS', DEFAULT_RETENTION_SECONDS))
+        )
+
+    def submit(self, evaluator: TennisTrainingEvaluator, tennis_log: TennisTrainingLog,
+               workload: Optional[Any] = None, rules_only: bool = False) -> str:
+        """Queue a plan generation and return its job ID
+
+        A request identical to one still queued or running (same AI plan key and
+        same rule suggestions) returns the existing job's ID instead. Cached and
+        rules_only plans are done on return without using a worker.
+        """
+        key = (evaluator.plan_key(tennis_log, workload), tuple(evaluator.rule_suggestions(tennis_log, workload)), rules_only)
+        with self._lock:
+            self._prune(time.time())
+            existing = self._inflight.get(key)
+            if existing is not None:
+                self.deduplicated += 1
+                return existing
+
+        # The plan cache lookup and rules run unlocked, so other sessions' polls never wait on them
+        progress = evaluator.start_daily_plan(tennis_log, workload, rules_only=rules_only, background=False)
+        job = PlanJob(job_id=uuid.uuid4().hex, key=key, tennis_log=tennis_log, progress=progress)
+
+        with self._lock:
+            if not progress.done():
+                # An identical request may have been queued meanwhile; nothing was started for this one
+                existing = self._inflight.get(key)
+                if existing is not None:
+                    self.deduplicated += 1
+                    return existing
+                self._inflight[key] = job.job_id
+            self._jobs[job.job_id] = job
+            self.submitted += 1
+            if progress.done():
+                job.plan = progress.result()
+                job.status = DONE
+                job.started_at = job.finished_at = time.time()
+                self.completed += 1
+                return job.job_id
+
+        self._executor.submit(self._run, job, evaluator, workload)
+        return job.job_id
+
+    def get(self, job_id: str) -> Optional[PlanJob]:
+        """Current state of a job, or None if unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Job counters and current queue depth"""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                "queued": statuses.count(QUEUED),
+                "running": statuses.count(RUNNING),
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "completed": self.completed,
+                "failed": self.failed
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: PlanJob, evaluator: TennisTrainingEvaluator, workload: Optional[Any]) -> None:
+        job.started_at = time.time()
+        job.status = RUNNING
+
+        try:
+            job.plan = evaluator.complete_daily_plan(job.progress, workload)
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._inflight.pop(job.key, None)
+                if job.status == DONE:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def _prune(self, now: float) -> None:
+        """Forget finished jobs older than the retention period"""
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.retention_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+_default_manager: Optional[PlanJobManager] = None
+_default_manager_lock = threading.Lock()
+
+def get_default_job_manager() -> PlanJobManager:
+    """Process-wide job manager shared by every session"""
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = PlanJobManager.from_env()
+        return _default_manager
@@ -0,0 +1,68 @@
+"""
+JSON records for training logs and daily plans, shared by the CLI, API and app
+Parses and validates training logs from batch/API records, serializes plans, and
+computes the latency percentiles batch mode, the API server and the load tools report.
+"""
+
+from datetime import date, timedelta
+
+from training_evaluator import (
+    TennisTrainingLog, normalize_tennis_log,
+    TENNIS_DRILLS, INTENSITY_LEVELS, FORM_RATINGS, FATIGUE_LEVELS
+)
+
+def log_from_record(data):
+    """Build a canonical TennisTrainingLog from a JSON record (fields at top level or under "log")
+
+    Values are matched case-insensitively; unknown drills or levels raise ValueError.
+    """
+    data = data.get('log', data)
+    required_keys = ['drills_trained', 'intensity', 'form_rating', 'fatigue_level']
+    missing = [key for key in required_keys if key not in data]
+    if missing:
+        raise ValueError(f"JSON must contain: {', '.join(required_keys)} (missing {', '.join(missing)})")
+    if not isinstance(data['drills_trained'], list) or not data['drills_trained']:
+        raise ValueError("drills_trained must be a non-empty list")
+
+    # Canonical spelling, so "forehand" or "light" get the same rules and cache key as "Forehand"/"Light"
+    tennis_log = normalize_tennis_log(TennisTrainingLog(
+        drills_trained=data['drills_trained'],
+        intensity=data['intensity'],
+        form_rating=data['form_rating'],
+        fatigue_level=data['fatigue_level']
+    ))
+    unknown = [drill for drill in tennis_log.drills_trained if drill not in TENNIS_DRILLS]
+    if unknown:
+        raise ValueError(f"Unknown drills: {', '.join(unknown)} (choose from {', '.join(TENNIS_DRILLS)})")
+    for field, options in (('intensity', INTENSITY_LEVELS), ('form_rating', FORM_RATINGS), ('fatigue_level', FATIGUE_LEVELS)):
+        if getattr(tennis_log, field) not in options:
+            raise ValueError(f"{field} must be one of {', '.join(options)} (got {getattr(tennis_log, field)!r})")
+    return tennis_log
+
+def plan_to_dict(daily_plan, tennis_log):
+    """Serializable view of a plan and the log it was generated from"""
+    return {
+        "yesterday_session": {
+            "drills_trained": tennis_log.drills_trained,
+            "intensity": tennis_log.intensity,
+            "form_rating": tennis_log.form_rating,
+            "fatigue_level": tennis_log.fatigue_level
+        },
+        "hardcoded_suggestions": daily_plan.hardcoded_suggestions,
+        "ai_suggestions": daily_plan.gpt_suggestions,
+        "full_ai_response": daily_plan.raw_gpt_response,
+        "is_fallback": daily_plan.is_fallback
+    }
+
+def record_session_date(record):
+    """Session date of a batch record ("date", ISO format), defaulting to yesterday"""
+    if isinstance(record, dict) and record.get("date"):
+        return date.fromisoformat(str(record["date"]))
+    return date.today() - timedelta(days=1)
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
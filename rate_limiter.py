@@ -0,0 +1,355 @@
+"""
+Client-side rate limiting, adaptive concurrency and retries for OpenAI calls
+Requests and estimated tokens are metered through shared token buckets sized to
+the account's RPM/TPM quota, concurrency adapts AIMD-style to 429s and latency,
+and retryable errors are retried with jittered backoff inside a total deadline.
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 64
+DEFAULT_LATENCY_TARGET_SECONDS = 30.0
+DEFAULT_RETRY_DEADLINE_SECONDS = 60.0
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY_SECONDS = 0.5
+DEFAULT_MAX_DELAY_SECONDS = 8.0
+
+# Burst allowance of the buckets, in seconds of quota. Providers enforce limits over
+# windows shorter than a minute, so a full minute's burst would still draw 429s
+DEFAULT_BURST_SECONDS = 1.0
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUSES = {408, 409, 429}
+
+# Async callers poll for a free concurrency slot at this interval
+ASYNC_SLOT_POLL_SECONDS = 0.02
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute
+
+    Callers reserve capacity up front and may drive the bucket into debt; the
+    returned delay is how long they must wait for their reservation to be covered.
+    This spaces requests evenly instead of letting them burst into the quota.
+    """
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = DEFAULT_BURST_SECONDS):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate_per_second * burst_seconds)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens and return the seconds to wait before using them"""
+        with self._lock:
+            self._refill(time.monotonic())
+            # A bucket smaller than one request could never hold enough for it
+            self.capacity = max(self.capacity, amount)
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate_per_second
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens, e.g. when a request used fewer than estimated"""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit: grows by ~1 per window of successes, halves on 429s
+
+    Responses slower than the latency target shrink the limit gently, so the
+    client backs off before the provider starts rejecting requests.
+    """
+
+    def __init__(self, min_limit: int = DEFAULT_MIN_CONCURRENCY, max_limit: int = DEFAULT_MAX_CONCURRENCY,
+                 latency_target: float = DEFAULT_LATENCY_TARGET_SECONDS):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_target = latency_target
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a slot is free; False if timeout elapsed first"""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    async def aacquire(self, timeout: Optional[float] = None) -> bool:
+        """Async counterpart of acquire() - polls so sync and async callers can share a limit"""
+        import asyncio
+
+        end = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire():
+            if end is not None and time.monotonic() >= end:
+                return False
+            await asyncio.sleep(ASYNC_SLOT_POLL_SECONDS)
+        return True
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self, latency: float) -> None:
+        with self._condition:
+            if latency > self.latency_target:
+                self._decrease(0.9)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+    def on_overload(self) -> None:
+        with self._condition:
+            self._decrease(0.5)
+
+    def _decrease(self, factor: float) -> None:
+        # A burst of 429s from requests sent together counts as one congestion signal
+        now = time.monotonic()
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+
+def is_rate_limited(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits, timeouts, connection failures and 5xx responses"""
+    import openai  # already loaded by whichever client raised the error
+
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and (status in RETRYABLE_STATUSES or status >= 500)
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Server-suggested wait from a Retry-After header, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class RateLimiter:
+    """Shared RPM/TPM budget, adaptive concurrency and retry policy for API calls"""
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 min_concurrency: int = DEFAULT_MIN_CONCURRENCY, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 latency_target: float = DEFAULT_LATENCY_TARGET_SECONDS,
+                 retry_deadline: float = DEFAULT_RETRY_DEADLINE_SECONDS, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 base_delay: float = DEFAULT_BASE_DELAY_SECONDS, max_delay: float = DEFAULT_MAX_DELAY_SECONDS,
+                 burst_seconds: float = DEFAULT_BURST_SECONDS):
+        # A limit of 0 means unmetered
+        self.requests = TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute > 0 else None
+        self.concurrency = AdaptiveConcurrency(min_concurrency, max_concurrency, latency_target)
+        self.retry_deadline = retry_deadline
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        # In-process counters
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.gave_up = 0
+        self.throttled = 0
+        self.throttle_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Create a limiter configured from OPENAI_* rate limit environment variables"""
+        return cls(
+            requests_per_minute=float(os.getenv('OPENAI_RPM_LIMIT', 0)),
+            tokens_per_minute=float(os.getenv('OPENAI_TPM_LIMIT', 0)),
+            min_concurrency=int(os.getenv('OPENAI_MIN_CONCURRENCY', DEFAULT_MIN_CONCURRENCY)),
+            max_concurrency=int(os.getenv('OPENAI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)),
+            latency_target=float(os.getenv('OPENAI_LATENCY_TARGET_SECONDS', DEFAULT_LATENCY_TARGET_SECONDS)),
+            retry_deadline=float(os.getenv('OPENAI_RETRY_DEADLINE_SECONDS', DEFAULT_RETRY_DEADLINE_SECONDS)),
+            max_attempts=int(os.getenv('OPENAI_RETRY_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)),
+            base_delay=float(os.getenv('OPENAI_RETRY_BASE_DELAY_SECONDS', DEFAULT_BASE_DELAY_SECONDS)),
+            max_delay=float(os.getenv('OPENAI_RETRY_MAX_DELAY_SECONDS', DEFAULT_MAX_DELAY_SECONDS)),
+            burst_seconds=float(os.getenv('OPENAI_RATE_BURST_SECONDS', DEFAULT_BURST_SECONDS))
+        )
+
+    def call(self, fn: Callable[[], Any], estimated_tokens: int = 0, deadline: Optional[float] = None) -> Any:
+        """Run fn() within the rate limits, retrying retryable errors until the deadline
+
+        deadline is in seconds from now (default: retry_deadline). The last error is
+        raised once attempts or time run out.
+        """
+        end = time.monotonic() + (deadline if deadline is not None else self.retry_deadline)
+        self._count("calls")
+        attempt = 0
+        while True:
+            attempt += 1
+            time.sleep(self._reserve(estimated_tokens, end))
+            if not self.concurrency.acquire(timeout=max(0.0, end - time.monotonic())):
+                self._count("gave_up")
+                raise TimeoutError("Timed out waiting for an OpenAI request slot")
+            start = time.monotonic()
+            try:
+                self._count("attempts")
+                result = fn()
+            except Exception as e:
+                error = e
+            else:
+                self._on_success(result, time.monotonic() - start, estimated_tokens)
+                return result
+            finally:
+                self.concurrency.release()
+
+            # Back off without holding a concurrency slot
+            delay = self._on_error(error, attempt, end, estimated_tokens)
+            if delay is None:
+                raise error
+            time.sleep(delay)
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], estimated_tokens: int = 0,
+                    deadline: Optional[float] = None) -> Any:
+        """Async counterpart of call() for coroutine functions"""
+        import asyncio
+
+        end = time.monotonic() + (deadline if deadline is not None else self.retry_deadline)
+        self._count("calls")
+        attempt = 0
+        while True:
+            attempt += 1
+            await asyncio.sleep(self._reserve(estimated_tokens, end))
+            if not await self.concurrency.aacquire(timeout=max(0.0, end - time.monotonic())):
+                self._count("gave_up")
+                raise TimeoutError("Timed out waiting for an OpenAI request slot")
+            start = time.monotonic()
+            try:
+                self._count("attempts")
+                result = await fn()
+            except Exception as e:
+                error = e
+            else:
+                self._on_success(result, time.monotonic() - start, estimated_tokens)
+                return result
+            finally:
+                self.concurrency.release()
+
+            # Back off without holding a concurrency slot
+            delay = self._on_error(error, attempt, end, estimated_tokens)
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Call counters, current concurrency limit and remaining budget"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "gave_up": self.gave_up,
+                "throttled": self.throttled,
+                "throttle_seconds": round(self.throttle_seconds, 3),
+                "concurrency_limit": round(self.concurrency.limit, 2),
+                "in_flight": self.concurrency.in_flight,
+                "requests_available": round(self.requests.available(), 1) if self.requests else None,
+                "tokens_available": round(self.tokens.available(), 1) if self.tokens else None
+            }
+
+    def _reserve(self, estimated_tokens: int, end: float) -> float:
+        """Reserve one request and the estimated tokens; return the wait before sending
+
+        Raises TimeoutError, giving the reservation back, when the wait would run past
+        the deadline at end - the request could not be sent in time anyway.
+        """
+        wait = max(
+            self.requests.reserve(1) if self.requests else 0.0,
+            self.tokens.reserve(estimated_tokens) if self.tokens else 0.0
+        )
+        if wait > end - time.monotonic():
+            if self.requests:
+                self.requests.refund(1)
+            if self.tokens:
+                self.tokens.refund(estimated_tokens)
+            self._count("gave_up")
+            raise TimeoutError(f"OpenAI rate limit budget is {wait:.1f}s away, past the deadline")
+        if wait > 0:
+            with self._lock:
+                self.throttled += 1
+                self.throttle_seconds += wait
+        return wait
+
+    def _on_success(self, result: Any, latency: float, estimated_tokens: int) -> None:
+        self.concurrency.on_success(latency)
+        # Give back what the request didn't use, now the real usage is known
+        usage = getattr(result, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if self.tokens and isinstance(total_tokens, int) and total_tokens < estimated_tokens:
+            self.tokens.refund(estimated_tokens - total_tokens)
+
+    def _on_error(self, error: Exception, attempt: int, end: float, estimated_tokens: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None to give up and raise"""
+        if is_rate_limited(error):
+            self._count("rate_limited")
+            self.concurrency.on_overload()
+        elif self.tokens and getattr(error, "status_code", None) is not None:
+            # Rejected before generating anything - the estimated tokens weren't spent
+            self.tokens.refund(estimated_tokens)
+
+        if not is_retryable(error) or attempt >= self.max_attempts:
+            if is_retryable(error):
+                self._count("gave_up")
+            return None
+
+        # Full jitter, but never sooner than the server asked
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        delay = max(delay, retry_after_seconds(error) or 0.0)
+        if time.monotonic() + delay >= end:
+            self._count("gave_up")
+            return None
+        self._count("retries")
+        return delay
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+_default_limiter: Optional[RateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+def get_default_rate_limiter() -> RateLimiter:
+    """Process-wide limiter shared by every evaluator and coach bot"""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter.from_env()
+        return _default_limiter
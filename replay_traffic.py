@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Replay captured plan and TennisBot traffic as a load test
+Reads a traffic_capture JSONL file and re-issues every request at its original
+arrival offset divided by --speed (1x, 10x, 100x...) through a fixed number of
+workers, against the live OpenAI API or a local stub (--stub). Reports queueing
+delay, latency percentiles, fallback rate and cache/coalescing effect per kind.
+Run with: python replay_traffic.py traffic.jsonl --speed 10 --workers 32 --stub
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of durations in seconds, as milliseconds"""
+    from plan_records import percentile
+
+    values = sorted(values)
+    return {
+        "p50": round(percentile(values, 0.50) * 1000, 1),
+        "p95": round(percentile(values, 0.95) * 1000, 1),
+        "p99": round(percentile(values, 0.99) * 1000, 1),
+        "max": round(values[-1] * 1000, 1) if values else 0.0
+    }
+
+def llm_requests() -> int:
+    """OpenAI requests made by this process so far, from the metrics registry"""
+    from metrics import get_metrics
+
+    series = get_metrics().snapshot()["counters"].get("llm_requests_total", [])
+    return int(sum(entry["value"] for entry in series))
+
+async def replay(records: List[Dict[str, Any]], speed: float, workers: int, plan_cache: Optional[Any],
+                 answer_cache: Optional[Any], timeout: Optional[float]) -> Dict[str, Any]:
+    """Issue records at their (scaled) captured arrival times and measure each one"""
+    from openai_clients import aclose_async_clients
+    from plan_records import log_from_record
+    from traffic_capture import workload_from_dict
+    from training_evaluator import AsyncTennisCoachBot, AsyncTennisTrainingEvaluator
+
+    evaluator = AsyncTennisTrainingEvaluator(plan_cache=plan_cache, timeout=timeout)
+    slots = asyncio.Semaphore(workers)
+    results: Dict[str, Dict[str, Any]] = {
+        kind: {"queue": [], "latency": [], "total": [], "sources": Counter()} for kind in ("plan", "coach")
+    }
+    invalid: Counter = Counter()
+
+    def identity(tennis_log):
+        return (tuple(tennis_log.drills_trained), tennis_log.intensity, tennis_log.form_rating, tennis_log.fatigue_level)
+
+    # TennisBot questions need the plan the player was looking at. Build one per log
+    # through the workers before the clock starts, bypassing the plan cache, so the
+    # replayed plans, timings and llm_requests only cover the captured requests
+    coach_logs = {}
+    for record in records:
+        if record["kind"] == "coach":
+            try:
+                tennis_log = log_from_record(record["log"])
+            except (ValueError, TypeError, KeyError, AttributeError):
+                continue
+            coach_logs.setdefault(identity(tennis_log), tennis_log)
+
+    warmup_evaluator = AsyncTennisTrainingEvaluator(plan_cache=None, timeout=timeout)
+
+    async def build_coach_plan(tennis_log):
+        async with slots:
+            return await warmup_evaluator.create_daily_plan(tennis_log)
+
+    warmup_start = time.perf_counter()
+    llm_before = llm_requests()
+    coach_plans = dict(zip(coach_logs, await asyncio.gather(*(build_coach_plan(log) for log in coach_logs.values()))))
+    warmup = {
+        "plans": len(coach_plans),
+        "fallbacks": sum(plan.is_fallback for plan in coach_plans.values()),
+        "llm_requests": llm_requests() - llm_before,
+        "seconds": round(time.perf_counter() - warmup_start, 3)
+    }
+
+    async def issue(record, arrival):
+        kind = record["kind"]
+        try:
+            tennis_log = log_from_record(record["log"])
+            workload = workload_from_dict(record["workload"]) if record.get("workload") else None
+            question = str(record["question"]) if kind == "coach" else None
+        except (ValueError, TypeError, KeyError, AttributeError):
+            invalid[kind] += 1
+            return
+
+        async with slots:
+            started = time.perf_counter()
+            if kind == "plan" and record.get("source") == "rules":
+                # Captured rule-based plans made no API request, so neither does their replay
+                daily_plan = await evaluator.start_daily_plan(tennis_log, workload, rules_only=True).aresult()
+                source = "rules" if daily_plan.is_fallback else "cache"
+            elif kind == "plan":
+                daily_plan = await evaluator.create_daily_plan(tennis_log, workload=workload)
+                source = "fallback" if daily_plan.is_fallback else "ok"
+            else:
+                bot = AsyncTennisCoachBot(coach_plans[identity(tennis_log)], tennis_log, timeout=timeout,
+                                          answer_cache=answer_cache)
+                await bot.ask_question(question)
+                # Fallback apologies are the only answers a fresh chat does not remember
+                source = "cache" if bot.turn_stats[-1].cached else ("ok" if len(bot.memory) else "fallback")
+            finished = time.perf_counter()
+
+        result = results[kind]
+        result["queue"].append(started - arrival)
+        result["latency"].append(finished - started)
+        result["total"].append(finished - arrival)
+        result["sources"][source] += 1
+
+    first_ts = records[0]["ts"]
+    start = time.perf_counter()
+    llm_before = llm_requests()
+    tasks = []
+    for record in records:
+        arrival = start + (record["ts"] - first_ts) / speed
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(issue(record, arrival)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    await aclose_async_clients()
+
+    report: Dict[str, Any] = {
+        "records": len(records),
+        "speed": speed,
+        "workers": workers,
+        "capture_seconds": round(records[-1]["ts"] - first_ts, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "offered_rps": round(len(records) * speed / (records[-1]["ts"] - first_ts), 2) if records[-1]["ts"] > first_ts else None,
+        "achieved_rps": round(len(records) / elapsed, 2) if elapsed > 0 else 0.0,
+        "llm_requests": llm_requests() - llm_before,
+        "coach_plan_warmup": warmup,
+        "invalid": sum(invalid.values())
+    }
+    for kind, result in results.items():
+        count = len(result["latency"])
+        if not count:
+            continue
+        report[kind] = {
+            "requests": count,
+            "fallback_rate": round(result["sources"]["fallback"] / count, 4),
+            "sources": dict(result["sources"]),
+            "queue_ms": summarize(result["queue"]),
+            "latency_ms": summarize(result["latency"]),
+            "total_ms": summarize(result["total"])
+        }
+    return report
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Replay captured plan and TennisBot traffic as a load test")
+    parser.add_argument("traffic", help="JSONL capture written via TRAFFIC_CAPTURE_PATH")
+    parser.add_argument("--speed", type=float, default=1.0, help="Arrival rate multiplier, e.g. 1, 10 or 100 (default: 1)")
+    parser.add_argument("--workers", type=int, default=16, help="Requests served at once; later arrivals queue (default: 16)")
+    parser.add_argument("--limit", type=int, help="Replay only the first N records")
+    parser.add_argument("--timeout", type=float, help="Seconds before a request falls back (default: no limit)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the plan and answer caches")
+    parser.add_argument("--stub", action="store_true", help="Replay against a local OpenAI-compatible stub instead of the live API")
+    parser.add_argument("--stub-latency", type=float, default=0.5, help="Stub mean response time in seconds (default: 0.5)")
+    parser.add_argument("--stub-jitter", type=float, default=0.2, help="Stub +/- jitter in seconds (default: 0.2)")
+    parser.add_argument("--stub-error-rate", type=float, default=0.0, help="Fraction of stub responses that are 429/500 errors")
+    parser.add_argument("--report", help="Also write the report as JSON to this path")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.speed <= 0 or args.workers < 1:
+        print("❌ --speed must be positive and --workers at least 1", file=sys.stderr)
+        return 2
+
+    from traffic_capture import read_traffic
+
+    records = sorted(read_traffic(args.traffic), key=lambda record: record.get("ts", 0))
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print(f"❌ No plan or coach records in {args.traffic}", file=sys.stderr)
+        return 1
+
+    stub = None
+    tmpdir = tempfile.TemporaryDirectory()
+    if args.stub:
+        from benchmarks.stub_server import start_stub_process
+
+        stub, base_url = start_stub_process(args.stub_latency, args.stub_jitter, args.stub_error_rate)
+        # Set before load_dotenv(), which does not override existing variables
+        os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+        os.environ["OPENAI_API_KEY"] = "stub-key"
+    load_dotenv()
+
+    from plan_cache import PlanCache, get_default_plan_cache
+    from answer_cache import AnswerCache, get_default_answer_cache
+
+    if args.no_cache:
+        plan_cache, answer_cache = None, None
+    elif args.stub:
+        # Stub answers must never end up in the real plan cache
+        plan_cache, answer_cache = PlanCache(path=os.path.join(tmpdir.name, "plans.sqlite3")), AnswerCache()
+    else:
+        plan_cache, answer_cache = get_default_plan_cache(), get_default_answer_cache()
+
+    target = "local stub" if args.stub else "live OpenAI API"
+    print(f"🔁 Replaying {len(records)} requests at {args.speed:g}x with {args.workers} workers against the {target}...",
+          file=sys.stderr)
+    try:
+        report = asyncio.run(replay(records, args.speed, args.workers, plan_cache, answer_cache, args.timeout))
+
+        from single_flight import single_flight_stats
+        report["target"] = "stub" if args.stub else "live"
+        report["coalesced_calls"] = single_flight_stats()
+        if plan_cache is not None:
+            report["plan_cache"] = plan_cache.stats()
+        if answer_cache is not None:
+            report["answer_cache"] = answer_cache.stats()
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+        tmpdir.cleanup()
+
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.report}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
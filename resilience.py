@@ -0,0 +1,381 @@
+"""
+Deadlines, hedged requests and a circuit breaker for OpenAI calls
+Every call gets a total deadline. Optionally, a duplicate request is sent when the
+first is slower than recent p95 latency, and the first answer wins. After repeated
+provider failures the circuit opens and calls fail immediately, so callers serve
+their fallback at once instead of waiting out timeouts.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from rate_limiter import is_retryable
+
+DEFAULT_DEADLINE_SECONDS = 30.0
+DEFAULT_HEDGE_PERCENTILE = 0.95
+DEFAULT_HEDGE_MIN_DELAY_SECONDS = 1.0
+DEFAULT_HEDGE_MAX_RATIO = 0.1
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_SECONDS = 30.0
+
+# Latency samples per request kind, and how many are needed before hedging
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+
+# Threads running sync calls and hedges; above the limiter's default maximum
+# concurrency so that waiting for one never counts against a call's deadline
+CALL_WORKERS = 128
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit is open"""
+
+class StreamInterruptedError(Exception):
+    """A streamed response failed after part of it was delivered
+
+    It is not retried (the caller already has the first part), but the underlying
+    error still counts towards the circuit breaker.
+    """
+
+class LatencyTracker:
+    """Rolling window of call latencies"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one trial call through after a cool-down"""
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 recovery_seconds: float = DEFAULT_RECOVERY_SECONDS):
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = recovery_seconds
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+        # In-process counters
+        self.opened = 0
+        self.short_circuited = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """End a trial call that neither proved nor disproved provider health"""
+        with self._lock:
+            self._trial_in_flight = False
+
+def is_provider_failure(error: BaseException) -> bool:
+    """Errors that say the provider is unhealthy, as opposed to a bad request"""
+    import asyncio
+
+    if isinstance(error, StreamInterruptedError) and error.__cause__ is not None:
+        error = error.__cause__
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError)) or is_retryable(error)
+
+class CallGuard:
+    """Applies the deadline, hedging and circuit breaker policy to provider calls
+
+    Callers pass fn(remaining_seconds) performing one complete call - including
+    its rate limiting and retries - within the given number of seconds. The guard
+    stops waiting at the deadline whatever fn does: sync calls run on its worker
+    pool and are abandoned there, async calls are cancelled.
+    """
+
+    def __init__(self, deadline: float = DEFAULT_DEADLINE_SECONDS, hedge: bool = False,
+                 hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+                 hedge_min_delay: float = DEFAULT_HEDGE_MIN_DELAY_SECONDS,
+                 hedge_max_ratio: float = DEFAULT_HEDGE_MAX_RATIO,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_ratio = hedge_max_ratio
+        self.breaker = breaker
+        self._latency: Dict[Hashable, LatencyTracker] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # In-process counters
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.deadline_exceeded = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_env(cls) -> "CallGuard":
+        """Create a guard configured from OPENAI_CALL_*, OPENAI_HEDGE_* and CIRCUIT_BREAKER_* variables"""
+        breaker = None
+        if os.getenv('CIRCUIT_BREAKER_ENABLED', 'true').lower() not in ('0', 'false', 'no'):
+            breaker = CircuitBreaker(
+                failure_threshold=int(os.getenv('CIRCUIT_BREAKER_FAILURE_THRESHOLD', DEFAULT_FAILURE_THRESHOLD)),
+                recovery_seconds=float(os.getenv('CIRCUIT_BREAKER_RECOVERY_SECONDS', DEFAULT_RECOVERY_SECONDS))
+            )
+        return cls(
+            deadline=float(os.getenv('OPENAI_CALL_DEADLINE_SECONDS', DEFAULT_DEADLINE_SECONDS)),
+            hedge=os.getenv('OPENAI_HEDGE_ENABLED', 'false').lower() in ('1', 'true', 'yes'),
+            hedge_percentile=float(os.getenv('OPENAI_HEDGE_PERCENTILE', DEFAULT_HEDGE_PERCENTILE)),
+            hedge_min_delay=float(os.getenv('OPENAI_HEDGE_MIN_DELAY_SECONDS', DEFAULT_HEDGE_MIN_DELAY_SECONDS)),
+            hedge_max_ratio=float(os.getenv('OPENAI_HEDGE_MAX_RATIO', DEFAULT_HEDGE_MAX_RATIO)),
+            breaker=breaker
+        )
+
+    def call(self, fn: Callable[[float], Any], kind: Hashable = None, hedge: bool = True) -> Any:
+        """Run fn within the deadline, hedging it when allowed; raises CircuitOpenError when open"""
+        self._admit()
+        start = time.monotonic()
+        delay = self._hedge_delay(kind) if hedge else None
+        try:
+            if delay is None:
+                result = self._call_bounded(fn)
+            else:
+                result = self._call_hedged(fn, start, delay)
+        except Exception as e:
+            self._on_failure(e)
+            raise
+        except BaseException:
+            # Cancelled or interrupted - says nothing about provider health
+            if self.breaker is not None:
+                self.breaker.release()
+            raise
+        self._on_success(kind, time.monotonic() - start)
+        return result
+
+    async def acall(self, fn: Callable[[float], Awaitable[Any]], kind: Hashable = None, hedge: bool = True) -> Any:
+        """Async counterpart of call(); losing hedged requests are cancelled"""
+        import asyncio
+
+        self._admit()
+        start = time.monotonic()
+        delay = self._hedge_delay(kind) if hedge else None
+        try:
+            if delay is None:
+                result = await asyncio.wait_for(fn(self.deadline), timeout=self.deadline)
+            else:
+                result = await self._acall_hedged(fn, start, delay)
+        except Exception as e:
+            self._on_failure(e)
+            raise
+        except BaseException:
+            # Cancelled or interrupted - says nothing about provider health
+            if self.breaker is not None:
+                self.breaker.release()
+            raise
+        self._on_success(kind, time.monotonic() - start)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Call outcomes, hedging, breaker state and latency percentiles per request kind"""
+        with self._lock:
+            stats = {
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "deadline_exceeded": self.deadline_exceeded,
+                "deadline_seconds": self.deadline,
+                "hedging": self.hedge,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "latency_ms": {
+                    str(kind): {
+                        "p50": round((tracker.percentile(0.50) or 0.0) * 1000, 1),
+                        "p95": round((tracker.percentile(0.95) or 0.0) * 1000, 1),
+                        "p99": round((tracker.percentile(0.99) or 0.0) * 1000, 1)
+                    }
+                    for kind, tracker in self._latency.items()
+                }
+            }
+        if self.breaker is not None:
+            stats["circuit"] = {
+                "state": self.breaker.state,
+                "opened": self.breaker.opened,
+                "short_circuited": self.breaker.short_circuited
+            }
+        return stats
+
+    def circuit_open(self) -> bool:
+        """Whether calls are currently being short-circuited"""
+        return self.breaker is not None and self.breaker.state == OPEN
+
+    def _admit(self) -> None:
+        self._count("calls")
+        if self.breaker is not None and not self.breaker.allow():
+            self._count("failures")
+            raise CircuitOpenError("OpenAI is unavailable - serving fallback recommendations")
+
+    def _hedge_delay(self, kind: Hashable) -> Optional[float]:
+        """Seconds to wait before hedging, or None when this call shouldn't be hedged"""
+        if not self.hedge:
+            return None
+        with self._lock:
+            tracker = self._latency.get(kind)
+            if tracker is None or len(tracker) < MIN_HEDGE_SAMPLES:
+                return None
+            # Hedges are capped to a fraction of calls so a slow provider isn't hit twice as hard
+            if self.hedges >= self.hedge_max_ratio * self.calls:
+                return None
+        return max(self.hedge_min_delay, tracker.percentile(self.hedge_percentile))
+
+    def _call_bounded(self, fn: Callable[[float], Any]) -> Any:
+        future = self._call_executor().submit(fn, self.deadline)
+        done, _ = wait([future], timeout=self.deadline)
+        if not done:
+            # The request finishes in the background and is discarded
+            raise TimeoutError("OpenAI request exceeded its deadline")
+        return future.result()
+
+    def _call_hedged(self, fn: Callable[[float], Any], start: float, delay: float) -> Any:
+        executor = self._call_executor()
+        primary = executor.submit(fn, self.deadline)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count("hedges")
+        hedge = executor.submit(fn, max(0.0, self.deadline - (time.monotonic() - start)))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = self.deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    # The slower request finishes in the background and is discarded
+                    return future.result()
+                error = future.exception()
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError("OpenAI request exceeded its deadline")
+
+    async def _acall_hedged(self, fn: Callable[[float], Awaitable[Any]], start: float, delay: float) -> Any:
+        import asyncio
+        primary = asyncio.ensure_future(fn(self.deadline))
+        tasks = {primary}
+        hedge = None
+        error: Optional[BaseException] = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self._count("hedges")
+                hedge = asyncio.ensure_future(fn(max(0.0, self.deadline - (time.monotonic() - start))))
+                tasks.add(hedge)
+            pending = set(tasks)
+            while pending:
+                remaining = self.deadline - (time.monotonic() - start)
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            if error is not None and not pending:
+                raise error
+            raise asyncio.TimeoutError()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _call_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=CALL_WORKERS, thread_name_prefix="openai-call")
+            return self._executor
+
+    def _on_success(self, kind: Hashable, latency: float) -> None:
+        with self._lock:
+            self.successes += 1
+            tracker = self._latency.setdefault(kind, LatencyTracker())
+        tracker.record(latency)
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def _on_failure(self, error: BaseException) -> None:
+        import asyncio
+        self._count("failures")
+        if isinstance(error, StreamInterruptedError):
+            error = error.__cause__ or error
+        if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+            self._count("deadline_exceeded")
+        if self.breaker is None:
+            return
+        if is_provider_failure(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+_default_guard: Optional[CallGuard] = None
+_default_guard_lock = threading.Lock()
+
+def get_default_call_guard() -> CallGuard:
+    """Process-wide guard shared by every evaluator and coach bot"""
+    global _default_guard
+    with _default_guard_lock:
+        if _default_guard is None:
+            _default_guard = CallGuard.from_env()
+        return _default_guard
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Precompiled lookup-table rule engine for the hardcoded tennis suggestions
+Every canonical training log packs into a 13-bit key (drill bitmask + enum codes);
+the rules are evaluated once per key, so roster-sized batches (evaluate_frame) become
+array lookups. Single plans call the rules directly - compiling takes tens of milliseconds.
+Run with: python rule_engine.py --verify      (equivalence check over every log)
+          python rule_engine.py --benchmark   (per-log cost)
+"""
+
+import argparse
+import itertools
+import random
+import sys
+import threading
+import time
+from dataclasses import replace
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from training_evaluator import (
+    TennisTrainingLog, evaluate_tennis_rules,
+    TENNIS_DRILLS, INTENSITY_LEVELS, FORM_RATINGS, FATIGUE_LEVELS, BASIC_DRILLS, ADVANCED_DRILLS
+)
+
+# Packed key layout: bits 0-6 drills, 7-8 intensity, 9-10 form rating, 11-12 fatigue level
+DRILL_BITS = {drill: 1 << i for i, drill in enumerate(TENNIS_DRILLS)}
+INTENSITY_CODES = {value: code for code, value in enumerate(INTENSITY_LEVELS)}
+FORM_CODES = {value: code for code, value in enumerate(FORM_RATINGS)}
+FATIGUE_CODES = {value: code for code, value in enumerate(FATIGUE_LEVELS)}
+
+INTENSITY_SHIFT = 7
+FORM_SHIFT = 9
+FATIGUE_SHIFT = 11
+KEY_SPACE = 1 << 13
+
+def drill_mask(drills: List[str]) -> int:
+    """Bitmask of a drill list, or -1 if it contains an unknown or repeated drill"""
+    mask = 0
+    for drill in drills:
+        bit = DRILL_BITS.get(drill)
+        if bit is None or mask & bit:
+            return -1
+        mask |= bit
+    return mask
+
+def pack_key(mask: int, intensity_code: int, form_code: int, fatigue_code: int) -> int:
+    """Combine a drill mask and enum codes into a packed key"""
+    return mask | intensity_code << INTENSITY_SHIFT | form_code << FORM_SHIFT | fatigue_code << FATIGUE_SHIFT
+
+def pack_log_key(tennis_log: TennisTrainingLog) -> Optional[int]:
+    """Packed key of a log, or None if any field is not canonical"""
+    mask = drill_mask(tennis_log.drills_trained)
+    intensity = INTENSITY_CODES.get(tennis_log.intensity)
+    form = FORM_CODES.get(tennis_log.form_rating)
+    fatigue = FATIGUE_CODES.get(tennis_log.fatigue_level)
+    if mask < 0 or intensity is None or form is None or fatigue is None:
+        return None
+    return pack_key(mask, intensity, form, fatigue)
+
+def unpack_key(key: int) -> TennisTrainingLog:
+    """Rebuild the canonical log (drills in standard order) for a packed key"""
+    return TennisTrainingLog(
+        drills_trained=[drill for drill, bit in DRILL_BITS.items() if key & bit],
+        intensity=INTENSITY_LEVELS[key >> INTENSITY_SHIFT & 0b11],
+        form_rating=FORM_RATINGS[key >> FORM_SHIFT & 0b11],
+        fatigue_level=FATIGUE_LEVELS[key >> FATIGUE_SHIFT & 0b11]
+    )
+
+def iter_keys() -> Iterator[int]:
+    """Every valid packed key, including the empty drill list"""
+    for mask in range(1 << len(TENNIS_DRILLS)):
+        for intensity, form, fatigue in itertools.product(
+            range(len(INTENSITY_LEVELS)), range(len(FORM_RATINGS)), range(len(FATIGUE_LEVELS))
+        ):
+            yield pack_key(mask, intensity, form, fatigue)
+
+class RuleTable:
+    """Rule outputs for every canonical log, indexed by packed key
+
+    Suggestions that quote the drill list are stored as prefix/suffix templates
+    and rendered with the caller's drill order, so lookups match the rules exactly.
+    """
+
+    def __init__(self, rule_fn: Callable[[TennisTrainingLog], List[str]]):
+        self._rule_fn = rule_fn
+        self._entries: List[Optional[tuple]] = [None] * KEY_SPACE
+        self._batch_arrays = None
+
+        for key in iter_keys():
+            log = unpack_key(key)
+            suggestions = rule_fn(log)
+            reordered = rule_fn(replace(log, drills_trained=log.drills_trained[::-1]))
+            if len(reordered) != len(suggestions):
+                raise ValueError(f"Rule output for {log} depends on drill order")
+
+            # Find the (at most one) suggestion that quotes the drills in order
+            template = None
+            joined = ", ".join(log.drills_trained)
+            for index, (text, reordered_text) in enumerate(zip(suggestions, reordered)):
+                if text != reordered_text:
+                    if template is not None or joined not in text:
+                        raise ValueError(f"Rule output for {log} depends on drill order")
+                    prefix, _, suffix = text.partition(joined)
+                    template = (index, prefix, suffix)
+
+            self._entries[key] = (tuple(suggestions), template)
+
+    def lookup(self, tennis_log: TennisTrainingLog) -> Optional[List[str]]:
+        """Suggestions for a log, or None if it is not canonical and needs the rules"""
+        mask = 0
+        for drill in tennis_log.drills_trained:
+            bit = DRILL_BITS.get(drill)
+            if bit is None or mask & bit:
+                return None
+            mask |= bit
+
+        intensity = INTENSITY_CODES.get(tennis_log.intensity)
+        form = FORM_CODES.get(tennis_log.form_rating)
+        fatigue = FATIGUE_CODES.get(tennis_log.fatigue_level)
+        if intensity is None or form is None or fatigue is None:
+            return None
+
+        suggestions, template = self._entries[
+            mask | intensity << INTENSITY_SHIFT | form << FORM_SHIFT | fatigue << FATIGUE_SHIFT
+        ]
+        result = list(suggestions)
+        if template is not None:
+            index, prefix, suffix = template
+            result[index] = prefix + ", ".join(tennis_log.drills_trained) + suffix
+        return result
+
+    def lookup_key(self, key: int) -> List[str]:
+        """Suggestions for a packed key, quoting drills in standard order"""
+        return list(self._entries[key][0])
+
+    def _arrays(self):
+        """NumPy views used by the batch API: key -> rule set id, and the distinct rule sets"""
+        if self._batch_arrays is None:
+            import numpy as np
+
+            set_ids = np.full(KEY_SPACE, -1, dtype=np.int32)
+            rule_sets: List[Tuple[str, ...]] = []
+            index_of: Dict[Tuple[str, ...], int] = {}
+            for key, entry in enumerate(self._entries):
+                if entry is None:
+                    continue
+                suggestions = entry[0]
+                if suggestions not in index_of:
+                    index_of[suggestions] = len(rule_sets)
+                    rule_sets.append(suggestions)
+                set_ids[key] = index_of[suggestions]
+            self._batch_arrays = (set_ids, rule_sets)
+        return self._batch_arrays
+
+    def evaluate_frame(self, frame) -> Any:
+        """Vectorized evaluation of many logs held in a pandas DataFrame
+
+        The frame needs intensity, form_rating and fatigue_level columns plus either
+        drills_trained (lists) or a precomputed integer drill_mask column. Returns a
+        DataFrame aligned with the input holding rule_key, rule_set (id of the
+        distinct suggestion list, -1 for non-canonical rows) and suggestions.
+        Suggestions quoting the drill list use standard drill order.
+        """
+        import numpy as np
+        import pandas as pd
+
+        set_ids, rule_sets = self._arrays()
+        n = len(frame)
+
+        if "drill_mask" in frame:
+            masks = frame["drill_mask"].to_numpy(dtype=np.int64)
+        else:
+            masks = np.fromiter((drill_mask(drills) for drills in frame["drills_trained"]), dtype=np.int64, count=n)
+        # astype(object) so categorical columns (compact_log.keys_to_frame) map to plain ints
+        intensity = frame["intensity"].astype(object).map(INTENSITY_CODES).fillna(-1).to_numpy(dtype=np.int64)
+        form = frame["form_rating"].astype(object).map(FORM_CODES).fillna(-1).to_numpy(dtype=np.int64)
+        fatigue = frame["fatigue_level"].astype(object).map(FATIGUE_CODES).fillna(-1).to_numpy(dtype=np.int64)
+
+        valid = (masks >= 0) & (intensity >= 0) & (form >= 0) & (fatigue >= 0)
+        keys = np.where(valid, masks | intensity << INTENSITY_SHIFT | form << FORM_SHIFT | fatigue << FATIGUE_SHIFT, -1)
+        rule_set = np.where(valid, set_ids[np.where(valid, keys, 0)], -1)
+
+        lookup = np.empty(len(rule_sets), dtype=object)
+        for index, suggestions in enumerate(rule_sets):
+            lookup[index] = list(suggestions)
+        suggestions = lookup[np.where(valid, rule_set, 0)] if len(rule_sets) else np.empty(n, dtype=object)
+
+        # Non-canonical rows go through the reference rules one by one
+        for row in np.flatnonzero(~valid):
+            record = frame.iloc[row]
+            suggestions[row] = self._rule_fn(TennisTrainingLog(
+                drills_trained=list(record["drills_trained"]) if "drills_trained" in frame else [],
+                intensity=record["intensity"],
+                form_rating=record["form_rating"],
+                fatigue_level=record["fatigue_level"]
+            ))
+
+        return pd.DataFrame({"rule_key": keys, "rule_set": rule_set, "suggestions": suggestions}, index=frame.index)
+
+    def roster_report(self, frame) -> Any:
+        """How many logs in a roster trigger each suggestion, most common first"""
+        import numpy as np
+        import pandas as pd
+
+        evaluated = self.evaluate_frame(frame)
+        _, rule_sets = self._arrays()
+        counts: Dict[str, int] = {}
+
+        rule_set = evaluated["rule_set"].to_numpy()
+        per_set = np.bincount(rule_set[rule_set >= 0], minlength=len(rule_sets))
+        for index in np.flatnonzero(per_set):
+            for suggestion in rule_sets[index]:
+                counts[suggestion] = counts.get(suggestion, 0) + int(per_set[index])
+        for suggestions in evaluated["suggestions"][rule_set < 0]:
+            for suggestion in suggestions:
+                counts[suggestion] = counts.get(suggestion, 0) + 1
+
+        report = pd.DataFrame({"suggestion": list(counts), "logs": list(counts.values())})
+        report["share"] = report["logs"] / max(1, len(frame))
+        return report.sort_values("logs", ascending=False, ignore_index=True)
+
+_tables: Dict[tuple, RuleTable] = {}
+_tables_lock = threading.Lock()
+
+def get_rule_table(basic_drills: List[str] = BASIC_DRILLS, advanced_drills: List[str] = ADVANCED_DRILLS) -> RuleTable:
+    """Shared rule table for a drill categorisation, compiled on first use"""
+    key = (tuple(basic_drills), tuple(advanced_drills))
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None:
+            # Compiled from the plain rule function, so the table keeps no evaluator alive
+            table = RuleTable(partial(evaluate_tennis_rules, basic_drills=list(basic_drills),
+                                      advanced_drills=list(advanced_drills)))
+            _tables[key] = table
+        return table
+
+def verify_rule_table(table: RuleTable, rule_fn: Callable[[TennisTrainingLog], List[str]]) -> List[str]:
+    """Compare table output with the reference rules for every canonical log
+
+    Each combination is checked in standard, reversed and shuffled drill order,
+    and the batch API is checked against single lookups. Returns mismatch descriptions.
+    """
+    mismatches = []
+    rng = random.Random(0)
+    logs = []
+
+    for key in iter_keys():
+        log = unpack_key(key)
+        shuffled = log.drills_trained[:]
+        rng.shuffle(shuffled)
+        for drills in (log.drills_trained, log.drills_trained[::-1], shuffled):
+            variant = replace(log, drills_trained=drills)
+            if table.lookup(variant) != rule_fn(variant):
+                mismatches.append(f"lookup differs for {variant}")
+        logs.append(log)
+
+    try:
+        import pandas as pd
+    except ImportError:
+        return mismatches
+
+    frame = pd.DataFrame([log.__dict__ for log in logs])
+    for log, suggestions in zip(logs, table.evaluate_frame(frame)["suggestions"]):
+        if list(suggestions) != rule_fn(log):
+            mismatches.append(f"batch differs for {log}")
+    return mismatches
+
+def benchmark(table: RuleTable, rule_fn: Callable[[TennisTrainingLog], List[str]], rounds: int = 20) -> Dict[str, float]:
+    """Per-log cost in microseconds of the reference rules, table lookups and batch evaluation"""
+    logs = [unpack_key(key) for key in iter_keys()]
+
+    def per_log(fn) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for log in logs:
+                fn(log)
+        return (time.perf_counter() - start) / (rounds * len(logs)) * 1e6
+
+    results = {
+        "logs": len(logs),
+        "rules_us_per_log": round(per_log(rule_fn), 3),
+        "table_us_per_log": round(per_log(table.lookup), 3)
+    }
+
+    try:
+        import pandas as pd
+    except ImportError:
+        return results
+
+    frame = pd.DataFrame([log.__dict__ for log in logs])
+    frame["drill_mask"] = [drill_mask(log.drills_trained) for log in logs]
+    frame = pd.concat([frame] * rounds, ignore_index=True)
+    start = time.perf_counter()
+    table.evaluate_frame(frame)
+    results["batch_us_per_log"] = round((time.perf_counter() - start) / len(frame) * 1e6, 3)
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Verify or benchmark the precompiled tennis rule table")
+    parser.add_argument("--verify", action="store_true", help="Check the table against the rules for every log")
+    parser.add_argument("--benchmark", action="store_true", help="Report per-log evaluation cost")
+    parser.add_argument("--rounds", type=int, default=20, help="Benchmark repetitions (default: 20)")
+    args = parser.parse_args(argv)
+
+    table = get_rule_table()
+    status = 0
+
+    if args.verify or not args.benchmark:
+        mismatches = verify_rule_table(table, evaluate_tennis_rules)
+        for mismatch in mismatches[:20]:
+            print(f"❌ {mismatch}")
+        if mismatches:
+            status = 1
+        icon = "❌" if mismatches else "✅"
+        print(f"{icon} Rule table verified against {sum(1 for _ in iter_keys())} logs: {len(mismatches)} mismatches")
+
+    if args.benchmark:
+        for name, value in benchmark(table, evaluate_tennis_rules, args.rounds).items():
+            print(f"⏱️  {name}: {value}")
+
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
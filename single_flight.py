@@ -0,0 +1,178 @@
+"""
+In-process single-flight coalescing of identical concurrent calls
+While a call for a key is in flight, further callers with the same key wait for
+it and share its result instead of starting their own. Used by the evaluator so
+players submitting the same log at the same moment trigger one OpenAI request.
+"""
+
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+class _Call:
+    """One in-flight call and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesces identical concurrent calls made from any number of threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+        # In-process counters
+        self.executed = 0
+        self.coalesced = 0  # calls saved by sharing an in-flight result
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """Run fn() unless a call for key is already in flight; return (result, shared)
+
+        shared is True when the result came from another caller's call. Exceptions
+        raised by fn propagate to every caller sharing it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        """Executed and coalesced call counters"""
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "saved_ratio": self.coalesced / total if total else 0.0
+            }
+
+class AsyncSingleFlight:
+    """Coalesces identical concurrent coroutine calls on each event loop
+
+    The shared call runs as its own task, so cancelling one waiter doesn't cancel
+    it for the others; it is cancelled only when every waiter has gone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (event loop id, key) -> (task, [waiter count])
+        self._calls: Dict[tuple, tuple] = {}
+
+        # In-process counters
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Await fn() unless a call for key is already in flight; return (result, shared)"""
+        import asyncio
+
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            entry = self._calls.get(loop_key)
+            if entry is not None:
+                self.coalesced += 1
+                shared = True
+            else:
+                entry = self._calls[loop_key] = (asyncio.ensure_future(fn()), [0])
+                entry[0].add_done_callback(lambda _task: self._forget(loop_key, entry))
+                self.executed += 1
+                shared = False
+            task, waiters = entry
+            waiters[0] += 1
+
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if not task.done():
+                waiters[0] -= 1
+                if waiters[0] == 0:
+                    task.cancel()
+            raise
+
+    def _forget(self, loop_key: tuple, entry: tuple) -> None:
+        with self._lock:
+            if self._calls.get(loop_key) is entry:
+                del self._calls[loop_key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Executed and coalesced call counters"""
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "saved_ratio": self.coalesced / total if total else 0.0
+            }
+
+_default_single_flight: Optional[SingleFlight] = None
+_default_async_single_flight: Optional[AsyncSingleFlight] = None
+_default_lock = threading.Lock()
+
+def single_flight_enabled() -> bool:
+    """Whether SINGLE_FLIGHT_ENABLED allows coalescing (on by default)"""
+    return os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+def get_default_single_flight() -> Optional[SingleFlight]:
+    """Process-wide group shared by every threaded evaluator, or None when disabled"""
+    global _default_single_flight
+    if not single_flight_enabled():
+        return None
+    with _default_lock:
+        if _default_single_flight is None:
+            _default_single_flight = SingleFlight()
+        return _default_single_flight
+
+def get_default_async_single_flight() -> Optional[AsyncSingleFlight]:
+    """Process-wide group shared by every async evaluator, or None when disabled"""
+    global _default_async_single_flight
+    if not single_flight_enabled():
+        return None
+    with _default_lock:
+        if _default_async_single_flight is None:
+            _default_async_single_flight = AsyncSingleFlight()
+        return _default_async_single_flight
+
+def single_flight_stats() -> Dict[str, Any]:
+    """Combined counters of the process-wide groups"""
+    stats = {"executed": 0, "coalesced": 0, "in_flight": 0}
+    for group in (_default_single_flight, _default_async_single_flight):
+        if group is not None:
+            for name, value in group.stats().items():
+                if name in stats:
+                    stats[name] += value
+    total = stats["executed"] + stats["coalesced"]
+    stats["saved_ratio"] = stats["coalesced"] / total if total else 0.0
+    return stats
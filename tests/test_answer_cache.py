@@ -0,0 +1,29 @@
+"""AnswerCache near-duplicate matching"""
+
+from answer_cache import AnswerCache
+
+PLAN = "plan-fingerprint"
+
+def test_reversal_words_never_match():
+    cache = AnswerCache()
+    cache.put(PLAN, "Should I serve today?", "serve")
+    assert cache.get(PLAN, "Should I skip serve today?") is None
+    assert cache.get(PLAN, "Should I not serve today?") is None
+
+def test_short_question_with_an_extra_rare_word_does_not_match():
+    cache = AnswerCache()
+    cache.put(PLAN, "Should I serve today?", "serve")
+    assert cache.get(PLAN, "Should I serve hard today?") is None
+
+def test_reordered_question_matches():
+    cache = AnswerCache()
+    cache.put(PLAN, "Should I serve today?", "serve")
+    assert cache.get(PLAN, "Today, should I serve?") == "serve"
+    assert cache.stats()["near_duplicate_hits"] == 1
+
+def test_eviction_forgets_unused_terms():
+    cache = AnswerCache(max_entries=1)
+    cache.put(PLAN, "How long should I warm up?", "warm up")
+    cache.put(PLAN, "What should I eat?", "eat")
+    assert "warm" not in cache._doc_freq
+    assert all(count > 0 for count in cache._doc_freq.values())
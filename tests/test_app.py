@@ -0,0 +1,35 @@
+"""Streamlit app: a failed plan job's error stays on screen and polling stops"""
+
+import os
+import time
+
+import pytest
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+from training_evaluator import TennisTrainingEvaluator
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+def test_failed_plan_job_keeps_its_error(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("PLAN_CACHE_ENABLED", "false")
+    monkeypatch.setenv("TRAINING_HISTORY_ENABLED", "false")
+
+    def fail(self, progressive, workload=None):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(TennisTrainingEvaluator, "complete_daily_plan", fail)
+
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.run()
+    at.multiselect[0].select("Serve")
+    at.run()
+    next(button for button in at.button if "Generate" in button.label).click().run()
+
+    for _ in range(4):
+        time.sleep(0.3)
+        at.run()
+        assert [error.value for error in at.main.error] == ["❌ Plan generation failed: boom"]
+        assert at.session_state.plan_job_id is None
+    assert not at.exception
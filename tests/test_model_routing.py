@@ -0,0 +1,37 @@
+"""Routing config validation and hot reload"""
+
+import json
+import os
+
+import pytest
+
+from model_routing import ModelRouter, RoutingConfig, RoutingConfigError
+from training_evaluator import TennisTrainingLog
+
+def config(max_drills):
+    return {
+        "tiers": {"fast": {"model": "fast-model"}},
+        "plan": {"rules": [{"tier": "fast", "when": {"max_drills": max_drills}}]}
+    }
+
+@pytest.mark.parametrize("value", ["2", True, None, [2]])
+def test_number_conditions_must_be_numbers(value):
+    with pytest.raises(RoutingConfigError):
+        RoutingConfig.from_dict(config(value))
+
+@pytest.mark.parametrize("value", [2, 2.5])
+def test_number_conditions_accept_numbers(value):
+    assert RoutingConfig.from_dict(config(value)).rules["plan"][0]["when"]["max_drills"] == value
+
+def test_reload_keeps_the_previous_config_when_a_condition_is_not_a_number(tmp_path):
+    path = tmp_path / "routing.json"
+    path.write_text(json.dumps(config(2)))
+    router = ModelRouter(config_path=str(path), reload_seconds=0)
+    tennis_log = TennisTrainingLog(["Serve"], "Light", "Good", "Low")
+    assert router.route_plan(tennis_log).model == "fast-model"
+
+    path.write_text(json.dumps(config("2")))
+    mtime = os.path.getmtime(path) + 5
+    os.utime(path, (mtime, mtime))
+    assert router.route_plan(tennis_log).model == "fast-model"
+    assert router.stats()["reload_errors"] == 1
@@ -0,0 +1,48 @@
+"""PlanJobManager: failed jobs and coalescing of identical requests"""
+
+import threading
+import time
+
+from plan_jobs import DONE, FAILED, PlanJobManager
+from training_evaluator import TennisTrainingEvaluator, TennisTrainingLog
+
+TENNIS_LOG = TennisTrainingLog(["Serve", "Volley"], "Moderate", "Good", "Medium")
+
+class FailingEvaluator(TennisTrainingEvaluator):
+    def complete_daily_plan(self, progressive, workload=None):
+        time.sleep(0.2)
+        raise RuntimeError("boom")
+
+def wait_finished(manager, job_id, timeout=5.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+def test_failed_job_reports_its_error():
+    manager = PlanJobManager(max_workers=1)
+    job = wait_finished(manager, manager.submit(FailingEvaluator(), TENNIS_LOG))
+    assert job.status == FAILED
+    assert job.error == "boom"
+    assert manager.stats()["failed"] == 1
+
+def test_identical_concurrent_requests_share_one_job():
+    manager = PlanJobManager(max_workers=1)
+    evaluator = FailingEvaluator()
+    job_ids = []
+    threads = [threading.Thread(target=lambda: job_ids.append(manager.submit(evaluator, TENNIS_LOG))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(job_ids)) == 1
+    assert manager.stats()["deduplicated"] == 3
+
+def test_rules_only_job_is_done_on_submit():
+    manager = PlanJobManager(max_workers=1)
+    job = manager.get(manager.submit(TennisTrainingEvaluator(), TENNIS_LOG, rules_only=True))
+    assert job.status == DONE
+    assert job.plan.is_fallback
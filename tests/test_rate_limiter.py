@@ -0,0 +1,60 @@
+"""RateLimiter: token budget waits bounded by the deadline, and environment settings"""
+
+import asyncio
+import time
+
+import pytest
+
+from rate_limiter import DEFAULT_MAX_DELAY_SECONDS, RateLimiter, TokenBucket
+
+# Roughly one plan request: prompt plus max_tokens
+PLAN_TOKENS = 1100
+
+def test_budget_past_the_deadline_gives_up_at_once():
+    limiter = RateLimiter(tokens_per_minute=600)
+    sent = []
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        limiter.call(lambda: sent.append(True), estimated_tokens=PLAN_TOKENS, deadline=2)
+    assert time.monotonic() - start < 0.5
+    assert not sent
+
+    stats = limiter.stats()
+    assert stats["gave_up"] == 1
+    assert stats["attempts"] == 0
+    assert stats["throttled"] == 0
+    # The reservation was refunded, so later callers are not charged for it
+    assert stats["tokens_available"] == pytest.approx(10.0, abs=1.0)
+
+def test_async_budget_past_the_deadline_gives_up_at_once():
+    limiter = RateLimiter(tokens_per_minute=600)
+
+    async def send():
+        return "sent"
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(limiter.acall(send, estimated_tokens=PLAN_TOKENS, deadline=2))
+    assert time.monotonic() - start < 0.5
+    assert limiter.stats()["gave_up"] == 1
+
+def test_budget_within_the_deadline_waits_then_sends():
+    limiter = RateLimiter(tokens_per_minute=6000)  # 100 tokens per second
+    assert limiter.call(lambda: "first", estimated_tokens=100, deadline=2) == "first"
+
+    start = time.monotonic()
+    assert limiter.call(lambda: "second", estimated_tokens=20, deadline=2) == "second"
+    assert 0.1 < time.monotonic() - start < 1.0
+    assert limiter.stats()["throttled"] == 1
+
+def test_bucket_grows_to_hold_one_request():
+    bucket = TokenBucket(rate_per_minute=600)
+    assert bucket.capacity == pytest.approx(10.0)
+    bucket.reserve(PLAN_TOKENS)
+    assert bucket.capacity == PLAN_TOKENS
+
+def test_from_env_reads_the_retry_backoff_cap(monkeypatch):
+    monkeypatch.delenv("OPENAI_RETRY_MAX_DELAY_SECONDS", raising=False)
+    assert RateLimiter.from_env().max_delay == DEFAULT_MAX_DELAY_SECONDS
+    monkeypatch.setenv("OPENAI_RETRY_MAX_DELAY_SECONDS", "3")
+    assert RateLimiter.from_env().max_delay == 3.0
@@ -0,0 +1,32 @@
+"""CallGuard: the deadline holds for sync calls, whatever the callee does"""
+
+import time
+
+import pytest
+
+from rate_limiter import RateLimiter
+from resilience import CallGuard
+
+def test_sync_call_stops_waiting_at_the_deadline():
+    guard = CallGuard(deadline=0.3)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        guard.call(lambda remaining: time.sleep(2))
+    assert time.monotonic() - start < 1.0
+
+    stats = guard.stats()
+    assert stats["failures"] == 1
+    assert stats["deadline_exceeded"] == 1
+
+def test_sync_call_returns_the_result_within_the_deadline():
+    guard = CallGuard(deadline=1.0)
+    assert guard.call(lambda remaining: remaining) == 1.0
+    assert guard.stats()["successes"] == 1
+
+def test_deadline_covers_the_rate_limiter_wait():
+    guard = CallGuard(deadline=0.5)
+    limiter = RateLimiter(tokens_per_minute=600)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        guard.call(lambda remaining: limiter.call(lambda: "sent", estimated_tokens=1100, deadline=remaining))
+    assert time.monotonic() - start < 1.0
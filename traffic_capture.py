@@ -0,0 +1,144 @@
+"""
+Capture of real plan and TennisBot traffic to JSONL
+Every generated plan and answered question is appended as one JSON line with its
+arrival time, training log (and workload or question), source and latency, so
+replay_traffic.py can replay realistic arrival patterns and cache_warmer.py
+--traffic can pick the most frequent logs. Enabled by setting TRAFFIC_CAPTURE_PATH.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import asdict
+from datetime import date
+from typing import Any, Dict, Iterator, Optional
+
+def log_to_dict(tennis_log: Any) -> Dict[str, Any]:
+    return {
+        "drills_trained": list(tennis_log.drills_trained),
+        "intensity": tennis_log.intensity,
+        "form_rating": tennis_log.form_rating,
+        "fatigue_level": tennis_log.fatigue_level
+    }
+
+def workload_to_dict(workload: Any) -> Dict[str, Any]:
+    """JSON form of a training_history.WorkloadSnapshot"""
+    data = asdict(workload)
+    data["as_of"] = workload.as_of.isoformat()
+    return data
+
+def workload_from_dict(data: Dict[str, Any]) -> Any:
+    """Rebuild the WorkloadSnapshot of a captured plan request"""
+    from training_history import WorkloadSnapshot
+    return WorkloadSnapshot(**{**data, "as_of": date.fromisoformat(data["as_of"])})
+
+class TrafficRecorder:
+    """Thread-safe, line-buffered JSONL writer of plan and question records"""
+
+    def __init__(self, path: str, sample_rate: float = 1.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1)
+
+        # In-process counters
+        self.recorded = 0
+        self.sampled_out = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "TrafficRecorder":
+        """Create a recorder configured from TRAFFIC_CAPTURE_* environment variables"""
+        return cls(
+            path=os.environ['TRAFFIC_CAPTURE_PATH'],
+            sample_rate=float(os.getenv('TRAFFIC_CAPTURE_SAMPLE_RATE', 1.0))
+        )
+
+    def record_plan(self, tennis_log: Any, start: float, source: str, workload: Optional[Any] = None,
+                    end: Optional[float] = None) -> None:
+        """Append a plan request; start and end (default: now) are time.perf_counter() values"""
+        record = self._base_record("plan", tennis_log, start, source, end)
+        if workload is not None:
+            record["workload"] = workload_to_dict(workload)
+        self._write(record)
+
+    def record_question(self, tennis_log: Any, question: str, start: float, source: str,
+                        end: Optional[float] = None) -> None:
+        """Append a TennisBot question asked about the plan for tennis_log"""
+        record = self._base_record("coach", tennis_log, start, source, end)
+        record["question"] = question
+        self._write(record)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.path,
+                "sample_rate": self.sample_rate,
+                "recorded": self.recorded,
+                "sampled_out": self.sampled_out,
+                "errors": self.errors
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def _base_record(self, kind: str, tennis_log: Any, start: float, source: str,
+                     end: Optional[float] = None) -> Dict[str, Any]:
+        now = time.perf_counter()
+        latency = (end if end is not None else now) - start
+        return {
+            "ts": round(time.time() - (now - start), 6),
+            "kind": kind,
+            "log": log_to_dict(tennis_log),
+            "source": source,
+            "latency_ms": round(latency * 1000, 1)
+        }
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            with self._lock:
+                self.sampled_out += 1
+            return
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            try:
+                self._file.write(line)
+                self.recorded += 1
+            except (OSError, ValueError) as e:
+                # Capturing must never fail the request it describes
+                if not self.errors:
+                    print(f"⚠️ Traffic capture to {self.path} failed: {e}", file=sys.stderr)
+                self.errors += 1
+
+def read_traffic(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the valid plan and coach records of a capture file in file order"""
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(record, dict) or record.get("kind") not in ("plan", "coach"):
+                continue
+            if isinstance(record.get("log"), dict) and isinstance(record.get("ts"), (int, float)):
+                yield record
+
+_default_recorder: Optional[TrafficRecorder] = None
+_default_recorder_lock = threading.Lock()
+
+def get_default_traffic_recorder() -> Optional[TrafficRecorder]:
+    """Process-wide recorder, or None unless TRAFFIC_CAPTURE_PATH is set"""
+    global _default_recorder
+    if not os.getenv('TRAFFIC_CAPTURE_PATH'):
+        return None
+    with _default_recorder_lock:
+        if _default_recorder is None:
+            _default_recorder = TrafficRecorder.from_env()
+        return _default_recorder
@@ -1,8 +1,43 @@
-import openai
 import os
-from typing import List, Dict, Any
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Optional, Callable
 from dataclasses import dataclass
 
+from openai_clients import get_openai_client, get_async_openai_client
+from single_flight import get_default_single_flight, get_default_async_single_flight
+from rate_limiter import get_default_rate_limiter
+from resilience import CircuitOpenError, StreamInterruptedError, get_default_call_guard
+from metrics import get_metrics
+from model_routing import Route, get_default_model_router
+from conversation_memory import ConversationMemory, TurnStats, estimate_message_tokens, estimate_tokens
+
+# Canonical tennis training vocabulary shared by the UI, CLI and plan cache
+TENNIS_DRILLS = ["Forehand", "Backhand", "Serve", "Slice", "Dropshot", "Volley", "Return"]
+INTENSITY_LEVELS = ["Light", "Moderate", "Intense"]
+FORM_RATINGS = ["Poor", "Average", "Good", "Excellent"]
+FATIGUE_LEVELS = ["Low", "Medium", "High"]
+
+# Drill categories used by the training rules
+BASIC_DRILLS = ["Forehand", "Backhand", "Serve"]
+ADVANCED_DRILLS = ["Slice", "Dropshot", "Volley", "Return"]
+
+# Prompt identity - bump PROMPT_VERSION whenever the plan prompt changes so cached
+# plans generated from an older prompt are not served. Models come from model_routing
+PROMPT_VERSION = "tennis-plan-v1"
+
+# Acute:chronic workload bands (see training_history.ratio_band) that change the
+# plan; "Unknown" (not enough history) leaves the prompt and cache key untouched
+WORKLOAD_BAND_GUIDANCE = {
+    "Low": "Training load has dropped well below the player's 4-week average - rebuild volume gradually.",
+    "Optimal": "Training load is in line with the player's 4-week average.",
+    "Elevated": "Training load is above the player's 4-week average - avoid adding more volume today.",
+    "Spike": "Training load has spiked far above the player's 4-week average - injury risk is high, prioritise recovery."
+}
+
 @dataclass
 class TennisTrainingLog:
     """Tennis-specific training session data"""
@@ -17,89 +52,697 @@ class TennisDailyPlan:
     hardcoded_suggestions: List[str]
     gpt_suggestions: Dict[str, Any]
     raw_gpt_response: str
+    is_fallback: bool = False  # True when the AI sections are canned fallback text
+
+def _canonical_choice(value: str, options: List[str]) -> str:
+    """Map a free-form value onto its canonical spelling, if it has one"""
+    cleaned = str(value).strip()
+    for option in options:
+        if cleaned.lower() == option.lower():
+            return option
+    return cleaned
+
+def normalize_tennis_log(tennis_log: TennisTrainingLog) -> TennisTrainingLog:
+    """Return a canonical copy of a log: known drills deduplicated in standard order, enums properly cased"""
+    drills = {_canonical_choice(drill, TENNIS_DRILLS) for drill in tennis_log.drills_trained}
+    known = [drill for drill in TENNIS_DRILLS if drill in drills]
+    unknown = sorted(drill for drill in drills if drill not in TENNIS_DRILLS)
+    
+    return TennisTrainingLog(
+        drills_trained=known + unknown,
+        intensity=_canonical_choice(tennis_log.intensity, INTENSITY_LEVELS),
+        form_rating=_canonical_choice(tennis_log.form_rating, FORM_RATINGS),
+        fatigue_level=_canonical_choice(tennis_log.fatigue_level, FATIGUE_LEVELS)
+    )
+
+# Section headers recognised in GPT plan responses
+PLAN_SECTION_KEYWORDS = {
+    "todays_plan": ["TODAYS_PLAN:", "TODAY'S_PLAN:", "TODAYS PLAN:", "TODAY'S PLAN:"],
+    "daily_goals": ["DAILY_GOALS:", "DAILY GOALS:", "GOALS:"],
+    "warnings": ["WARNINGS:", "PRECAUTIONS:", "CAUTIONS:"],
+    "rest_suggestions": ["REST_SUGGESTIONS:", "REST SUGGESTIONS:", "RECOVERY:", "REST:"]
+}
+
+# Used when GPT omits a section or leaves it empty
+PLAN_SECTION_DEFAULTS = {
+    "todays_plan": "Continue practicing fundamentals with focus on form and consistency.",
+    "daily_goals": "Improve stroke technique and court positioning.",
+    "warnings": "None - maintain good form throughout the session.",
+    "rest_suggestions": "Include proper warm-up, cool-down, and hydration."
+}
+
+class TennisPlanSectionParser:
+    """Incremental parser for section-formatted GPT plan responses
+    
+    Text is fed in chunks as it streams in; a section is reported as finished as
+    soon as the next section header arrives (or at close()). All headers are found
+    in a single left-to-right regex scan, with a short unscanned tail kept so a
+    header split across chunks is still recognised.
+    """
+    
+    _KEYWORD_TO_SECTION = {keyword: key for key, keywords in PLAN_SECTION_KEYWORDS.items() for keyword in keywords}
+    # Longest first so e.g. DAILY_GOALS: wins over GOALS: at the same position
+    _HEADER_RE = re.compile("|".join(re.escape(keyword) for keyword in sorted(_KEYWORD_TO_SECTION, key=len, reverse=True)))
+    _MAX_HEADER_LEN = max(len(keyword) for keyword in _KEYWORD_TO_SECTION)
+    
+    def __init__(self):
+        self._buffer = ""
+        self._scan_pos = 0
+        self._current: Optional[str] = None
+        self._content_start = 0
+        self._started = set()
+        self.sections: Dict[str, str] = {}
+    
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self._buffer
+    
+    def feed(self, chunk: str) -> List[tuple[str, str]]:
+        """Add streamed text, returning (section_key, content) for sections that just finished"""
+        self._buffer += chunk
+        finished = []
+        
+        for match in self._HEADER_RE.finditer(self._buffer, self._scan_pos):
+            key = self._KEYWORD_TO_SECTION[match.group()]
+            if key == self._current:
+                # Repeated header for the open section is just part of its text
+                continue
+            
+            finished.extend(self._finish(match.start()))
+            if key in self._started:
+                # A section only keeps its first occurrence; skip repeated content
+                self._current = None
+            else:
+                self._current = key
+                self._started.add(key)
+                self._content_start = match.end()
+            self._scan_pos = match.end()
+        
+        self._scan_pos = max(self._scan_pos, len(self._buffer) - (self._MAX_HEADER_LEN - 1))
+        return finished
+    
+    def close(self) -> List[tuple[str, str]]:
+        """Finish the last open section at the end of the response"""
+        return self._finish(len(self._buffer))
+    
+    def suggestions(self) -> Dict[str, Any]:
+        """Parsed sections with defaults filled in for anything missing"""
+        suggestions = dict(self.sections)
+        for key, default in PLAN_SECTION_DEFAULTS.items():
+            if not suggestions.get(key):
+                suggestions[key] = default
+        return suggestions
+    
+    def _finish(self, end: int) -> List[tuple[str, str]]:
+        if self._current is None:
+            return []
+        key, self._current = self._current, None
+        content = self._buffer[self._content_start:end].strip() or PLAN_SECTION_DEFAULTS[key]
+        self.sections[key] = content
+        return [(key, content)]
+
+# Status of each AI section of a ProgressiveTennisDailyPlan
+SECTION_PENDING = "pending"
+SECTION_READY = "ready"
+SECTION_FALLBACK = "fallback"  # canned text after a failed AI request
+SECTION_SKIPPED = "skipped"  # rule-only plan, no AI request made
+
+class ProgressiveTennisDailyPlan:
+    """A daily plan whose AI sections arrive after its rule-based suggestions
+    
+    hardcoded_suggestions are available as soon as the object exists. Each AI section
+    is a concurrent.futures.Future in `sections`, resolved the moment that section
+    has been generated; section_status() reports pending/ready/fallback/skipped per
+    section and result() (or `await aresult()`) returns the complete TennisDailyPlan.
+    """
+    
+    def __init__(self, tennis_log: TennisTrainingLog, hardcoded_suggestions: List[str]):
+        self.tennis_log = tennis_log
+        self.hardcoded_suggestions = hardcoded_suggestions
+        self.sections: Dict[str, Future] = {key: Future() for key in PLAN_SECTION_KEYWORDS}
+        self._status = {key: SECTION_PENDING for key in PLAN_SECTION_KEYWORDS}
+        self._plan: Future = Future()
+        self._lock = threading.Lock()
+    
+    def section_status(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._status)
+    
+    def ready_sections(self) -> Dict[str, str]:
+        """AI sections generated so far"""
+        return {
+            key: future.result() for key, future in self.sections.items()
+            if future.done() and future.exception() is None
+        }
+    
+    def done(self) -> bool:
+        return self._plan.done()
+    
+    def section(self, key: str, timeout: Optional[float] = None) -> str:
+        """Block until one AI section is available"""
+        return self.sections[key].result(timeout)
+    
+    def result(self, timeout: Optional[float] = None) -> TennisDailyPlan:
+        """Block until every section is in and return the complete plan"""
+        return self._plan.result(timeout)
+    
+    async def aresult(self) -> TennisDailyPlan:
+        """Await the complete plan from a coroutine"""
+        import asyncio
+        
+        return await asyncio.wrap_future(self._plan)
+    
+    def add_done_callback(self, fn: Callable[["ProgressiveTennisDailyPlan"], None]) -> None:
+        """Call fn(self) once the plan is complete (immediately if it already is)"""
+        self._plan.add_done_callback(lambda _: fn(self))
+    
+    def _set_section(self, key: str, content: str, status: str = SECTION_READY):
+        with self._lock:
+            if self.sections[key].done():
+                return
+            self._status[key] = status
+        self.sections[key].set_result(content)
+    
+    def _finish(self, plan: TennisDailyPlan):
+        status = SECTION_FALLBACK if plan.is_fallback else SECTION_READY
+        for key in PLAN_SECTION_KEYWORDS:
+            self._set_section(key, plan.gpt_suggestions.get(key, PLAN_SECTION_DEFAULTS[key]), status)
+        if plan.is_fallback:
+            # Streamed fallback text arrives through on_section looking like real sections
+            with self._lock:
+                self._status = {key: status for key in self._status}
+        self._plan.set_result(plan)
+    
+    def _skip(self):
+        """Complete as a rule-only plan with the default AI section text"""
+        for key in PLAN_SECTION_KEYWORDS:
+            self._set_section(key, PLAN_SECTION_DEFAULTS[key], SECTION_SKIPPED)
+        self._plan.set_result(TennisDailyPlan(
+            hardcoded_suggestions=self.hardcoded_suggestions,
+            gpt_suggestions=dict(PLAN_SECTION_DEFAULTS),
+            raw_gpt_response="",
+            is_fallback=True
+        ))
+    
+    def _fail(self, error: BaseException):
+        with self._lock:
+            pending = [future for future in self.sections.values() if not future.done()]
+        for future in pending:
+            future.set_exception(error)
+        self._plan.set_exception(error)
+
+# Worker pool completing progressive plans started without an executor of their own
+_progressive_executor: Optional[ThreadPoolExecutor] = None
+_progressive_executor_lock = threading.Lock()
+
+def _get_progressive_executor() -> ThreadPoolExecutor:
+    global _progressive_executor
+    with _progressive_executor_lock:
+        if _progressive_executor is None:
+            _progressive_executor = ThreadPoolExecutor(
+                max_workers=max(1, int(os.getenv('PROGRESSIVE_PLAN_WORKERS', 8))),
+                thread_name_prefix="progressive-plan"
+            )
+        return _progressive_executor
+
+def _estimated_request_tokens(request: Dict[str, Any]) -> int:
+    """Tokens a chat request can consume: its prompt plus the completion limit"""
+    return estimate_message_tokens(request["messages"]) + request.get("max_tokens", 0)
+
+def _request_kind(request: Dict[str, Any]) -> str:
+    """Latency class of a request for hedging - plan and coach calls differ a lot"""
+    return f"{request['model']}/{request.get('max_tokens')}"
+
+def _record_llm_call(operation: str, model: str, start: float, response: Any = None, error: Optional[Exception] = None):
+    """Count an OpenAI request, its latency and the tokens its usage reports"""
+    metrics = get_metrics()
+    if not metrics.enabled:
+        return
+    outcome = "ok" if error is None else "circuit_open" if isinstance(error, CircuitOpenError) else "error"
+    metrics.inc("llm_requests_total", operation=operation, model=model, outcome=outcome)
+    metrics.observe("llm_request_seconds", time.perf_counter() - start, operation=operation, model=model, outcome=outcome)
+    
+    # Streamed responses carry no usage
+    usage = getattr(response, "usage", None)
+    for token_type in ("prompt", "completion"):
+        tokens = getattr(usage, f"{token_type}_tokens", None)
+        if isinstance(tokens, int):
+            metrics.inc("llm_tokens_total", tokens, operation=operation, model=model, type=token_type)
+
+def _chat_completion(client: Any, operation: str, **request) -> Any:
+    """Send a chat completion under the shared call guard (deadline, hedging, circuit
+    breaker) and rate limiter (RPM/TPM, concurrency, retries)"""
+    limiter = get_default_rate_limiter()
+    
+    def attempt(remaining: float) -> Any:
+        end = time.monotonic() + remaining
+        return limiter.call(
+            lambda: client.chat.completions.create(**request, timeout=max(0.1, end - time.monotonic())),
+            estimated_tokens=_estimated_request_tokens(request),
+            deadline=remaining
+        )
+    
+    start = time.perf_counter()
+    try:
+        response = get_default_call_guard().call(attempt, kind=_request_kind(request))
+    except Exception as e:
+        _record_llm_call(operation, request["model"], start, error=e)
+        raise
+    _record_llm_call(operation, request["model"], start, response)
+    return response
+
+def _stream_chat_completion(client: Any, operation: str, on_delta: Callable[[str], None], **request) -> None:
+    """Stream a chat completion, passing each content delta to on_delta
+    
+    Reading the stream - not only opening it - happens within the call guard's
+    deadline and circuit breaker and holds a rate limiter concurrency slot. Failures
+    after the first delta raise StreamInterruptedError and are not retried.
+    """
+    limiter = get_default_rate_limiter()
+    
+    def attempt(remaining: float) -> None:
+        end = time.monotonic() + remaining
+        
+        def read() -> None:
+            stream = client.chat.completions.create(**request, stream=True, timeout=max(0.1, end - time.monotonic()))
+            delivered = False
+            try:
+                for chunk in stream:
+                    # The HTTP timeout only bounds each read, so a trickling stream is cut off here
+                    if time.monotonic() > end:
+                        raise TimeoutError("OpenAI stream exceeded its deadline")
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        delivered = True
+                        on_delta(delta)
+            except Exception as e:
+                if delivered:
+                    raise StreamInterruptedError(f"Stream interrupted: {e}") from e
+                raise
+            finally:
+                _close_stream(stream)
+        
+        return limiter.call(read, estimated_tokens=_estimated_request_tokens(request), deadline=remaining)
+    
+    start = time.perf_counter()
+    try:
+        # Sections are reported as they arrive, so streams are never hedged; their latency
+        # is the whole stream, so it is tracked apart from non-streamed requests
+        get_default_call_guard().call(attempt, kind=f"{_request_kind(request)}/stream", hedge=False)
+    except Exception as e:
+        _record_llm_call(operation, request["model"], start, error=e)
+        raise
+    _record_llm_call(operation, request["model"], start)
+
+def _close_stream(stream: Any):
+    """Release a streamed response's connection, also when it was not read to the end"""
+    close = getattr(stream, "close", None) or getattr(getattr(stream, "response", None), "close", None)
+    if close is not None:
+        close()
+
+async def _achat_completion(client: Any, operation: str, **request) -> Any:
+    """Async counterpart of _chat_completion for AsyncOpenAI clients"""
+    limiter = get_default_rate_limiter()
+    
+    async def attempt(remaining: float) -> Any:
+        end = time.monotonic() + remaining
+        return await limiter.acall(
+            lambda: client.chat.completions.create(**request, timeout=max(0.1, end - time.monotonic())),
+            estimated_tokens=_estimated_request_tokens(request),
+            deadline=remaining
+        )
+    
+    start = time.perf_counter()
+    try:
+        response = await get_default_call_guard().acall(attempt, kind=_request_kind(request))
+    except Exception as e:
+        _record_llm_call(operation, request["model"], start, error=e)
+        raise
+    _record_llm_call(operation, request["model"], start, response)
+    return response
+
+def _capture_off_loop(record: Callable[..., None], *args):
+    """Write a traffic capture record on the running loop's default executor
+    
+    The record's end time is taken now, so time spent queued for a thread is not
+    captured as latency. Outside an event loop the record is written directly.
+    """
+    import asyncio
+    
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        record(*args)
+        return
+    loop.run_in_executor(None, partial(record, *args, end=time.perf_counter()))
+
+def evaluate_tennis_rules(tennis_log: TennisTrainingLog, basic_drills: List[str] = BASIC_DRILLS,
+                          advanced_drills: List[str] = ADVANCED_DRILLS) -> List[str]:
+    """Hardcoded tennis recommendations for a log - the rules behind every plan and the rule table"""
+    suggestions = []
+    
+    # Fatigue and intensity management
+    if tennis_log.intensity == "Intense" and tennis_log.fatigue_level == "High":
+        suggestions.append("🛌 Take a rest day or focus on light recovery exercises (gentle stretching, light footwork)")
+        suggestions.append("💧 Emphasize hydration and proper nutrition for recovery")
+    elif tennis_log.fatigue_level == "High":
+        suggestions.append("⚡ Reduce training intensity today - focus on technique over power")
+        suggestions.append("🎯 Work on mental game and strategy instead of physical drills")
+    
+    # Form/technique recommendations
+    if tennis_log.form_rating == "Poor":
+        suggestions.append(f"📚 Repeat yesterday's drills ({', '.join(tennis_log.drills_trained)}) with focus on proper technique")
+        suggestions.append("🎥 Consider video analysis or working with a coach on form correction")
+        suggestions.append("🐌 Slow down stroke speed to perfect technique before adding power")
+    elif tennis_log.form_rating == "Average":
+        suggestions.append("🔧 Include technique refinement drills for yesterday's practiced strokes")
+        suggestions.append("🎯 Focus on consistency over power in today's session")
+    
+    # Drill balance and progression
+    advanced_drills_trained = [drill for drill in tennis_log.drills_trained if drill in advanced_drills]
+    
+    if len(advanced_drills_trained) >= 3:
+        suggestions.append("⚖️ Balance today with fundamental drills (Forehand, Backhand, Serve) to maintain solid foundation")
+        suggestions.append("🎯 Focus on court positioning and footwork fundamentals")
+    
+    if len(tennis_log.drills_trained) >= 5:
+        suggestions.append("🎪 You trained many drills yesterday - consider focusing on 2-3 key areas today for deeper practice")
+    
+    # Specific drill recommendations
+    if "Serve" in tennis_log.drills_trained and tennis_log.intensity == "Intense":
+        suggestions.append("🎾 Include shoulder and arm recovery exercises - serving is demanding on these muscles")
+    
+    if "Volley" in tennis_log.drills_trained or "Return" in tennis_log.drills_trained:
+        suggestions.append("⚡ Practice reaction time and quick decision-making drills")
+    
+    if "Slice" in tennis_log.drills_trained or "Dropshot" in tennis_log.drills_trained:
+        suggestions.append("🎨 Continue touch and finesse work - these skills require consistent practice")
+    
+    # Intensity progression
+    if tennis_log.intensity == "Light" and tennis_log.fatigue_level == "Low":
+        suggestions.append("📈 You can safely increase intensity today - your body is ready for more challenge")
+    elif tennis_log.intensity == "Intense" and tennis_log.fatigue_level == "Low":
+        suggestions.append("💪 Great recovery! You can maintain high intensity if form stays good")
+    
+    # Ensure we always have suggestions
+    if not suggestions:
+        suggestions.append("🎾 Continue building on yesterday's progress with consistent practice")
+        suggestions.append("🎯 Focus on one key area for improvement in today's session")
+    
+    return suggestions
 
 class TennisTrainingEvaluator:
     """Tennis-specific training evaluator with hardcoded rules and AI integration"""
     
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    def __init__(self, plan_cache: Optional[Any] = None, traffic_recorder: Optional[Any] = None):
+        # OpenAI client, created on first API call so rule-only use never imports openai
+        self._client = None
+        
+        # Process-wide model_routing.ModelRouter - picks the model tier for each log
+        self.router = get_default_model_router()
+        
+        # Optional plan_cache.PlanCache - reuses AI sections for logs seen before
+        self.plan_cache = plan_cache
+        
+        # Optional traffic_capture.TrafficRecorder - appends each plan request to a JSONL capture
+        self.traffic_recorder = traffic_recorder
         
         # Tennis drill categories for better recommendations
-        self.basic_drills = ["Forehand", "Backhand", "Serve"]
-        self.advanced_drills = ["Slice", "Dropshot", "Volley", "Return"]
+        self.basic_drills = list(BASIC_DRILLS)
+        self.advanced_drills = list(ADVANCED_DRILLS)
+        
+        # Process-wide single-flight group - identical concurrent logs share one AI request
+        self.single_flight = self._create_single_flight()
+    
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+    
+    def _create_client(self):
+        """Use the shared, pooled OpenAI client for plan generation"""
+        return get_openai_client()
+    
+    def _create_single_flight(self):
+        return get_default_single_flight()
         
-    def create_daily_plan(self, tennis_log: TennisTrainingLog) -> TennisDailyPlan:
-        """Generate a complete tennis training plan based on yesterday's session"""
+    def create_daily_plan(self, tennis_log: TennisTrainingLog,
+                          on_section: Optional[Callable[[str, str], None]] = None,
+                          workload: Optional[Any] = None) -> TennisDailyPlan:
+        """Generate a complete tennis training plan based on yesterday's session
+        
+        When on_section is given the response is streamed and on_section(key, content)
+        is called for each AI section (todays_plan, daily_goals, warnings,
+        rest_suggestions) as soon as it is complete. workload is an optional
+        training_history.WorkloadSnapshot of the player's recent training load.
+        """
+        start = time.perf_counter()
         
         # Generate hardcoded tennis-specific suggestions
-        hardcoded_suggestions = self._generate_tennis_hardcoded_suggestions(tennis_log)
+        hardcoded_suggestions = self.rule_suggestions(tennis_log, workload)
+        
+        # Serve the AI sections from the plan cache when this log was seen before
+        cache_key, cached = self._lookup_cached_plan(tennis_log, workload)
+        if cached is not None:
+            gpt_suggestions, raw_response = cached
+            if on_section is not None:
+                for key in PLAN_SECTION_KEYWORDS:
+                    on_section(key, gpt_suggestions.get(key, PLAN_SECTION_DEFAULTS[key]))
+            self._record_plan(start, "cache", tennis_log, workload)
+            return TennisDailyPlan(
+                hardcoded_suggestions=hardcoded_suggestions,
+                gpt_suggestions=gpt_suggestions,
+                raw_gpt_response=raw_response
+            )
         
         # Generate AI-powered tennis recommendations
-        gpt_suggestions, raw_response = self._generate_tennis_gpt_suggestions(tennis_log)
+        gpt_suggestions, raw_response, is_fallback = self._coalesced_gpt_suggestions(tennis_log, workload, on_section)
+        self._store_cached_plan(cache_key, gpt_suggestions, raw_response, is_fallback)
+        self._record_plan(start, "fallback" if is_fallback else "ai", tennis_log, workload)
         
         return TennisDailyPlan(
             hardcoded_suggestions=hardcoded_suggestions,
             gpt_suggestions=gpt_suggestions,
-            raw_gpt_response=raw_response
+            raw_gpt_response=raw_response,
+            is_fallback=is_fallback
         )
     
+    def start_daily_plan(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None,
+                         rules_only: bool = False, background: bool = True) -> ProgressiveTennisDailyPlan:
+        """Return a plan with the rule-based suggestions at once and the AI sections to follow
+        
+        A cached plan is complete immediately. Otherwise the AI sections are streamed
+        into the returned object on a shared worker pool - or, with background=False,
+        by the caller's own complete_daily_plan() call. With rules_only=True no API
+        request is made: uncached AI sections are skipped for latency-critical callers.
+        """
+        start = time.perf_counter()
+        progressive = ProgressiveTennisDailyPlan(tennis_log, self.rule_suggestions(tennis_log, workload))
+        
+        _, cached = self._lookup_cached_plan(tennis_log, workload)
+        if cached is not None:
+            gpt_suggestions, raw_response = cached
+            self._record_plan(start, "cache", tennis_log, workload)
+            progressive._finish(TennisDailyPlan(
+                hardcoded_suggestions=progressive.hardcoded_suggestions,
+                gpt_suggestions=gpt_suggestions,
+                raw_gpt_response=raw_response
+            ))
+        elif rules_only:
+            self._record_plan(start, "rules", tennis_log, workload)
+            progressive._skip()
+        elif background:
+            _get_progressive_executor().submit(self.complete_daily_plan, progressive, workload)
+        return progressive
+    
+    def complete_daily_plan(self, progressive: ProgressiveTennisDailyPlan, workload: Optional[Any] = None) -> TennisDailyPlan:
+        """Generate the AI sections of a plan from start_daily_plan(), filling it in as they stream"""
+        if progressive.done():
+            return progressive.result()
+        try:
+            plan = self.create_daily_plan(progressive.tennis_log, on_section=progressive._set_section, workload=workload)
+        except BaseException as e:
+            progressive._fail(e)
+            raise
+        progressive._finish(plan)
+        return plan
+    
+    def rule_suggestions(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None) -> List[str]:
+        """Rule-based recommendations for a log and optional workload (no API call)"""
+        with get_metrics().timer("rules_seconds"):
+            return self._generate_tennis_hardcoded_suggestions(tennis_log) + self._generate_workload_suggestions(workload)
+    
+    def _record_plan(self, start: float, source: str, tennis_log: TennisTrainingLog, workload: Optional[Any] = None):
+        """Count a finished plan and its latency by source (cache, ai, fallback or rules) and capture it"""
+        metrics = get_metrics()
+        metrics.inc("plans_total", source=source)
+        metrics.observe("plan_seconds", time.perf_counter() - start, source=source)
+        if self.traffic_recorder is not None:
+            self._capture(self.traffic_recorder.record_plan, tennis_log, start, source, workload)
+    
+    def _capture(self, record: Callable[..., None], *args):
+        """Append a traffic capture record"""
+        record(*args)
+    
+    def plan_key(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None) -> str:
+        """Identity of the AI sections a log would get - equal keys get the same plan"""
+        from plan_cache import plan_cache_key
+        return plan_cache_key(tennis_log, self.plan_route(tennis_log, workload).model, self._prompt_version(workload))
+    
+    def plan_route(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None) -> Route:
+        """Model tier the router picks for a log (no API call)"""
+        return self.router.route_plan(normalize_tennis_log(tennis_log), workload)
+    
+    def _plan_request(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None) -> Dict[str, Any]:
+        """Chat completion arguments for a plan on the routed tier, recording the decision"""
+        route = self.plan_route(tennis_log, workload)
+        self.router.record("plan", route)
+        return {
+            "model": route.model,
+            "messages": self._build_tennis_plan_messages(tennis_log, workload),
+            "max_tokens": route.max_tokens,
+            "temperature": route.temperature
+        }
+    
+    def _lookup_cached_plan(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None) -> tuple[Optional[str], Optional[tuple]]:
+        """Return (cache_key, cached AI sections or None); the key is None when caching is off"""
+        if self.plan_cache is None:
+            return None, None
+        cache_key = self.plan_key(tennis_log, workload)
+        return cache_key, self.plan_cache.get(cache_key)
+    
+    def _prompt_version(self, workload: Optional[Any] = None) -> str:
+        """Prompt identity for caching - plans prompted with a workload band are cached per band"""
+        band = self._workload_band(workload)
+        return f"{PROMPT_VERSION}+acwr:{band}" if band else PROMPT_VERSION
+    
+    def _workload_band(self, workload: Optional[Any]) -> Optional[str]:
+        """Acute:chronic band that shapes the plan, or None without usable history"""
+        if workload is None or workload.band not in WORKLOAD_BAND_GUIDANCE:
+            return None
+        return workload.band
+    
+    def _store_cached_plan(self, cache_key: Optional[str], gpt_suggestions: Dict[str, Any], raw_response: str, is_fallback: bool):
+        """Cache freshly generated AI sections"""
+        # Never cache fallback text - the next request should retry the API
+        if cache_key is not None and not is_fallback:
+            self.plan_cache.put(cache_key, gpt_suggestions, raw_response)
+    
+    def _coalesced_gpt_suggestions(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None,
+                                   on_section: Optional[Callable[[str, str], None]] = None) -> tuple[Dict[str, Any], str, bool]:
+        """AI sections for a log, sharing one in-flight request between identical concurrent callers
+        
+        Callers that join another caller's request get its sections through
+        on_section once that request completes.
+        """
+        if on_section is not None:
+            generate = lambda: self._stream_tennis_gpt_suggestions(tennis_log, on_section, workload=workload)
+        else:
+            generate = lambda: self._generate_tennis_gpt_suggestions(tennis_log, workload=workload)
+        if self.single_flight is None:
+            return generate()
+        
+        (gpt_suggestions, raw_response, is_fallback), shared = self.single_flight.do(self.plan_key(tennis_log, workload), generate)
+        if shared:
+            gpt_suggestions = dict(gpt_suggestions)
+            if on_section is not None:
+                for key in PLAN_SECTION_KEYWORDS:
+                    on_section(key, gpt_suggestions.get(key, PLAN_SECTION_DEFAULTS[key]))
+        return gpt_suggestions, raw_response, is_fallback
+    
     def _generate_tennis_hardcoded_suggestions(self, tennis_log: TennisTrainingLog) -> List[str]:
-        """Generate tennis-specific hardcoded recommendations based on training rules"""
+        """Generate tennis-specific hardcoded recommendations based on training rules
+        
+        The rules take about a microsecond per log, so single plans evaluate them
+        directly; rule_engine's precompiled table is for roster-sized batches.
+        """
+        return self._evaluate_tennis_rules(tennis_log)
+    
+    def _evaluate_tennis_rules(self, tennis_log: TennisTrainingLog) -> List[str]:
+        """Apply the training rules with this evaluator's drill categories"""
+        return evaluate_tennis_rules(tennis_log, self.basic_drills, self.advanced_drills)
+    
+    def _generate_workload_suggestions(self, workload: Optional[Any]) -> List[str]:
+        """Recommendations from the player's rolling 7/28-day workload aggregates"""
         suggestions = []
+        if workload is None:
+            return suggestions
         
-        # Fatigue and intensity management
-        if tennis_log.intensity == "Intense" and tennis_log.fatigue_level == "High":
-            suggestions.append("🛌 Take a rest day or focus on light recovery exercises (gentle stretching, light footwork)")
-            suggestions.append("💧 Emphasize hydration and proper nutrition for recovery")
-        elif tennis_log.fatigue_level == "High":
-            suggestions.append("⚡ Reduce training intensity today - focus on technique over power")
-            suggestions.append("🎯 Work on mental game and strategy instead of physical drills")
-        
-        # Form/technique recommendations
-        if tennis_log.form_rating == "Poor":
-            suggestions.append(f"📚 Repeat yesterday's drills ({', '.join(tennis_log.drills_trained)}) with focus on proper technique")
-            suggestions.append("🎥 Consider video analysis or working with a coach on form correction")
-            suggestions.append("🐌 Slow down stroke speed to perfect technique before adding power")
-        elif tennis_log.form_rating == "Average":
-            suggestions.append("🔧 Include technique refinement drills for yesterday's practiced strokes")
-            suggestions.append("🎯 Focus on consistency over power in today's session")
-        
-        # Drill balance and progression
-        advanced_drills_trained = [drill for drill in tennis_log.drills_trained if drill in self.advanced_drills]
-        basic_drills_trained = [drill for drill in tennis_log.drills_trained if drill in self.basic_drills]
-        
-        if len(advanced_drills_trained) >= 3:
-            suggestions.append("⚖️ Balance today with fundamental drills (Forehand, Backhand, Serve) to maintain solid foundation")
-            suggestions.append("🎯 Focus on court positioning and footwork fundamentals")
-        
-        if len(tennis_log.drills_trained) >= 5:
-            suggestions.append("🎪 You trained many drills yesterday - consider focusing on 2-3 key areas today for deeper practice")
-        
-        # Specific drill recommendations
-        if "Serve" in tennis_log.drills_trained and tennis_log.intensity == "Intense":
-            suggestions.append("🎾 Include shoulder and arm recovery exercises - serving is demanding on these muscles")
-        
-        if "Volley" in tennis_log.drills_trained or "Return" in tennis_log.drills_trained:
-            suggestions.append("⚡ Practice reaction time and quick decision-making drills")
-        
-        if "Slice" in tennis_log.drills_trained or "Dropshot" in tennis_log.drills_trained:
-            suggestions.append("🎨 Continue touch and finesse work - these skills require consistent practice")
-        
-        # Intensity progression
-        if tennis_log.intensity == "Light" and tennis_log.fatigue_level == "Low":
-            suggestions.append("📈 You can safely increase intensity today - your body is ready for more challenge")
-        elif tennis_log.intensity == "Intense" and tennis_log.fatigue_level == "Low":
-            suggestions.append("💪 Great recovery! You can maintain high intensity if form stays good")
-        
-        # Ensure we always have suggestions
-        if not suggestions:
-            suggestions.append("🎾 Continue building on yesterday's progress with consistent practice")
-            suggestions.append("🎯 Focus on one key area for improvement in today's session")
+        band = self._workload_band(workload)
+        if band == "Spike":
+            suggestions.append(f"📉 Your last 7 days were far heavier than your 4-week average (ACWR {workload.acute_chronic_ratio:.2f}) - keep today light to reduce injury risk")
+        elif band == "Elevated":
+            suggestions.append(f"⚠️ Training load is climbing (ACWR {workload.acute_chronic_ratio:.2f}) - hold volume steady rather than adding more")
+        elif band == "Low":
+            suggestions.append(f"📈 Your recent load is below your 4-week average (ACWR {workload.acute_chronic_ratio:.2f}) - build back up gradually")
+        
+        # Fundamentals left out of the last four weeks
+        if workload.sessions_28d >= 4:
+            neglected = [drill for drill in self.basic_drills if not workload.drill_frequency.get(drill)]
+            if neglected:
+                suggestions.append(f"🧩 You haven't practiced {', '.join(neglected)} in the last 4 weeks - work them back into today's session")
         
         return suggestions
     
-    def _generate_tennis_gpt_suggestions(self, tennis_log: TennisTrainingLog) -> tuple[Dict[str, Any], str]:
-        """Generate AI-powered tennis training recommendations using OpenAI"""
+    def _generate_tennis_gpt_suggestions(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None) -> tuple[Dict[str, Any], str, bool]:
+        """Generate AI-powered tennis training recommendations using OpenAI
+        
+        Returns (suggestions, raw_response, is_fallback).
+        """
+        try:
+            response = _chat_completion(self.client, "plan", **self._plan_request(tennis_log, workload))
+            
+            raw_response = response.choices[0].message.content
+            
+            # Parse the structured response
+            suggestions = self._parse_tennis_gpt_response(raw_response)
+            
+            return suggestions, raw_response, False
+            
+        except Exception as e:
+            return self._fallback_tennis_gpt_suggestions(tennis_log, e)
+    
+    def _stream_tennis_gpt_suggestions(self, tennis_log: TennisTrainingLog,
+                                       on_section: Callable[[str, str], None],
+                                       workload: Optional[Any] = None) -> tuple[Dict[str, Any], str, bool]:
+        """Streaming variant of _generate_tennis_gpt_suggestions reporting sections as they finish"""
+        try:
+            parser = TennisPlanSectionParser()
+            
+            def on_delta(delta: str):
+                for key, content in parser.feed(delta):
+                    on_section(key, content)
+            
+            _stream_chat_completion(self.client, "plan", on_delta, **self._plan_request(tennis_log, workload))
+            for key, content in parser.close():
+                on_section(key, content)
+            
+            # Report defaults for sections GPT never produced
+            suggestions = parser.suggestions()
+            for key in PLAN_SECTION_KEYWORDS:
+                if key not in parser.sections:
+                    on_section(key, suggestions[key])
+            
+            return suggestions, parser.text, False
+            
+        except Exception as e:
+            fallback = self._fallback_tennis_gpt_suggestions(tennis_log, e)
+            for key, content in fallback[0].items():
+                on_section(key, content)
+            return fallback
+    
+    def _build_tennis_plan_messages(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None) -> List[Dict[str, str]]:
+        """Build the chat messages asking GPT for today's tennis plan"""
+        
+        # Only the coarse workload band goes into the prompt so plans stay cacheable per band
+        band = self._workload_band(workload)
+        workload_data = f"""
+RECENT WORKLOAD (last 4 weeks):
+- Acute:Chronic Workload Band: {band}
+- {WORKLOAD_BAND_GUIDANCE[band]}
+""" if band else ""
         
         # Create tennis-specific prompt
         prompt = f"""You are an expert tennis training coach with extensive experience in player development. 
@@ -111,7 +754,7 @@ TRAINING SESSION DATA:
 - Training Intensity: {tennis_log.intensity}
 - Form/Technique Rating: {tennis_log.form_rating}
 - Fatigue Level After Session: {tennis_log.fatigue_level}
-
+{workload_data}
 Based on this session data, provide a detailed analysis and recommendations for today's training. Structure your response as follows:
 
 TODAYS_PLAN: [Specific drills and exercises for today's session, including duration and intensity recommendations]
@@ -131,91 +774,112 @@ Consider tennis-specific factors like:
 - Seasonal training considerations
 
 Provide practical, actionable advice that a tennis player can immediately implement."""
-
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a professional tennis coach with 20+ years of experience training players at all levels."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=800,
-                temperature=0.7
-            )
-            
-            raw_response = response.choices[0].message.content
-            
-            # Parse the structured response
-            suggestions = self._parse_tennis_gpt_response(raw_response)
-            
-            return suggestions, raw_response
-            
-        except Exception as e:
-            # Fallback if API fails
-            fallback_suggestions = {
-                "todays_plan": f"Focus on refining the drills from yesterday: {', '.join(tennis_log.drills_trained)}. Adjust intensity based on your current fatigue level.",
-                "daily_goals": "Improve stroke consistency, maintain proper form, and build court confidence.",
-                "warnings": "Monitor fatigue levels and stop if form deteriorates significantly.",
-                "rest_suggestions": "Include proper warm-up, cool-down, and hydration."
-            }
-            
-            return fallback_suggestions, f"Error accessing AI recommendations: {str(e)}"
+        
+        return [
+            {"role": "system", "content": "You are a professional tennis coach with 20+ years of experience training players at all levels."},
+            {"role": "user", "content": prompt}
+        ]
     
-    def _parse_tennis_gpt_response(self, response: str) -> Dict[str, Any]:
-        """Parse the structured GPT response for tennis recommendations"""
-        suggestions = {}
-        
-        # Extract sections using keywords
-        sections = {
-            "todays_plan": ["TODAYS_PLAN:", "TODAY'S_PLAN:", "TODAYS PLAN:", "TODAY'S PLAN:"],
-            "daily_goals": ["DAILY_GOALS:", "DAILY GOALS:", "GOALS:"],
-            "warnings": ["WARNINGS:", "PRECAUTIONS:", "CAUTIONS:"],
-            "rest_suggestions": ["REST_SUGGESTIONS:", "REST SUGGESTIONS:", "RECOVERY:", "REST:"]
+    def _fallback_tennis_gpt_suggestions(self, tennis_log: TennisTrainingLog, error: Exception) -> tuple[Dict[str, Any], str, bool]:
+        """Canned recommendations used when the AI request fails"""
+        fallback_suggestions = {
+            "todays_plan": f"Focus on refining the drills from yesterday: {', '.join(tennis_log.drills_trained)}. Adjust intensity based on your current fatigue level.",
+            "daily_goals": "Improve stroke consistency, maintain proper form, and build court confidence.",
+            "warnings": "Monitor fatigue levels and stop if form deteriorates significantly.",
+            "rest_suggestions": "Include proper warm-up, cool-down, and hydration."
         }
         
-        for key, keywords in sections.items():
-            for keyword in keywords:
-                if keyword in response:
-                    # Find the section content
-                    start_idx = response.find(keyword) + len(keyword)
-                    # Find the next section or end of response
-                    next_section_idx = len(response)
-                    for other_key, other_keywords in sections.items():
-                        if other_key != key:
-                            for other_keyword in other_keywords:
-                                if other_keyword in response[start_idx:]:
-                                    idx = response.find(other_keyword, start_idx)
-                                    if idx != -1 and idx < next_section_idx:
-                                        next_section_idx = idx
-                    
-                    content = response[start_idx:next_section_idx].strip()
-                    suggestions[key] = content
-                    break
-        
-        # Provide defaults if parsing fails
-        if not suggestions.get("todays_plan"):
-            suggestions["todays_plan"] = "Continue practicing fundamentals with focus on form and consistency."
-        if not suggestions.get("daily_goals"):
-            suggestions["daily_goals"] = "Improve stroke technique and court positioning."
-        if not suggestions.get("warnings"):
-            suggestions["warnings"] = "None - maintain good form throughout the session."
-        if not suggestions.get("rest_suggestions"):
-            suggestions["rest_suggestions"] = "Include proper warm-up, cool-down, and hydration."
-        
-        return suggestions
+        return fallback_suggestions, f"Error accessing AI recommendations: {str(error)}", True
+    
+    def _parse_tennis_gpt_response(self, response: str) -> Dict[str, Any]:
+        """Parse the structured GPT response for tennis recommendations"""
+        with get_metrics().timer("parse_seconds"):
+            parser = TennisPlanSectionParser()
+            parser.feed(response)
+            parser.close()
+            return parser.suggestions()
+
+COACH_SYSTEM_PROMPT = "You are a knowledgeable tennis coach. Answer questions about tennis training plans using the provided context. Be specific, practical, and encouraging. Focus on tennis technique, strategy, and player development."
 
 class TennisCoachBot:
-    """Tennis-specific conversational coach for follow-up questions"""
+    """Tennis-specific conversational coach for follow-up questions
     
-    def __init__(self, tennis_plan: TennisDailyPlan, tennis_log: TennisTrainingLog):
-        self.client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    Earlier questions and answers are remembered within a token budget (see
+    conversation_memory), so follow-ups keep their context without the prompt
+    growing with the length of the chat.
+    """
+    
+    def __init__(self, tennis_plan: TennisDailyPlan, tennis_log: TennisTrainingLog,
+                 memory: Optional[ConversationMemory] = None, answer_cache: Optional[Any] = None,
+                 traffic_recorder: Optional[Any] = None, speculative: bool = False):
+        # OpenAI client, created on the first question that is not answered from cache
+        self._client = None
+        self.router = get_default_model_router()
         self.tennis_plan = tennis_plan
         self.tennis_log = tennis_log
+        self.memory = memory if memory is not None else ConversationMemory.from_env()
+        
+        # Optional answer_cache.AnswerCache - answers repeated and paraphrased questions without a call
+        self.answer_cache = answer_cache
+        self._plan_fingerprint = None
+        if answer_cache is not None:
+            from answer_cache import plan_fingerprint
+            self._plan_fingerprint = plan_fingerprint(tennis_plan, tennis_log)
+        
+        # Optional traffic_capture.TrafficRecorder - appends each question to a JSONL capture
+        self.traffic_recorder = traffic_recorder
+        
+        # Prefetched questions nobody has asked yet are counted apart from real ones
+        self.speculative = speculative
+        
+        # The plan context never changes during a chat, so build the system prompt once
+        self._system_prompt = f"{COACH_SYSTEM_PROMPT}\n\nContext: {self._build_context()}"
+        
+        # Token accounting, one entry per ask_question call
+        self.turn_stats: List[TurnStats] = []
+    
+    def reset_conversation(self):
+        """Forget earlier questions (the plan context is kept)"""
+        self.memory.clear()
+        self.turn_stats = []
+    
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+    
+    def _create_client(self):
+        """Use the shared, pooled OpenAI client for answering questions"""
+        return get_openai_client()
         
     def ask_question(self, question: str) -> str:
         """Answer tennis-specific questions about the daily plan"""
+        start = time.perf_counter()
+        route = self.router.route_question(normalize_tennis_log(self.tennis_log), question)
+        cached = self._lookup_cached_answer(question, route)
+        if cached is not None:
+            self._record_question(start, "cache", question)
+            return cached
         
-        context = f"""
+        messages = self._build_messages(question)
+        try:
+            response = _chat_completion(self.client, "coach", **self._coach_request(messages, route))
+            
+            answer = response.choices[0].message.content
+            self._record_turn(question, answer, messages, response)
+            self._store_cached_answer(question, answer, messages, route)
+            self._record_question(start, "ai", question)
+            return answer
+            
+        except Exception as e:
+            self._record_turn(question, None, messages, None)
+            self._record_question(start, "fallback", question)
+            return self._fallback_answer(e)
+    
+    def _build_context(self) -> str:
+        """Describe yesterday's session and today's plan for the coach prompt"""
+        return f"""
         YESTERDAY'S TENNIS SESSION:
         - Drills Practiced: {', '.join(self.tennis_log.drills_trained)}
         - Training Intensity: {self.tennis_log.intensity}
@@ -231,19 +895,288 @@ class TennisCoachBot:
         HARDCODED RECOMMENDATIONS:
         {' | '.join(self.tennis_plan.hardcoded_suggestions)}
         """
+    
+    def _build_messages(self, question: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a coaching question, including budgeted conversation history"""
+        return self.memory.build_messages(self._system_prompt, question)
+    
+    def _coach_request(self, messages: List[Dict[str, str]], route: Route) -> Dict[str, Any]:
+        """Chat completion arguments for a question on the routed tier, recording the decision"""
+        self.router.record("coach", route)
+        return {
+            "model": route.model,
+            "messages": messages,
+            "max_tokens": route.max_tokens,
+            "temperature": route.temperature
+        }
+    
+    def answer_cache_key(self, question: str, route: Optional[Route] = None) -> str:
+        """Answer cache key for a question: the plan fingerprint plus the model it is routed to"""
+        if self._plan_fingerprint is None:
+            from answer_cache import plan_fingerprint
+            self._plan_fingerprint = plan_fingerprint(self.tennis_plan, self.tennis_log)
+        if route is None:
+            route = self.router.route_question(normalize_tennis_log(self.tennis_log), question)
+        # Answers are cached per model, so routing a question to another tier asks again
+        return f"{self._plan_fingerprint}:{route.model}"
+    
+    def _lookup_cached_answer(self, question: str, route: Route) -> Optional[str]:
+        """Serve a cached answer for this plan, recording it as a zero-token turn"""
+        if self.answer_cache is None:
+            return None
+        answer = self.answer_cache.get(self.answer_cache_key(question, route), question)
+        if answer is not None:
+            self.memory.add_turn(question, answer)
+            self.turn_stats.append(TurnStats(
+                question_tokens=estimate_tokens(question),
+                estimated_prompt_tokens=0,
+                history_messages=0,
+                prompt_tokens=0,
+                completion_tokens=0,
+                cached=True
+            ))
+        return answer
+    
+    def _store_cached_answer(self, question: str, answer: str, messages: List[Dict[str, str]], route: Route):
+        """Cache an answer that depended only on the plan"""
+        # Answers to follow-ups may lean on earlier turns, so only context-free ones are shared
+        if self.answer_cache is not None and len(messages) == 2:
+            self.answer_cache.put(self.answer_cache_key(question, route), question, answer)
+    
+    def _record_turn(self, question: str, answer: Optional[str], messages: List[Dict[str, str]], response: Any):
+        """Remember a successful turn and log its token usage"""
+        # Fallback apologies are not remembered - they carry nothing worth following up on
+        if answer is not None:
+            self.memory.add_turn(question, answer)
+        
+        usage = getattr(response, "usage", None)
+        self.turn_stats.append(TurnStats(
+            question_tokens=estimate_tokens(question),
+            estimated_prompt_tokens=estimate_message_tokens(messages),
+            history_messages=len(messages) - 2,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None)
+        ))
+    
+    def _record_question(self, start: float, source: str, question: str):
+        """Count an answered question and its latency by source (cache, ai or fallback) and capture it"""
+        if self.speculative:
+            source = f"prefetch_{source}"
+        metrics = get_metrics()
+        metrics.inc("coach_questions_total", source=source)
+        metrics.observe("coach_question_seconds", time.perf_counter() - start, source=source)
+        if self.traffic_recorder is not None:
+            self._capture(self.traffic_recorder.record_question, self.tennis_log, question, start, source)
+    
+    def _capture(self, record: Callable[..., None], *args):
+        """Append a traffic capture record"""
+        record(*args)
+    
+    def _fallback_answer(self, error: Exception) -> str:
+        """Apology returned when the AI request fails"""
+        return f"I'm having trouble accessing my tennis knowledge right now. Please try asking your question again, or refer to the written recommendations above. Error: {str(error)}"
+
+class AsyncTennisTrainingEvaluator(TennisTrainingEvaluator):
+    """Asyncio variant of TennisTrainingEvaluator built on AsyncOpenAI
+    
+    The OpenAI request is awaited rather than blocking a thread, so a single event
+    loop can keep many plan generations going at once. Cancelling the awaiting task
+    cancels the underlying request.
+    """
+    
+    def __init__(self, plan_cache: Optional[Any] = None, timeout: Optional[float] = None,
+                 traffic_recorder: Optional[Any] = None):
+        super().__init__(plan_cache=plan_cache, traffic_recorder=traffic_recorder)
+        
+        # Seconds to wait for OpenAI before serving the fallback plan (None = no limit)
+        self.timeout = timeout
+    
+    def _create_client(self):
+        """Use the shared, pooled async OpenAI client for plan generation"""
+        return get_async_openai_client()
+    
+    def _create_single_flight(self):
+        return get_default_async_single_flight()
+    
+    async def create_daily_plan(self, tennis_log: TennisTrainingLog, timeout: Optional[float] = None,
+                                workload: Optional[Any] = None) -> TennisDailyPlan:
+        """Generate a complete tennis training plan without blocking the event loop"""
+        start = time.perf_counter()
+        
+        cache_key, cached = await self._alookup_cached_plan(tennis_log, workload)
+        if cached is not None:
+            gpt_suggestions, raw_response = cached
+            hardcoded_suggestions = self.rule_suggestions(tennis_log, workload)
+            self._record_plan(start, "cache", tennis_log, workload)
+            return TennisDailyPlan(
+                hardcoded_suggestions=hardcoded_suggestions,
+                gpt_suggestions=gpt_suggestions,
+                raw_gpt_response=raw_response
+            )
+        
+        # The rules take microseconds, so they run before the request rather than alongside it
+        hardcoded_suggestions = self.rule_suggestions(tennis_log, workload)
+        gpt_suggestions, raw_response, is_fallback = await self._coalesced_gpt_suggestions(tennis_log, timeout, workload=workload)
+        await self._astore_cached_plan(cache_key, gpt_suggestions, raw_response, is_fallback)
+        self._record_plan(start, "fallback" if is_fallback else "ai", tennis_log, workload)
+        
+        return TennisDailyPlan(
+            hardcoded_suggestions=hardcoded_suggestions,
+            gpt_suggestions=gpt_suggestions,
+            raw_gpt_response=raw_response,
+            is_fallback=is_fallback
+        )
+    
+    def start_daily_plan(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None,
+                         rules_only: bool = False, background: bool = True) -> ProgressiveTennisDailyPlan:
+        """Return a plan with the rule-based suggestions at once, completing it on the running loop
+        
+        With background=True this must be called from a coroutine; the plan cache is
+        read and the AI sections generated by a task on the running event loop instead
+        of the shared worker pool.
+        """
+        import asyncio
+        
+        if not background:
+            return super().start_daily_plan(tennis_log, workload, rules_only=rules_only, background=False)
+        start = time.perf_counter()
+        progressive = ProgressiveTennisDailyPlan(tennis_log, self.rule_suggestions(tennis_log, workload))
+        # Keep a reference so the task is not garbage collected while it runs
+        progressive._task = asyncio.ensure_future(self._complete_started_plan(progressive, workload, rules_only, start))
+        return progressive
+    
+    async def _complete_started_plan(self, progressive: ProgressiveTennisDailyPlan, workload: Optional[Any],
+                                     rules_only: bool, start: float) -> None:
+        """Finish a plan from start_daily_plan() with cached, no (rules_only) or new AI sections"""
+        try:
+            _, cached = await self._alookup_cached_plan(progressive.tennis_log, workload)
+        except BaseException as e:
+            progressive._fail(e)
+            raise
+        if cached is not None:
+            gpt_suggestions, raw_response = cached
+            self._record_plan(start, "cache", progressive.tennis_log, workload)
+            progressive._finish(TennisDailyPlan(
+                hardcoded_suggestions=progressive.hardcoded_suggestions,
+                gpt_suggestions=gpt_suggestions,
+                raw_gpt_response=raw_response
+            ))
+        elif rules_only:
+            self._record_plan(start, "rules", progressive.tennis_log, workload)
+            progressive._skip()
+        else:
+            await self.complete_daily_plan(progressive, workload)
+    
+    async def complete_daily_plan(self, progressive: ProgressiveTennisDailyPlan, workload: Optional[Any] = None) -> TennisDailyPlan:
+        """Generate the AI sections of a plan from start_daily_plan() without blocking the event loop"""
+        if progressive.done():
+            return progressive.result()
+        try:
+            plan = await self.create_daily_plan(progressive.tennis_log, workload=workload)
+        except BaseException as e:
+            progressive._fail(e)
+            raise
+        progressive._finish(plan)
+        return plan
+    
+    async def _alookup_cached_plan(self, tennis_log: TennisTrainingLog, workload: Optional[Any] = None) -> tuple[Optional[str], Optional[tuple]]:
+        """_lookup_cached_plan on a worker thread - plan cache reads are SQLite queries"""
+        import asyncio
+        
+        if self.plan_cache is None:
+            return None, None
+        return await asyncio.to_thread(self._lookup_cached_plan, tennis_log, workload)
+    
+    async def _astore_cached_plan(self, cache_key: Optional[str], gpt_suggestions: Dict[str, Any], raw_response: str, is_fallback: bool):
+        """_store_cached_plan on a worker thread"""
+        import asyncio
+        
+        if cache_key is not None and not is_fallback:
+            await asyncio.to_thread(self._store_cached_plan, cache_key, gpt_suggestions, raw_response, is_fallback)
+    
+    def _capture(self, record: Callable[..., None], *args):
+        """Append a traffic capture record without writing the file on the event loop"""
+        _capture_off_loop(record, *args)
+    
+    async def _coalesced_gpt_suggestions(self, tennis_log: TennisTrainingLog, timeout: Optional[float] = None,
+                                         workload: Optional[Any] = None) -> tuple[Dict[str, Any], str, bool]:
+        """AI sections for a log, sharing one in-flight request between identical concurrent tasks
+        
+        Tasks that join another task's request wait under that request's timeout.
+        """
+        generate = lambda: self._generate_tennis_gpt_suggestions(tennis_log, timeout, workload=workload)
+        if self.single_flight is None:
+            return await generate()
+        
+        (gpt_suggestions, raw_response, is_fallback), shared = await self.single_flight.do(self.plan_key(tennis_log, workload), generate)
+        return (dict(gpt_suggestions) if shared else gpt_suggestions), raw_response, is_fallback
+    
+    async def _generate_tennis_gpt_suggestions(self, tennis_log: TennisTrainingLog, timeout: Optional[float] = None,
+                                               workload: Optional[Any] = None) -> tuple[Dict[str, Any], str, bool]:
+        """Generate AI-powered tennis recommendations, falling back on errors and timeouts"""
+        import asyncio
+        
+        try:
+            response = await asyncio.wait_for(
+                _achat_completion(self.client, "plan", **self._plan_request(tennis_log, workload)),
+                timeout=timeout if timeout is not None else self.timeout
+            )
+            
+            raw_response = response.choices[0].message.content
+            return self._parse_tennis_gpt_response(raw_response), raw_response, False
+            
+        except asyncio.TimeoutError:
+            return self._fallback_tennis_gpt_suggestions(tennis_log, TimeoutError("OpenAI request timed out"))
+        except Exception as e:
+            return self._fallback_tennis_gpt_suggestions(tennis_log, e)
+
+class AsyncTennisCoachBot(TennisCoachBot):
+    """Asyncio variant of TennisCoachBot built on AsyncOpenAI"""
+    
+    def __init__(self, tennis_plan: TennisDailyPlan, tennis_log: TennisTrainingLog, timeout: Optional[float] = None,
+                 memory: Optional[ConversationMemory] = None, answer_cache: Optional[Any] = None,
+                 traffic_recorder: Optional[Any] = None):
+        super().__init__(tennis_plan, tennis_log, memory=memory, answer_cache=answer_cache,
+                         traffic_recorder=traffic_recorder)
+        self.timeout = timeout
+    
+    def _create_client(self):
+        """Use the shared, pooled async OpenAI client for answering questions"""
+        return get_async_openai_client()
+    
+    def _capture(self, record: Callable[..., None], *args):
+        """Append a traffic capture record without writing the file on the event loop"""
+        _capture_off_loop(record, *args)
+    
+    async def ask_question(self, question: str, timeout: Optional[float] = None) -> str:
+        """Answer tennis-specific questions about the daily plan without blocking the event loop"""
+        import asyncio
+        
+        start = time.perf_counter()
+        route = self.router.route_question(normalize_tennis_log(self.tennis_log), question)
+        cached = self._lookup_cached_answer(question, route)
+        if cached is not None:
+            self._record_question(start, "cache", question)
+            return cached
         
+        messages = self._build_messages(question)
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a knowledgeable tennis coach. Answer questions about tennis training plans using the provided context. Be specific, practical, and encouraging. Focus on tennis technique, strategy, and player development."},
-                    {"role": "user", "content": f"Context: {context}\n\nQuestion: {question}"}
-                ],
-                max_tokens=300,
-                temperature=0.7
+            response = await asyncio.wait_for(
+                _achat_completion(self.client, "coach", **self._coach_request(messages, route)),
+                timeout=timeout if timeout is not None else self.timeout
             )
             
-            return response.choices[0].message.content
+            answer = response.choices[0].message.content
+            self._record_turn(question, answer, messages, response)
+            self._store_cached_answer(question, answer, messages, route)
+            self._record_question(start, "ai", question)
+            return answer
             
+        except asyncio.TimeoutError:
+            self._record_turn(question, None, messages, None)
+            self._record_question(start, "fallback", question)
+            return self._fallback_answer(TimeoutError("OpenAI request timed out"))
         except Exception as e:
-            return f"I'm having trouble accessing my tennis knowledge right now. Please try asking your question again, or refer to the written recommendations above. Error: {str(e)}" 
\ No newline at end of file
+            self._record_turn(question, None, messages, None)
+            self._record_question(start, "fallback", question)
+            return self._fallback_answer(e)
@@ -0,0 +1,295 @@
+"""
+Append-only training history store with rolling workload aggregates
+Sessions are stored per player in SQLite (indexed by player and date). Alongside,
+each player keeps a 28-day ring of daily load, session and drill counts so the
+7/28-day loads, acute:chronic ratio and drill frequencies are updated in O(1) per
+append and read with a single primary-key lookup.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional
+
+from training_evaluator import TennisTrainingLog, normalize_tennis_log, TENNIS_DRILLS
+
+DEFAULT_HISTORY_PATH = ".tennis_history.sqlite3"
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+
+# Session load = intensity weight x number of drills practiced
+INTENSITY_LOAD = {"Light": 1.0, "Moderate": 2.0, "Intense": 3.0}
+
+def session_load(tennis_log: TennisTrainingLog) -> float:
+    """Training load units for one session"""
+    return INTENSITY_LOAD.get(tennis_log.intensity, 2.0) * max(1, len(tennis_log.drills_trained))
+
+def ratio_band(ratio: Optional[float]) -> str:
+    """Coarse acute:chronic workload ratio band used by rules, prompts and cache keys"""
+    if ratio is None:
+        return "Unknown"
+    if ratio < 0.8:
+        return "Low"
+    if ratio <= 1.3:
+        return "Optimal"
+    if ratio <= 1.5:
+        return "Elevated"
+    return "Spike"
+
+@dataclass
+class WorkloadSnapshot:
+    """Rolling workload aggregates for a player as of a given day"""
+    player_id: str
+    as_of: date
+    acute_load: float  # total load over the last 7 days
+    chronic_load: float  # total load over the last 28 days
+    sessions_7d: int
+    sessions_28d: int
+    drill_frequency: Dict[str, int]  # sessions per drill over the last 28 days
+    history_days: int = 0  # days since the player's first recorded session
+
+    @property
+    def acute_chronic_ratio(self) -> Optional[float]:
+        """Average daily load over 7 days relative to 28 days, None until 28 days of history exist"""
+        if self.chronic_load <= 0 or self.history_days < CHRONIC_DAYS:
+            return None
+        return (self.acute_load / ACUTE_DAYS) / (self.chronic_load / CHRONIC_DAYS)
+
+    @property
+    def band(self) -> str:
+        return ratio_band(self.acute_chronic_ratio)
+
+class _Rolling:
+    """28-day ring of daily totals with running 7/28-day sums"""
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        if state is None:
+            state = {
+                "first_day": None,
+                "last_day": None,
+                "load": [0.0] * CHRONIC_DAYS,
+                "sessions": [0] * CHRONIC_DAYS,
+                "drills": [[0] * len(TENNIS_DRILLS) for _ in range(CHRONIC_DAYS)],
+                "acute_load": 0.0, "chronic_load": 0.0,
+                "sessions_7d": 0, "sessions_28d": 0,
+                "drill_counts": [0] * len(TENNIS_DRILLS)
+            }
+        self.state = state
+
+    def advance(self, day: int) -> None:
+        """Move the window forward to end on `day` (at most 28 O(1) steps)"""
+        s = self.state
+        if s["last_day"] is None or day - s["last_day"] >= CHRONIC_DAYS:
+            self.state = _Rolling().state
+            self.state["first_day"] = s["first_day"]
+            self.state["last_day"] = day
+            return
+
+        for t in range(s["last_day"] + 1, day + 1):
+            # Day t-7 leaves the acute window
+            leaving = (t - ACUTE_DAYS) % CHRONIC_DAYS
+            s["acute_load"] -= s["load"][leaving]
+            s["sessions_7d"] -= s["sessions"][leaving]
+
+            # Day t-28 leaves the chronic window; its slot is reused for day t
+            slot = t % CHRONIC_DAYS
+            s["chronic_load"] -= s["load"][slot]
+            s["sessions_28d"] -= s["sessions"][slot]
+            s["drill_counts"] = [total - count for total, count in zip(s["drill_counts"], s["drills"][slot])]
+            s["load"][slot] = 0.0
+            s["sessions"][slot] = 0
+            s["drills"][slot] = [0] * len(TENNIS_DRILLS)
+        s["last_day"] = max(s["last_day"], day)
+
+    def add(self, day: int, load: float, drills: List[str]) -> None:
+        """Add a session, advancing the window first if it is the newest day"""
+        if self.state["last_day"] is None or day > self.state["last_day"]:
+            self.advance(day)
+
+        s = self.state
+        s["first_day"] = day if s["first_day"] is None else min(s["first_day"], day)
+        age = s["last_day"] - day
+        if age >= CHRONIC_DAYS:
+            return  # Too old to affect the rolling windows
+
+        slot = day % CHRONIC_DAYS
+        s["load"][slot] += load
+        s["sessions"][slot] += 1
+        s["chronic_load"] += load
+        s["sessions_28d"] += 1
+        if age < ACUTE_DAYS:
+            s["acute_load"] += load
+            s["sessions_7d"] += 1
+        for index, drill in enumerate(TENNIS_DRILLS):
+            if drill in drills:
+                s["drills"][slot][index] += 1
+                s["drill_counts"][index] += 1
+
+class TrainingHistoryStore:
+    """SQLite-backed per-player session history with incrementally maintained workload"""
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, player_id TEXT NOT NULL, session_date TEXT NOT NULL, "
+            "drills_trained TEXT NOT NULL, intensity TEXT NOT NULL, form_rating TEXT NOT NULL, "
+            "fatigue_level TEXT NOT NULL, load REAL NOT NULL, recorded_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_player_date ON sessions(player_id, session_date)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(session_date)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS workload (player_id TEXT PRIMARY KEY, state TEXT NOT NULL)")
+
+    @classmethod
+    def from_env(cls) -> "TrainingHistoryStore":
+        """Create a store at TRAINING_HISTORY_PATH"""
+        return cls(os.getenv('TRAINING_HISTORY_PATH', DEFAULT_HISTORY_PATH))
+
+    def append(self, player_id: str, session_date: date, tennis_log: TennisTrainingLog,
+               if_new: bool = False) -> WorkloadSnapshot:
+        """Record a session and update the player's rolling aggregates, returning them
+
+        With if_new nothing is recorded when the player already has a session that day,
+        so retried requests and re-run batches don't count the same load twice.
+        """
+        log = normalize_tennis_log(tennis_log)
+        load = session_load(log)
+        day = session_date.toordinal()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if if_new and self._conn.execute(
+                    "SELECT 1 FROM sessions WHERE player_id = ? AND session_date = ? LIMIT 1",
+                    (player_id, session_date.isoformat())
+                ).fetchone() is not None:
+                    self._conn.execute("COMMIT")
+                    return self._snapshot(player_id, self._load_rolling(player_id), session_date)
+                self._conn.execute(
+                    "INSERT INTO sessions (player_id, session_date, drills_trained, intensity, form_rating, "
+                    "fatigue_level, load, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (player_id, session_date.isoformat(), json.dumps(log.drills_trained), log.intensity,
+                     log.form_rating, log.fatigue_level, load, time.time())
+                )
+                rolling = self._load_rolling(player_id)
+                rolling.add(day, load, log.drills_trained)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO workload (player_id, state) VALUES (?, ?)",
+                    (player_id, json.dumps(rolling.state))
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return self._snapshot(player_id, rolling, session_date)
+
+    def workload(self, player_id: str, as_of: Optional[date] = None) -> WorkloadSnapshot:
+        """Rolling aggregates for a player as of a day (default today), without rescanning sessions
+
+        Windows never move backwards: for a day before the player's latest session the
+        aggregates as of that latest session are returned.
+        """
+        as_of = as_of or date.today()
+        with self._lock:
+            rolling = self._load_rolling(player_id)
+        if rolling.state["last_day"] is not None and as_of.toordinal() > rolling.state["last_day"]:
+            rolling.advance(as_of.toordinal())
+        return self._snapshot(player_id, rolling, as_of)
+
+    def has_session(self, player_id: str, session_date: date) -> bool:
+        """Whether any session is recorded for the player on that day"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM sessions WHERE player_id = ? AND session_date = ? LIMIT 1",
+                (player_id, session_date.isoformat())
+            ).fetchone()
+        return row is not None
+
+    def sessions(self, player_id: str, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Stored sessions for a player between two days (inclusive), oldest first"""
+        query = "SELECT session_date, drills_trained, intensity, form_rating, fatigue_level, load FROM sessions WHERE player_id = ?"
+        params: List[Any] = [player_id]
+        if start is not None:
+            query += " AND session_date >= ?"
+            params.append(start.isoformat())
+        if end is not None:
+            query += " AND session_date <= ?"
+            params.append(end.isoformat())
+        query += " ORDER BY session_date, id"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {"session_date": row[0], "drills_trained": json.loads(row[1]), "intensity": row[2],
+             "form_rating": row[3], "fatigue_level": row[4], "load": row[5]}
+            for row in rows
+        ]
+
+    def players(self) -> List[str]:
+        """Every player with recorded sessions"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT player_id FROM workload ORDER BY player_id")]
+
+    def iter_sessions(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Every stored session of every player in insertion order, read batch_size rows at a time"""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, player_id, session_date, drills_trained, intensity, form_rating, fatigue_level, load "
+                    "FROM sessions WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield {"player_id": row[1], "session_date": row[2], "drills_trained": json.loads(row[3]),
+                       "intensity": row[4], "form_rating": row[5], "fatigue_level": row[6], "load": row[7]}
+            last_id = rows[-1][0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _load_rolling(self, player_id: str) -> _Rolling:
+        row = self._conn.execute("SELECT state FROM workload WHERE player_id = ?", (player_id,)).fetchone()
+        return _Rolling(json.loads(row[0]) if row else None)
+
+    def _snapshot(self, player_id: str, rolling: _Rolling, as_of: date) -> WorkloadSnapshot:
+        s = rolling.state
+        if s["last_day"] is not None:
+            as_of = max(as_of, date.fromordinal(s["last_day"]))
+        return WorkloadSnapshot(
+            player_id=player_id,
+            as_of=as_of,
+            acute_load=round(s["acute_load"], 6),
+            chronic_load=round(s["chronic_load"], 6),
+            sessions_7d=s["sessions_7d"],
+            sessions_28d=s["sessions_28d"],
+            drill_frequency={drill: count for drill, count in zip(TENNIS_DRILLS, s["drill_counts"]) if count},
+            history_days=as_of.toordinal() - s["first_day"] + 1 if s["first_day"] is not None else 0
+        )
+
+_default_store: Optional[TrainingHistoryStore] = None
+_default_store_lock = threading.Lock()
+
+def get_default_history_store() -> Optional[TrainingHistoryStore]:
+    """Process-wide history store, or None when disabled via TRAINING_HISTORY_ENABLED=false"""
+    global _default_store
+    if os.getenv('TRAINING_HISTORY_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TrainingHistoryStore.from_env()
+        return _default_store